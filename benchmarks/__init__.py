@@ -0,0 +1,7 @@
+"""
+Benchmarks de performance de l'API SoftDesk.
+
+Chaque module se lance depuis la racine du projet, par exemple :
+
+    poetry run python -m benchmarks.renderers
+"""
@@ -0,0 +1,80 @@
+"""
+Benchmark du format en colonnes face au format par défaut.
+
+Pour chaque liste (projets, issues, commentaires, utilisateurs), construit
+une page de N lignes avec le serializer compilé puis l'encode en JSON :
+objets (format par défaut) ou `{"columns": [...], "rows": [[...]]}`. Affiche
+la taille de la réponse et le temps de construction + encodage.
+
+    poetry run python -m benchmarks.columnar [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+
+from benchmarks.common import measure, setup_django, summary, test_database
+from benchmarks.serializers import populate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+
+    from issues.models import Comment, Issue, Project
+    from issues.serializers import annotate_comment_summary
+    from issues.views import CommentViewSet, IssueViewSet, ProjectViewSet
+    from softdesk_support.columnar import ColumnarJSONRenderer, columnar_data
+    from softdesk_support.renderers import FastJSONRenderer
+    from users.views import UserViewSet
+
+    User = get_user_model()
+    cases = [
+        ("projets", ProjectViewSet, Project.objects.all(), None),
+        (
+            "issues",
+            IssueViewSet,
+            annotate_comment_summary(Issue.objects.all()),
+            # latest_comment n'est calculé que sur demande (?fields=)
+            ["id", "name", "priority", "tag", "status", "author", "created_time"]
+            + ["comments_count"],
+        ),
+        ("commentaires", CommentViewSet, Comment.objects.all(), None),
+        ("utilisateurs", UserViewSet, User.objects.all(), None),
+    ]
+
+    with test_database():
+        populate(args.rows)
+        for name, viewset, queryset, fields in cases:
+            compiled = viewset.compiled_list_serializer
+            rows = list(compiled.values(queryset.order_by("id")[: args.rows], fields))
+            envelope = {"count": len(rows), "next": None, "previous": None}
+
+            # Valeurs de l'itération liées à la définition (B023)
+            def objects(compiled=compiled, rows=rows, fields=fields, envelope=envelope):
+                results = compiled.serialize(rows, fields)
+                return FastJSONRenderer().render({**envelope, "results": results})
+
+            def columns(compiled=compiled, rows=rows, fields=fields, envelope=envelope):
+                names, values = compiled.serialize_columns(rows, fields)
+                data = columnar_data(envelope, names, values)
+                return ColumnarJSONRenderer().render(data)
+
+            default_time = summary(measure(objects, args.repeat))
+            columnar_time = summary(measure(columns, args.repeat))
+            default_size, columnar_size = len(objects()), len(columns())
+            print(
+                f"{name:<13} objets {default_size / 1024:8.1f} Ko "
+                f"{default_time['median_ms']:7.2f} ms"
+                f"  colonnes {columnar_size / 1024:8.1f} Ko "
+                f"{columnar_time['median_ms']:7.2f} ms"
+                f"  (-{100 * (1 - columnar_size / default_size):.0f} % octets, "
+                f"x{default_time['median_ms'] / columnar_time['median_ms']:.1f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
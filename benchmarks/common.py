@@ -0,0 +1,74 @@
+"""
+Outils communs aux benchmarks
+"""
+
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    """Configure Django comme le fait tests/conftest.py"""
+    sys.path.insert(0, str(ROOT_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "softdesk_support.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Base de test temporaire, détruite à la fin : en mémoire pour SQLite, ou
+    dans le fichier `name` (nécessaire pour y accéder depuis plusieurs threads)
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    if name is not None:
+        connection.settings_dict["TEST"]["NAME"] = str(name)
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=20):
+    """Exécute `func` plusieurs fois et retourne les durées en millisecondes"""
+    func()  # Échauffement
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def summary(durations):
+    """Médiane et minimum d'une série de durées"""
+    return {
+        "median_ms": round(statistics.median(durations), 3),
+        "min_ms": round(min(durations), 3),
+    }
+
+
+def percentiles(durations):
+    """p50, p95 et p99 d'une série de durées (millisecondes)"""
+    if len(durations) < 2:
+        value = round(durations[0], 3) if durations else None
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(durations, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+    }
@@ -0,0 +1,338 @@
+"""
+Benchmark de latence des endpoints de l'API.
+
+Crée une base de test, la remplit avec `manage.py seed`, puis appelle chaque
+endpoint de lecture et d'écriture en processus via le client de test de DRF
+(authentification JWT, middlewares et throttling compris). Pour chaque
+endpoint : latences p50 / p95 / p99, requêtes SQL par appel et mémoire allouée
+(tracemalloc, sur quelques appels séparés pour ne pas fausser les latences).
+
+    poetry run python -m benchmarks.endpoints [--iterations 200] [--concurrency 4]
+        [--output resultats.json] [--compare reference.json --threshold 0.1]
+
+Avec `--compare`, chaque endpoint dont le p95 dépasse celui de la référence
+de plus de `--threshold` (10 % par défaut) est signalé comme régression et le
+code de sortie vaut 1.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import UTC, datetime
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.common import percentiles, setup_django, test_database
+
+SEED_SIZES = {"users": 2000, "projects": 200, "issues": 20000, "comments": 100000}
+ALLOCATION_SAMPLES = 5
+
+_sequence = itertools.count()
+
+
+class Fixtures:
+    """Objets du jeu de données utilisés par les endpoints"""
+
+    def __init__(self):
+        from django.db.models import Count
+
+        from issues.models import Contributor, Issue, Project
+
+        # Le projet le plus chargé, vu par son auteur
+        self.project = (
+            Project.objects.annotate(size=Count("issues")).order_by("-size").first()
+        )
+        self.user = self.project.author
+        self.member_id = (
+            Contributor.objects.filter(project=self.project)
+            .exclude(user=self.user)
+            .values_list("user_id", flat=True)
+            .first()
+            or self.user.id
+        )
+        self.issue = (
+            Issue.objects.filter(project=self.project)
+            .annotate(size=Count("comments"))
+            .order_by("-size")
+            .first()
+        )
+        self.comment = self.issue.comments.filter(author=self.user).first()
+        if self.comment is None:
+            self.comment = self.new_comment()
+
+    def client(self):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        client = APIClient()
+        # Les erreurs serveur (base verrouillée...) sont comptées, pas levées
+        client.raise_request_exception = False
+        token = RefreshToken.for_user(self.user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def new_issue(self):
+        from issues.models import Issue
+
+        return Issue.objects.create(
+            name="Issue benchmark",
+            description="Description",
+            tag="BUG",
+            project=self.project,
+            author=self.user,
+        )
+
+    def new_comment(self):
+        from issues.models import Comment
+
+        return Comment.objects.create(
+            description="Commentaire benchmark", issue=self.issue, author=self.user
+        )
+
+    def issue_url(self, pk=None):
+        base = f"/api/projects/{self.project.id}/issues/"
+        return base if pk is None else f"{base}{pk}/"
+
+    def comment_url(self, pk=None):
+        base = f"{self.issue_url(self.issue.id)}comments/"
+        return base if pk is None else f"{base}{pk}/"
+
+
+def endpoints(fx):
+    """
+    Nom -> (méthode, préparation). La préparation, exécutée hors mesure,
+    renvoie (url, données) ; elle peut créer les objets à supprimer.
+    """
+    project_url = f"/api/projects/{fx.project.id}/"
+    issue_payload = {
+        "name": "Issue benchmark",
+        "description": "Description de l'issue",
+        "priority": "HIGH",
+        "tag": "FEATURE",
+        "assigned_to": fx.member_id,
+    }
+    return {
+        "users.list": ("get", lambda: ("/api/users/", None)),
+        "users.retrieve": ("get", lambda: (f"/api/users/{fx.member_id}/", None)),
+        "users.profile": ("get", lambda: ("/api/users/profile/", None)),
+        "users.partial_update": (
+            "patch",
+            lambda: (f"/api/users/{fx.user.id}/", {"age": 30}),
+        ),
+        "projects.list": ("get", lambda: ("/api/projects/", None)),
+        "projects.retrieve": ("get", lambda: (project_url, None)),
+        "projects.create": (
+            "post",
+            lambda: (
+                "/api/projects/",
+                {
+                    "name": f"Projet benchmark {next(_sequence)}",
+                    "description": "Description du projet",
+                    "type": "back-end",
+                },
+            ),
+        ),
+        "projects.partial_update": (
+            "patch",
+            lambda: (project_url, {"description": "Description mise à jour"}),
+        ),
+        "contributors.list": ("get", lambda: (f"{project_url}contributors/", None)),
+        "issues.list": ("get", lambda: (fx.issue_url(), None)),
+        "issues.retrieve": ("get", lambda: (fx.issue_url(fx.issue.id), None)),
+        "issues.create": ("post", lambda: (fx.issue_url(), issue_payload)),
+        "issues.partial_update": (
+            "patch",
+            lambda: (fx.issue_url(fx.issue.id), {"status": "In Progress"}),
+        ),
+        "issues.destroy": ("delete", lambda: (fx.issue_url(fx.new_issue().id), None)),
+        "comments.list": ("get", lambda: (fx.comment_url(), None)),
+        "comments.retrieve": ("get", lambda: (fx.comment_url(fx.comment.id), None)),
+        "comments.create": (
+            "post",
+            lambda: (fx.comment_url(), {"description": "Nouveau commentaire"}),
+        ),
+        "comments.partial_update": (
+            "patch",
+            lambda: (fx.comment_url(fx.comment.id), {"description": "Modifié"}),
+        ),
+        "comments.destroy": (
+            "delete",
+            lambda: (fx.comment_url(fx.new_comment().id), None),
+        ),
+    }
+
+
+def call(client, method, url, data):
+    """Appel unique : (durée en ms, nombre de requêtes SQL, succès)"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = getattr(client, method)(url, data, format="json")
+        duration = (time.perf_counter() - start) * 1000
+    return duration, len(queries), response.status_code < 400
+
+
+def run_endpoint(fx, method, prepare, iterations, concurrency):
+    """Exécute `iterations` appels répartis sur `concurrency` threads"""
+    from django.db import connections
+
+    samples = []
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    def worker():
+        client = fx.client()
+        try:
+            while next(counter) < iterations:
+                with lock:
+                    url, data = prepare()
+                result = call(client, method, url, data)
+                with lock:
+                    samples.append(result)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    durations = [duration for duration, _, _ in samples]
+    return {
+        **percentiles(durations),
+        "mean_ms": round(statistics.fmean(durations), 3),
+        "throughput_rps": round(len(samples) / elapsed, 1),
+        "queries": round(statistics.median(queries for _, queries, _ in samples)),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+    }
+
+
+def allocations(fx, method, prepare):
+    """Pic de mémoire allouée par appel (Kio), sur quelques appels"""
+    client = fx.client()
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(ALLOCATION_SAMPLES):
+            url, data = prepare()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            getattr(client, method)(url, data, format="json")
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return round(statistics.median(peaks) / 1024, 1)
+
+
+def compare(results, reference, threshold, metric="p95_ms"):
+    """Endpoints dont `metric` dépasse la référence de plus de `threshold`"""
+    regressions = []
+    for name, current in results["endpoints"].items():
+        before = reference.get("endpoints", {}).get(name)
+        if not before or not before.get(metric) or current.get(metric) is None:
+            continue
+        ratio = current[metric] / before[metric]
+        if ratio > 1 + threshold:
+            regressions.append((name, before[metric], current[metric], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    for name, default in SEED_SIZES.items():
+        parser.add_argument(f"--{name}", type=int, default=default)
+    parser.add_argument("--only", help="Sous-chaîne des endpoints à mesurer")
+    parser.add_argument("--output", type=Path, help="Fichier JSON des résultats")
+    parser.add_argument("--compare", type=Path, help="Résultats de référence")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    setup_django()
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+    from rest_framework.throttling import SimpleRateThrottle
+
+    # Throttling exécuté (son coût fait partie de la mesure) mais jamais atteint
+    SimpleRateThrottle.THROTTLE_RATES.update(anon="1000000/s", user="1000000/s")
+    settings.NPLUSONE_MODE = "off"
+    # Les erreurs sont comptées dans les résultats, pas journalisées
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.THROTTLE_STORE_PATH = Path(tmp) / "throttle.sqlite3"
+        with test_database(Path(tmp) / "benchmark.sqlite3"):
+            sizes = {name: getattr(args, name) for name in SEED_SIZES}
+            start = time.perf_counter()
+            call_command("seed", seed=args.seed, stdout=StringIO(), **sizes)
+            print(f"Base générée en {time.perf_counter() - start:.1f} s : {sizes}")
+
+            fx = Fixtures()
+            results = {
+                "meta": {
+                    "date": datetime.now(UTC).isoformat(),
+                    "python": platform.python_version(),
+                    "django": django.get_version(),
+                    "iterations": args.iterations,
+                    "concurrency": args.concurrency,
+                    "seed": args.seed,
+                    "dataset": sizes,
+                },
+                "endpoints": {},
+            }
+
+            for name, (method, prepare) in endpoints(fx).items():
+                if args.only and args.only not in name:
+                    continue
+                run_endpoint(fx, method, prepare, args.warmup, 1)
+                stats = run_endpoint(
+                    fx, method, prepare, args.iterations, args.concurrency
+                )
+                stats["alloc_peak_kib"] = allocations(fx, method, prepare)
+                results["endpoints"][name] = stats
+                print(
+                    f"{name:<24} p50 {stats['p50_ms']:8.2f} ms"
+                    f"  p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms"
+                    f"  {stats['queries']:3d} requêtes"
+                    f"  {stats['alloc_peak_kib']:8.1f} Kio"
+                    + (f"  {stats['errors']} erreurs" if stats["errors"] else "")
+                )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f"Résultats écrits dans {args.output}")
+
+    if args.compare:
+        reference = json.loads(args.compare.read_text())
+        regressions = compare(results, reference, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(
+                f"RÉGRESSION {name} : p95 {before:.2f} ms -> {after:.2f} ms"
+                f" (+{(ratio - 1) * 100:.0f} %)"
+            )
+        if regressions:
+            sys.exit(1)
+        print(f"Aucune régression au-delà de {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
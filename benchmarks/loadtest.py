@@ -0,0 +1,379 @@
+"""
+Test de charge : rejoue la collection Postman de `docs/postman` contre un
+serveur lancé à part.
+
+    poetry run python manage.py runserver --noreload
+    poetry run python -m benchmarks.loadtest --users 20 --ramp-up 10 --iterations 5
+
+Chaque utilisateur virtuel (un thread, une session `requests`) exécute la
+collection dans l'ordre, avec son propre environnement de variables
+(`docs/postman/softdesk-environment.json`). Les scripts Postman ne sont pas
+exécutés ; les formes utilisées par la collection sont interprétées :
+
+- `pm.environment.set('var', response.champ)` dans un script de test
+  (appliqué si la réponse est un succès 2xx) ;
+- `pm.environment.set('var', pm.environment.get('autre'))` en pré-requête ;
+- `pm.expect(pm.response.code).to.equal(...)` / `.to.be.oneOf([...])` et
+  `pm.response.code === ...` pour les statuts attendus.
+
+`{{$timestamp}}` est rendu unique par utilisateur virtuel et par itération
+pour éviter les collisions de noms d'utilisateur.
+
+Le rapport donne, pour chaque requête : nombre d'appels, débit, erreurs
+(exceptions et 5xx), statuts inattendus, réponses 429 (throttling),
+p50 / p95 / p99 et un histogramme des latences.
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+import requests
+
+from benchmarks.common import ROOT_DIR, percentiles
+
+COLLECTION = ROOT_DIR / "docs/postman/softdesk-permissions-fixed.json"
+ENVIRONMENT = ROOT_DIR / "docs/postman/softdesk-environment.json"
+
+# Bornes supérieures des classes de l'histogramme (ms) ; au-delà : "+inf"
+HISTOGRAM_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_VARIABLE = re.compile(r"\{\{([^{}]+)\}\}")
+_SET_FROM_RESPONSE = re.compile(
+    r"pm\.environment\.set\(\s*'(\w+)'\s*,\s*response\.([\w.]+)\s*\)"
+)
+_SET_FROM_VARIABLE = re.compile(
+    r"pm\.environment\.set\(\s*'(\w+)'\s*,\s*pm\.environment\.get\(\s*'(\w+)'\s*\)\s*\)"
+)
+_EXPECT_EQUAL = re.compile(r"pm\.response\.code\)\.to\.equal\((\d+)\)")
+_EXPECT_ONE_OF = re.compile(r"pm\.response\.code\)\.to\.be\.oneOf\(\[([\d,\s]+)\]\)")
+_CONDITION = re.compile(r"pm\.response\.code\s*===\s*(\d+)")
+
+
+class Step:
+    """Requête de la collection et ce que ses scripts en attendent"""
+
+    def __init__(self, item, collection_auth):
+        request = item["request"]
+        self.name = item["name"]
+        self.method = request["method"]
+        url = request["url"]
+        self.url = url if isinstance(url, str) else url["raw"]
+        self.headers = {
+            header["key"]: header["value"]
+            for header in request.get("header", [])
+            if not header.get("disabled")
+        }
+        body = request.get("body") or {}
+        self.body = body.get("raw") if body.get("mode") == "raw" else None
+
+        auth = request.get("auth", collection_auth) or {}
+        self.token = None
+        if auth.get("type") == "bearer":
+            values = {entry["key"]: entry["value"] for entry in auth["bearer"]}
+            self.token = values.get("token")
+
+        scripts = {
+            event["listen"]: "\n".join(event["script"]["exec"])
+            for event in item.get("event", [])
+        }
+        prerequest = scripts.get("prerequest", "")
+        test = scripts.get("test", "")
+        self.prerequest_sets = _SET_FROM_VARIABLE.findall(prerequest)
+        self.response_sets = _SET_FROM_RESPONSE.findall(test)
+        self.variable_sets = _SET_FROM_VARIABLE.findall(test)
+
+        expected = {int(code) for code in _EXPECT_EQUAL.findall(test)}
+        for codes in _EXPECT_ONE_OF.findall(test):
+            expected.update(int(code) for code in codes.split(","))
+        if not expected:
+            expected = {int(code) for code in _CONDITION.findall(test)}
+        self.expected = expected
+
+
+def load_collection(path):
+    """Requêtes de la collection, dossiers aplatis dans l'ordre"""
+    collection = json.loads(Path(path).read_text(encoding="utf-8"))
+    auth = collection.get("auth")
+    steps = []
+
+    def walk(items):
+        for item in items:
+            if "item" in item:
+                walk(item["item"])
+            else:
+                steps.append(Step(item, auth))
+
+    walk(collection["item"])
+    return steps
+
+
+def load_environment(path, base_url=None):
+    """Variables d'environnement Postman (actives)"""
+    environment = json.loads(Path(path).read_text(encoding="utf-8"))
+    variables = {
+        entry["key"]: entry["value"]
+        for entry in environment.get("values", [])
+        if entry.get("enabled", True)
+    }
+    if base_url:
+        variables["base_url"] = base_url.rstrip("/")
+    return variables
+
+
+def substitute(text, variables, dynamic):
+    """Remplace les `{{variables}}` (imbrication comprise)"""
+    if text is None:
+        return None
+    for _ in range(5):
+        replaced = _VARIABLE.sub(
+            lambda match: str(
+                dynamic[match.group(1)]()
+                if match.group(1) in dynamic
+                else variables.get(match.group(1), match.group(0))
+            ),
+            text,
+        )
+        if replaced == text:
+            break
+        text = replaced
+    return text
+
+
+def lookup(data, path):
+    """Valeur de `response.a.b` dans une réponse JSON, None si absente"""
+    for key in path.split("."):
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data
+
+
+class StepStats:
+    """Mesures d'une requête de la collection"""
+
+    def __init__(self):
+        self.durations = []
+        self.statuses = Counter()
+        self.errors = 0
+        self.unexpected = 0
+        self.throttled = 0
+
+    def record(self, step, duration, status):
+        self.durations.append(duration)
+        self.statuses[status or "exception"] += 1
+        if status is None or status >= 500:
+            self.errors += 1
+        elif status == 429:
+            self.throttled += 1
+        elif step.expected and status not in step.expected:
+            self.unexpected += 1
+
+    def histogram(self):
+        counts = Counter()
+        for duration in self.durations:
+            bucket = next(
+                (f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS if duration <= bound),
+                "+inf",
+            )
+            counts[bucket] += 1
+        labels = [f"<={bound}" for bound in HISTOGRAM_BUCKETS_MS] + ["+inf"]
+        return {label: counts[label] for label in labels}
+
+    def report(self, elapsed):
+        count = len(self.durations)
+        return {
+            "count": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else None,
+            "error_rate": round(self.errors / count, 4) if count else 0,
+            "unexpected_rate": round(self.unexpected / count, 4) if count else 0,
+            "throttled": self.throttled,
+            "statuses": {str(status): n for status, n in self.statuses.items()},
+            **percentiles(self.durations),
+            "mean_ms": round(statistics.fmean(self.durations), 3) if count else None,
+            "histogram_ms": self.histogram(),
+        }
+
+
+class VirtualUser(threading.Thread):
+    """Rejoue la collection en boucle avec son propre environnement"""
+
+    def __init__(self, number, steps, environment, stats, lock, options):
+        super().__init__(daemon=True)
+        self.number = number
+        self.steps = steps
+        self.environment = environment
+        self.stats = stats
+        self.lock = lock
+        self.options = options
+        self.iteration = 0
+
+    def run(self):
+        options = self.options
+        time.sleep(options.start_delay * self.number)
+        session = requests.Session()
+        while (
+            self.iteration < options.iterations and time.monotonic() < options.deadline
+        ):
+            self.run_collection(session)
+            self.iteration += 1
+
+    def run_collection(self, session):
+        variables = dict(self.environment)
+        unique = f"{int(time.time())}{self.number:04d}{self.iteration:04d}"
+        dynamic = {
+            "$timestamp": lambda: unique,
+            "$guid": lambda: uuid.uuid4(),
+            "$randomInt": lambda: random.randint(0, 1000),
+        }
+
+        for index, step in enumerate(self.steps):
+            for name, source in step.prerequest_sets:
+                variables[name] = variables.get(source, "")
+
+            headers = {
+                key: substitute(value, variables, dynamic)
+                for key, value in step.headers.items()
+            }
+            if step.token:
+                headers["Authorization"] = (
+                    f"Bearer {substitute(step.token, variables, dynamic)}"
+                )
+
+            status, response = None, None
+            start = time.perf_counter()
+            try:
+                response = session.request(
+                    step.method,
+                    substitute(step.url, variables, dynamic),
+                    data=(substitute(step.body, variables, dynamic) or "").encode(),
+                    headers=headers,
+                    timeout=self.options.timeout,
+                )
+                status = response.status_code
+            except requests.RequestException:
+                pass
+            duration = (time.perf_counter() - start) * 1000
+
+            with self.lock:
+                self.stats[index].record(step, duration, status)
+
+            if response is not None and 200 <= status < 300:
+                self.apply_test_script(step, response, variables)
+
+    def apply_test_script(self, step, response, variables):
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        for name, path in step.response_sets:
+            value = lookup(data, path)
+            if value is not None:
+                variables[name] = value
+        for name, source in step.variable_sets:
+            variables[name] = variables.get(source, "")
+
+
+def print_report(steps, reports, elapsed, show_histogram):
+    total = sum(report["count"] for report in reports)
+    print(
+        f"\n{total} requêtes en {elapsed:.1f} s : {total / elapsed:.1f} req/s\n"
+        f"{'requête':<58} {'n':>6} {'req/s':>7} {'err%':>6} {'inat%':>6}"
+        f" {'429':>5} {'p50':>8} {'p95':>8} {'p99':>8}"
+    )
+    for step, report in zip(steps, reports):
+        if not report["count"]:
+            continue
+        print(
+            f"{step.method:<6} {step.name[:51]:<51} {report['count']:>6}"
+            f" {report['throughput_rps']:>7.1f} {report['error_rate'] * 100:>6.1f}"
+            f" {report['unexpected_rate'] * 100:>6.1f} {report['throttled']:>5}"
+            f" {report['p50_ms']:>8.1f} {report['p95_ms']:>8.1f}"
+            f" {report['p99_ms']:>8.1f}"
+        )
+        if show_histogram:
+            peak = max(report["histogram_ms"].values()) or 1
+            for label, count in report["histogram_ms"].items():
+                if count:
+                    bar = "#" * max(1, round(30 * count / peak))
+                    print(f"{'':>14}{label:>7} ms {count:>6} {bar}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--collection", type=Path, default=COLLECTION)
+    parser.add_argument("--environment", type=Path, default=ENVIRONMENT)
+    parser.add_argument("--users", type=int, default=10, help="Utilisateurs virtuels")
+    parser.add_argument(
+        "--ramp-up",
+        type=float,
+        default=0,
+        help="Durée (s) sur laquelle les utilisateurs démarrent progressivement",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=1, help="Passages de la collection"
+    )
+    parser.add_argument(
+        "--duration", type=float, help="Durée maximale (s), itérations comprises"
+    )
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--histogram", action="store_true")
+    parser.add_argument("--output", type=Path, help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    steps = load_collection(args.collection)
+    environment = load_environment(args.environment, args.base_url)
+    stats = [StepStats() for _ in steps]
+    lock = threading.Lock()
+
+    args.start_delay = args.ramp_up / args.users if args.users else 0
+    start = time.monotonic()
+    args.deadline = start + args.duration if args.duration else float("inf")
+
+    print(
+        f"{args.users} utilisateurs virtuels, montée en charge {args.ramp_up:g} s,"
+        f" {len(steps)} requêtes par itération, cible {args.base_url}"
+    )
+    users = [
+        VirtualUser(number, steps, environment, stats, lock, args)
+        for number in range(args.users)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - start
+
+    reports = [step_stats.report(elapsed) for step_stats in stats]
+    print_report(steps, reports, elapsed, args.histogram)
+
+    if args.output:
+        results = {
+            "meta": {
+                "base_url": args.base_url,
+                "users": args.users,
+                "ramp_up_s": args.ramp_up,
+                "iterations": args.iterations,
+                "elapsed_s": round(elapsed, 3),
+            },
+            "requests": [
+                {"name": step.name, "method": step.method, **report}
+                for step, report in zip(steps, reports)
+            ],
+        }
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+        print(f"Résultats écrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
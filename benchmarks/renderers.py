@@ -0,0 +1,92 @@
+"""
+Benchmark du rendu JSON sur des pages de 1000 lignes.
+
+Compare le JSONRenderer standard de DRF au FastJSONRenderer (orjson si
+installé) sur des pages d'issues et de commentaires au format des serializers.
+
+    poetry run python -m benchmarks.renderers [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import uuid
+from datetime import UTC, datetime, timedelta
+from functools import partial
+
+from benchmarks.common import measure, setup_django, summary
+
+
+def issue_page(rows):
+    """Page au format IssueSerializer"""
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    return {
+        "count": rows,
+        "next": None,
+        "previous": None,
+        "results": [
+            {
+                "id": i,
+                "name": f"Issue {i}",
+                "description": "Description détaillée de l'issue " * 5,
+                "priority": "MEDIUM",
+                "tag": "BUG",
+                "status": "In Progress",
+                "project": 1,
+                "author": {"id": i % 50, "username": f"user{i % 50}", "email": "a@b.c"},
+                "assigned_to": None,
+                "assigned_to_details": None,
+                "created_time": start + timedelta(minutes=i),
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def comment_page(rows):
+    """Page au format CommentSerializer"""
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    return {
+        "count": rows,
+        "next": None,
+        "previous": None,
+        "results": [
+            {
+                "id": uuid.UUID(int=i),
+                "description": "Un commentaire utile sur l'issue " * 3,
+                "project_id": 1,
+                "issue": i % 20,
+                "issue_name": f"Issue {i % 20}",
+                "author": {"id": i % 50, "username": f"user{i % 50}", "email": "a@b.c"},
+                "created_time": start + timedelta(seconds=i),
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+
+    from softdesk_support.renderers import FastJSONRenderer, orjson
+
+    print(f"orjson disponible : {orjson is not None}")
+    for name, page in [
+        ("issues", issue_page(args.rows)),
+        ("comments", comment_page(args.rows)),
+    ]:
+        stdlib = summary(measure(partial(JSONRenderer().render, page), args.repeat))
+        fast = summary(measure(partial(FastJSONRenderer().render, page), args.repeat))
+        speedup = stdlib["median_ms"] / fast["median_ms"]
+        print(
+            f"{name:<9} {args.rows} lignes : stdlib {stdlib['median_ms']:.2f} ms, "
+            f"rapide {fast['median_ms']:.2f} ms (x{speedup:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark des serializers compilés face aux serializers DRF.
+
+Sérialise une page de N lignes (requête comprise) pour chaque liste :
+projets, issues, commentaires et utilisateurs.
+
+    poetry run python -m benchmarks.serializers [--rows 1000] [--repeat 10]
+"""
+
+import argparse
+
+from benchmarks.common import measure, setup_django, summary, test_database
+
+
+def populate(rows):
+    """Crée `rows` lignes de chaque modèle avec bulk_create"""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+
+    from issues.models import Comment, Contributor, Issue, Project
+
+    User = get_user_model()
+    password = make_password("benchmark")
+    User.objects.bulk_create(
+        User(
+            username=f"user{i}", email=f"user{i}@example.com", password=password, age=30
+        )
+        for i in range(rows)
+    )
+    users = list(User.objects.order_by("id"))
+    Project.objects.bulk_create(
+        Project(
+            name=f"Projet {i}", description="Description", type="iOS", author=users[i]
+        )
+        for i in range(rows)
+    )
+    projects = list(Project.objects.order_by("id"))
+    Contributor.objects.bulk_create(
+        Contributor(project=projects[i], user=users[(i + k) % rows])
+        for i in range(rows)
+        for k in range(3)
+    )
+    Issue.objects.bulk_create(
+        Issue(
+            name=f"Issue {i}",
+            description="Description détaillée " * 10,
+            priority="HIGH",
+            tag="BUG",
+            project=projects[0],
+            author=users[i % 50],
+            assigned_to=users[i % 7] if i % 3 else None,
+        )
+        for i in range(rows)
+    )
+    issue = Issue.objects.order_by("id").first()
+    Comment.objects.bulk_create(
+        Comment(description="Commentaire " * 5, issue=issue, author=users[i % 50])
+        for i in range(rows)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+
+    from issues.models import Comment, Issue, Project
+    from issues.serializers import annotate_comment_summary
+    from issues.views import CommentViewSet, IssueViewSet, ProjectViewSet
+    from users.views import UserViewSet
+
+    User = get_user_model()
+    cases = [
+        ("projets", ProjectViewSet, Project.objects.select_related("author")),
+        (
+            "issues",
+            IssueViewSet,
+            # Champs calculés de IssueListSerializer
+            annotate_comment_summary(
+                Issue.objects.select_related("author"), latest=True
+            ),
+        ),
+        (
+            "commentaires",
+            CommentViewSet,
+            Comment.objects.select_related("author", "issue__project"),
+        ),
+        ("utilisateurs", UserViewSet, User.objects.all()),
+    ]
+
+    with test_database():
+        populate(args.rows)
+        for name, viewset, queryset in cases:
+            compiled = viewset.compiled_list_serializer
+            queryset = queryset.order_by("id")[: args.rows]
+
+            # Valeurs de l'itération liées à la définition (B023)
+            def drf(compiled=compiled, queryset=queryset):
+                return compiled.serializer_class(queryset, many=True).data
+
+            def fast(compiled=compiled, queryset=queryset):
+                return compiled.serialize(compiled.values(queryset))
+
+            drf_time = summary(measure(drf, args.repeat))
+            fast_time = summary(measure(fast, args.repeat))
+            per_row = drf_time["median_ms"] * 1000 / args.rows
+            fast_per_row = fast_time["median_ms"] * 1000 / args.rows
+            print(
+                f"{name:<13} DRF {drf_time['median_ms']:8.2f} ms ({per_row:.1f} µs/ligne)"
+                f"  compilé {fast_time['median_ms']:8.2f} ms ({fast_per_row:.1f} µs/ligne)"
+                f"  x{drf_time['median_ms'] / fast_time['median_ms']:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark des profils SQLite (softdesk_support/db.py) sous charge mixte.
+
+Pour chaque profil, une base fichier est générée avec `manage.py seed`, puis
+plusieurs threads enchaînent lectures (page d'issues d'un projet) et
+écritures (commentaire + mise à jour de l'issue, dans une transaction).
+Comme après une requête HTTP, `close_old_connections()` est appelé après
+chaque opération : sans `CONN_MAX_AGE`, chaque opération rouvre sa connexion.
+
+    poetry run python -m benchmarks.sqlite_profile [--concurrency 8]
+        [--operations 4000] [--write-ratio 0.2]
+"""
+
+import argparse
+import itertools
+import random
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.common import percentiles, setup_django, test_database
+
+SEED_SIZES = {"users": 500, "projects": 50, "issues": 5000, "comments": 20000}
+
+
+def apply_profile(connection, profile):
+    """Applique un profil à la connexion par défaut (threads compris)"""
+    from softdesk_support.db import sqlite_database
+
+    settings_dict = connection.settings_dict
+    settings_dict.pop("OPTIONS", None)
+    settings_dict.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False)
+    settings_dict.update(sqlite_database(settings_dict["NAME"], profile=profile))
+    settings_dict.setdefault("OPTIONS", {})
+    connection.close()
+
+
+def run(operations, concurrency, write_ratio, seed):
+    """Exécute la charge mixte ; retourne les statistiques par type d'opération"""
+    from django.db import DatabaseError, close_old_connections, connections, transaction
+
+    from issues.models import Comment, Issue, Project
+
+    project_ids = list(Project.objects.values_list("id", flat=True))
+    issues = list(Issue.objects.values_list("id", "author_id"))
+    counter = itertools.count()
+    lock = threading.Lock()
+    samples = {"read": [], "write": []}
+    errors = {"read": 0, "write": 0}
+
+    def read(rng):
+        list(
+            Issue.objects.filter(project_id=rng.choice(project_ids))
+            .select_related("author")
+            .order_by("-created_time")[:50]
+        )
+
+    def write(rng):
+        issue_id, author_id = rng.choice(issues)
+        with transaction.atomic():
+            Comment.objects.create(
+                description="Commentaire de charge",
+                issue_id=issue_id,
+                author_id=author_id,
+            )
+            Issue.objects.filter(pk=issue_id).update(status="In Progress")
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        try:
+            while next(counter) < operations:
+                kind = "write" if rng.random() < write_ratio else "read"
+                start = time.perf_counter()
+                try:
+                    (write if kind == "write" else read)(rng)
+                    ok = True
+                except DatabaseError:
+                    ok = False
+                finally:
+                    close_old_connections()
+                duration = (time.perf_counter() - start) * 1000
+                with lock:
+                    if ok:
+                        samples[kind].append(duration)
+                    else:
+                        errors[kind] += 1
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=worker, args=(index,)) for index in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        kind: {
+            "ops_per_s": round(len(samples[kind]) / elapsed, 1),
+            **percentiles(samples[kind]),
+            "errors": errors[kind],
+        }
+        for kind in samples
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--operations", type=int, default=4000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+
+    from softdesk_support.db import PROFILES
+
+    for profile in PROFILES:
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            test_database(Path(tmp) / f"{profile}.sqlite3") as connection,
+        ):
+            call_command("seed", seed=args.seed, stdout=StringIO(), **SEED_SIZES)
+            apply_profile(connection, profile)
+            results = run(
+                args.operations, args.concurrency, args.write_ratio, args.seed
+            )
+            apply_profile(connection, "development")
+
+        print(
+            f"{profile} ({args.concurrency} threads, {args.write_ratio:.0%} écritures)"
+        )
+        for kind, stats in results.items():
+            print(
+                f"  {kind:<6} {stats['ops_per_s']:8.1f} op/s"
+                f"  p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms"
+                f"  p99 {stats['p99_ms']:8.2f} ms  {stats['errors']} erreurs"
+            )
+
+
+if __name__ == "__main__":
+    main()
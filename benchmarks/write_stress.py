@@ -0,0 +1,237 @@
+"""
+Test de contention en écriture : N rédacteurs simultanés sur une base fichier.
+
+Chaque rédacteur (un thread, un utilisateur, une connexion) crée en boucle un
+projet, une issue et un commentaire par l'API (client de test DRF, JWT,
+middlewares compris). Avec `--processes N`, les rédacteurs sont répartis sur
+N processus (comme N workers) qui écrivent dans le même fichier. Le code de
+sortie vaut 1 si une requête échoue.
+
+    poetry run python -m benchmarks.write_stress [--writers 50] [--rounds 3]
+    poetry run python -m benchmarks.write_stress --writers 50 --processes 2
+    # Sans coordination (BEGIN différé, sans rejeu), pour comparaison
+    poetry run python -m benchmarks.write_stress --baseline
+"""
+
+import argparse
+import itertools
+import logging
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from benchmarks.common import percentiles, setup_django, test_database
+
+
+class RetryCounter(logging.Handler):
+    """Compte les tentatives rejouées par atomic_write"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+retries = RetryCounter()
+
+
+def disable_coordination():
+    """Comportement d'origine : BEGIN différé, sans rejeu"""
+    from django.conf import settings
+    from django.db import connections
+
+    settings.WRITE_SERIALIZE = False
+    settings.WRITE_RETRY_ATTEMPTS = 1
+    # Options partagées par les connexions de tous les threads
+    connections.settings["default"]["OPTIONS"].pop("transaction_mode", None)
+
+
+def write(users, project_id, issue_id, rounds):
+    """Lance un thread par utilisateur ; retourne (statuts, durées en ms)"""
+    from django.db import connections
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    statuses = Counter()
+    durations = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(users))
+    sequence = itertools.count()
+
+    def post(client, url, data):
+        start = time.perf_counter()
+        response = client.post(url, data, format="json")
+        with lock:
+            statuses[response.status_code] += 1
+            durations.append((time.perf_counter() - start) * 1000)
+        return response
+
+    def writer(user):
+        client = APIClient()
+        client.raise_request_exception = False
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        try:
+            barrier.wait()
+            for _ in range(rounds):
+                number = f"{user.pk}-{next(sequence)}"
+                post(
+                    client,
+                    "/api/projects/",
+                    {
+                        "name": f"Projet {number}",
+                        "description": "Projet de contention",
+                        "type": "back-end",
+                    },
+                )
+                response = post(
+                    client,
+                    f"/api/projects/{project_id}/issues/",
+                    {
+                        "name": f"Issue {number}",
+                        "description": "Issue de contention",
+                        "tag": "BUG",
+                    },
+                )
+                target = (
+                    response.data.get("id") if response.status_code == 201 else None
+                )
+                post(
+                    client,
+                    f"/api/projects/{project_id}/issues/{target or issue_id}/comments/",
+                    {"description": "Commentaire de contention"},
+                )
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=writer, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return statuses, durations
+
+
+def write_in_process(users, project_id, issue_id, rounds, barrier, results):
+    """Processus enfant : ses rédacteurs, résultats renvoyés par `results`"""
+    try:
+        barrier.wait()
+        statuses, durations = write(users, project_id, issue_id, rounds)
+    except Exception:
+        results.put((Counter({500: 1}), [], retries.count))
+        raise
+    results.put((statuses, durations, retries.count))
+
+
+def run(writers, rounds, processes=1):
+    """Lance les rédacteurs ; retourne (statuts, durées en ms, durée totale)"""
+    from django.contrib.auth import get_user_model
+    from django.db import connections
+
+    from issues.models import Contributor, Project
+
+    User = get_user_model()
+    User.objects.bulk_create(
+        User(username=f"writer_{index}", email=f"writer_{index}@example.com", age=30)
+        for index in range(writers)
+    )
+    users = list(User.objects.filter(username__startswith="writer_").order_by("id"))
+    shared = Project.objects.create(
+        name="Projet partagé",
+        description="Projet commun",
+        type="back-end",
+        author=users[0],
+    )
+    Contributor.objects.bulk_create(
+        Contributor(project=shared, user=user) for user in users[1:]
+    )
+    issue_id = shared.issues.create(
+        name="Issue initiale", description="Issue", tag="BUG", author=users[0]
+    ).id
+
+    start = time.perf_counter()
+    if processes == 1:
+        statuses, durations = write(users, shared.id, issue_id, rounds)
+        return statuses, durations, time.perf_counter() - start
+
+    # Processus dupliqués (fork) : réglages et base de test hérités, sans
+    # connexion ouverte partagée
+    connections.close_all()
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(processes)
+    results = context.Queue()
+    children = [
+        context.Process(
+            target=write_in_process,
+            args=(users[index::processes], shared.id, issue_id, rounds),
+            kwargs={"barrier": barrier, "results": results},
+        )
+        for index in range(processes)
+    ]
+    for child in children:
+        child.start()
+    statuses, durations = Counter(), []
+    for _ in children:
+        child_statuses, child_durations, child_retries = results.get()
+        statuses.update(child_statuses)
+        durations += child_durations
+        retries.count += child_retries
+    for child in children:
+        child.join()
+    return statuses, durations, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--baseline", action="store_true")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from rest_framework.throttling import SimpleRateThrottle
+
+    SimpleRateThrottle.THROTTLE_RATES.update(anon="1000000/s", user="1000000/s")
+    settings.NPLUSONE_MODE = "off"
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    logging.getLogger("softdesk_support.writes").addHandler(retries)
+    if args.baseline:
+        disable_coordination()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.THROTTLE_STORE_PATH = Path(tmp) / "throttle.sqlite3"
+        with test_database(Path(tmp) / "stress.sqlite3"):
+            statuses, durations, elapsed = run(
+                args.writers, args.rounds, args.processes
+            )
+
+    failures = sum(count for status, count in statuses.items() if status >= 400)
+    stats = percentiles(durations)
+    print(
+        f"{'Sans coordination' if args.baseline else 'atomic_write'} : "
+        f"{args.writers} rédacteurs ({args.processes} processus), "
+        f"{sum(statuses.values())} requêtes "
+        f"en {elapsed:.1f} s"
+    )
+    print(f"  statuts : {dict(sorted(statuses.items()))}")
+    print(
+        f"  p50 {stats['p50_ms']:.1f} ms  p95 {stats['p95_ms']:.1f} ms"
+        f"  p99 {stats['p99_ms']:.1f} ms  {retries.count} tentatives rejouées"
+    )
+    print(f"  {failures} échecs")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
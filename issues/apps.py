@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class IssuesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "issues"
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+
+        from softdesk_support.sharding import user_deleted, user_saved
+
+        # Utilisateurs recopiés sur les shards de projets
+        User = get_user_model()
+        post_save.connect(user_saved, sender=User, dispatch_uid="shard_user_saved")
+        post_delete.connect(
+            user_deleted, sender=User, dispatch_uid="shard_user_deleted"
+        )
@@ -0,0 +1,56 @@
+"""
+Tableau kanban d'un projet : issues regroupées par statut.
+
+La première page de toutes les colonnes et le total de chacune sont lus en
+une requête : `ROW_NUMBER() OVER (PARTITION BY status ORDER BY id)` numérote
+les issues de chaque colonne, seules les `limit` premières sont gardées, et
+`COUNT(*) OVER (PARTITION BY status)` donne le total de la colonne. La suite
+d'une colonne se charge avec une pagination par curseur (lien `next`).
+"""
+
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+from .models import Issue
+
+
+class BoardColumnPagination(CursorPagination):
+    """Pagination par curseur d'une colonne (`?status=...&cursor=...`)"""
+
+    ordering = "id"
+    page_size_query_param = "limit"
+    max_page_size = 50
+
+    def column_link(self, request, status, last_id):
+        """Lien vers la suite de la colonne `status` après l'issue `last_id`"""
+        self.base_url = replace_query_param(
+            request.build_absolute_uri(), "status", status
+        )
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=last_id))
+
+
+def board_statuses():
+    return [value for value, _ in Issue.STATUS_CHOICES]
+
+
+def first_rows(queryset, limit):
+    """
+    (colonnes, totaux) : les `limit` premières issues de chaque statut et le
+    nombre d'issues de chaque statut, en une requête
+    """
+    rows = (
+        queryset.annotate(
+            board_rank=Window(RowNumber(), partition_by=F("status"), order_by="id"),
+            board_total=Window(Count("id"), partition_by=F("status")),
+        )
+        .filter(board_rank__lte=limit)
+        .order_by("status", "id")
+    )
+    columns = {status: [] for status in board_statuses()}
+    totals = dict.fromkeys(board_statuses(), 0)
+    for issue in rows:
+        columns[issue.status].append(issue)
+        totals[issue.status] = issue.board_total
+    return columns, totals
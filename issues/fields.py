@@ -0,0 +1,58 @@
+"""
+Champs de modèle de l'application issues
+"""
+
+from django.core import exceptions
+from django.db import models
+from django.utils.functional import cached_property
+
+
+class CodedChoiceField(models.PositiveSmallIntegerField):
+    """
+    Choix stocké en petit entier : 1, 2, 3... dans l'ordre de `choices`.
+
+    En Python, dans les filtres et dans l'API, la valeur reste celle du choix
+    ("LOW", "In Progress"...) ; seule la base voit le code. L'ordre des choix
+    est donc l'ordre de tri (`order_by("-priority")` : HIGH, MEDIUM, LOW) et
+    des comparaisons (`priority__gte="MEDIUM"`).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.codes = {
+            value: code for code, (value, _) in enumerate(self.choices, start=1)
+        }
+        self.values = {code: value for value, code in self.codes.items()}
+
+    @cached_property
+    def validators(self):
+        # Pas de bornes entières : la valeur Python est le choix texte
+        return [*self.default_validators, *self._validators]
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return self.values[value]
+
+    def to_python(self, value):
+        if value is None or value in self.codes:
+            return value
+        if value in self.values:
+            return self.values[value]
+        raise exceptions.ValidationError(
+            self.error_messages["invalid_choice"],
+            code="invalid_choice",
+            params={"value": value},
+        )
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return value
+        if value in self.codes:
+            return self.codes[value]
+        if value in self.values:
+            return value
+        raise ValueError(
+            f"Field '{self.name}' expected one of {list(self.codes)} but got {value!r}."
+        )
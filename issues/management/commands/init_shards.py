@@ -0,0 +1,32 @@
+"""
+Prépare les shards de projets (softdesk_support.sharding).
+
+    python manage.py init_shards
+
+Pour chaque base de `SHARD_DATABASES` : migrations, compteurs d'identifiants
+placés dans la plage du shard et copie des utilisateurs. La commande peut
+être relancée (après l'ajout d'un shard par exemple).
+"""
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from softdesk_support.sharding import prepare_shard, shard_databases
+
+
+class Command(BaseCommand):
+    help = "Prépare les shards de projets (migrations, identifiants, utilisateurs)"
+
+    def handle(self, *args, **options):
+        shards = shard_databases()
+        if not shards:
+            raise CommandError("Aucun shard : définir DATABASE_SHARDS")
+        for alias in shards:
+            if connections[alias].vendor != "sqlite":
+                raise CommandError(f"{alias} : seul SQLite est pris en charge")
+
+        for alias in shards:
+            call_command("migrate", database=alias, verbosity=0, interactive=False)
+            prepare_shard(alias)
+            self.stdout.write(f"{alias} prêt")
@@ -0,0 +1,39 @@
+"""
+Déplace un projet (contributeurs, issues, commentaires) vers un autre shard.
+
+    python manage.py move_project <project_id> <base>
+
+Les lignes sont copiées avec leurs identifiants, la carte des shards est mise
+à jour puis le projet est supprimé de sa base d'origine. Les écritures sur le
+projet attendent la fin du déplacement.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from issues.models import Project
+from softdesk_support.sharding import locations, move_project
+
+
+class Command(BaseCommand):
+    help = "Déplace un projet et ses données vers un autre shard"
+
+    def add_arguments(self, parser):
+        parser.add_argument("project_id", type=int)
+        parser.add_argument("database", help="Alias de la base cible")
+
+    def handle(self, *args, **options):
+        target = options["database"]
+        if target not in locations():
+            raise CommandError(
+                f"Base inconnue : {target} (choix : {', '.join(locations())})"
+            )
+        try:
+            source = move_project(options["project_id"], target)
+        except Project.DoesNotExist:
+            raise CommandError(f"Projet {options['project_id']} introuvable")
+        if source == target:
+            self.stdout.write(f"Projet déjà sur {target}")
+        else:
+            self.stdout.write(
+                f"Projet {options['project_id']} déplacé de {source} vers {target}"
+            )
@@ -0,0 +1,273 @@
+"""
+Génère un jeu de données synthétique pour les tests de charge.
+
+    python manage.py seed --users 10000 --projects 2000 --issues 200000 \
+        --comments 1000000 --seed 42
+
+Les tailles suivent des lois à queue lourde (Pareto) : quelques projets
+concentrent la majorité des contributeurs et des issues, quelques issues la
+majorité des commentaires. Les lignes sont insérées avec `bulk_create` par
+lots, avec des clés primaires calculées à l'avance : aucune relecture, pas de
+`full_clean()` ni de `Project.save()`. Avec la même graine et la même base de
+départ, le contenu généré est identique.
+"""
+
+import itertools
+import random
+import time
+import uuid
+from array import array
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+
+from issues.models import Comment, Contributor, Issue, Project
+
+User = get_user_model()
+
+# Mot de passe de tous les utilisateurs générés (haché une seule fois)
+PASSWORD = "SeedPass123!"
+USERNAME_PREFIX = "seed_user_"
+
+# alpha = 1.16 : environ 20 % des projets reçoivent 80 % des issues
+PARETO_ALPHA = 1.16
+
+SENTENCES = [
+    "Le formulaire de connexion ne valide pas l'adresse e-mail.",
+    "Ajouter la pagination sur l'écran de recherche.",
+    "Les notifications push arrivent en double sur Android.",
+    "Mettre à jour la documentation de l'API publique.",
+    "Le temps de réponse de la liste des commandes dépasse deux secondes.",
+    "Prévoir un export CSV des rapports mensuels.",
+    "L'application plante au retour de l'arrière-plan sur iOS.",
+    "Revoir les contrastes de la page d'accueil.",
+]
+
+
+def pareto_weights(rng, count):
+    """Poids à queue lourde, un par élément"""
+    return [rng.paretovariate(PARETO_ALPHA) for _ in range(count)]
+
+
+class Command(BaseCommand):
+    help = "Génère des utilisateurs, projets, contributeurs, issues et commentaires"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--projects", type=int, default=200)
+        parser.add_argument(
+            "--contributors",
+            type=int,
+            default=5,
+            help="Nombre moyen de contributeurs par projet (auteur compris)",
+        )
+        parser.add_argument("--issues", type=int, default=5000)
+        parser.add_argument("--comments", type=int, default=20000)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=20000)
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Vide projets, contributeurs, issues et commentaires, et "
+            "supprime les utilisateurs générés, avant la génération",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size doit être positif")
+        if options["projects"] and not options["users"]:
+            raise CommandError("Des projets nécessitent au moins un utilisateur")
+        if options["comments"] and not options["issues"]:
+            raise CommandError("Des commentaires nécessitent au moins une issue")
+        if options["issues"] and not options["projects"]:
+            raise CommandError("Des issues nécessitent au moins un projet")
+
+        self.batch_size = options["batch_size"]
+        self.verbosity = options["verbosity"]
+        self.rng = random.Random(options["seed"])
+        start = time.perf_counter()
+
+        if connection.vendor == "sqlite" and not connection.in_atomic_block:
+            # Chargement en masse : pas de fsync à chaque lot (connexion de la
+            # commande uniquement)
+            with connection.cursor() as cursor:
+                cursor.execute("PRAGMA synchronous = OFF")
+
+        if options["flush"]:
+            self.flush()
+
+        user_ids = self.create_users(options["users"])
+        members = self.create_projects(
+            options["projects"], options["contributors"], user_ids
+        )
+        issue_projects, issue_weights = self.create_issues(options["issues"], members)
+        self.create_comments(
+            options["comments"], members, issue_projects, issue_weights
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Jeu de données généré en {time.perf_counter() - start:.1f} s"
+            )
+        )
+
+    def flush(self):
+        """Vide les tables de l'application puis les utilisateurs générés"""
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model in (Comment, Issue, Contributor, Project):
+                cursor.execute(
+                    f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}"
+                )
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+    def next_pk(self, model):
+        """Première clé primaire libre d'un modèle à clé entière"""
+        return (model.objects.aggregate(last=Max("pk"))["last"] or 0) + 1
+
+    def insert(self, model, objects, total):
+        """Insère les objets par lots, une transaction par lot"""
+        start = time.perf_counter()
+        inserted = 0
+        while True:
+            batch = list(itertools.islice(objects, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            inserted += len(batch)
+            if self.verbosity > 1:
+                self.stdout.write(f"  {model.__name__} : {inserted}/{total}")
+
+        duration = time.perf_counter() - start
+        rate = inserted / duration if duration else 0
+        self.stdout.write(
+            f"{model.__name__} : {inserted} lignes en {duration:.1f} s "
+            f"({rate:,.0f} lignes/s)"
+        )
+
+    def create_users(self, count):
+        first = self.next_pk(User)
+        password = make_password(PASSWORD)
+        rng = self.rng
+
+        def objects():
+            for pk in range(first, first + count):
+                yield User(
+                    id=pk,
+                    username=f"{USERNAME_PREFIX}{pk}",
+                    email=f"{USERNAME_PREFIX}{pk}@example.com",
+                    password=password,
+                    age=rng.randint(15, 80),
+                    can_be_contacted=rng.random() < 0.4,
+                    can_data_be_shared=rng.random() < 0.3,
+                )
+
+        self.insert(User, objects(), count)
+        return range(first, first + count)
+
+    def create_projects(self, count, mean_contributors, user_ids):
+        """Crée les projets et leurs contributeurs ; retourne les membres"""
+        rng = self.rng
+        first = self.next_pk(Project)
+        weights = pareto_weights(rng, count)
+        mean_weight = sum(weights) / count if count else 1
+        types = [value for value, _ in Project.PROJECT_TYPES]
+
+        # Membres de chaque projet, auteur en premier
+        members = []
+        authors = []
+        for weight in weights:
+            author = rng.choice(user_ids)
+            size = round(mean_contributors * weight / mean_weight)
+            size = max(1, min(len(user_ids), size))
+            others = sorted(set(rng.sample(user_ids, size)) - {author})
+            members.append(array("q", [author] + others[: size - 1]))
+            authors.append(author)
+
+        self.insert(
+            Project,
+            (
+                Project(
+                    id=first + index,
+                    name=f"Projet {first + index}",
+                    description=rng.choice(SENTENCES),
+                    type=rng.choice(types),
+                    author_id=author,
+                )
+                for index, author in enumerate(authors)
+            ),
+            count,
+        )
+        self.insert(
+            Contributor,
+            (
+                Contributor(project_id=first + index, user_id=user_id)
+                for index, project_members in enumerate(members)
+                for user_id in project_members
+            ),
+            sum(len(project_members) for project_members in members),
+        )
+        self.first_project = first
+        return members
+
+    def create_issues(self, count, members):
+        """
+        Crée les issues, réparties selon le poids des projets ; retourne le
+        projet (index) et le poids de chaque issue
+        """
+        rng = self.rng
+        first = self.next_pk(Issue)
+        project_weights = list(itertools.accumulate(pareto_weights(rng, len(members))))
+        priorities = [value for value, _ in Issue.PRIORITY_CHOICES]
+        tags = [value for value, _ in Issue.TAG_CHOICES]
+        statuses = [value for value, _ in Issue.STATUS_CHOICES]
+
+        issue_projects = array("q")
+        issue_weights = array("d")
+        total_weight = 0.0
+
+        def objects():
+            nonlocal total_weight
+            for pk in range(first, first + count):
+                index = rng.choices(range(len(members)), cum_weights=project_weights)[0]
+                project_members = members[index]
+                issue_projects.append(index)
+                total_weight += rng.paretovariate(PARETO_ALPHA)
+                issue_weights.append(total_weight)
+                yield Issue(
+                    id=pk,
+                    name=f"Issue {pk}",
+                    description=rng.choice(SENTENCES),
+                    priority=rng.choices(priorities, weights=[5, 3, 2])[0],
+                    tag=rng.choice(tags),
+                    status=rng.choices(statuses, weights=[3, 2, 5])[0],
+                    project_id=self.first_project + index,
+                    author_id=rng.choice(project_members),
+                    assigned_to_id=(
+                        rng.choice(project_members) if rng.random() < 0.7 else None
+                    ),
+                )
+
+        self.insert(Issue, objects(), count)
+        self.first_issue = first
+        return issue_projects, issue_weights
+
+    def create_comments(self, count, members, issue_projects, issue_weights):
+        """Crée les commentaires, concentrés sur quelques issues"""
+        rng = self.rng
+        issues = range(len(issue_projects))
+
+        def objects():
+            for _ in range(count):
+                index = rng.choices(issues, cum_weights=issue_weights)[0]
+                yield Comment(
+                    id=uuid.UUID(int=rng.getrandbits(128), version=4),
+                    description=rng.choice(SENTENCES),
+                    issue_id=self.first_issue + index,
+                    author_id=rng.choice(members[issue_projects[index]]),
+                )
+
+        self.insert(Comment, objects(), count)
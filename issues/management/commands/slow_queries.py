@@ -0,0 +1,94 @@
+"""
+Rapport du journal des requêtes SQL lentes (softdesk_support.slowqueries).
+
+    python manage.py slow_queries [--log logs/slow_queries.jsonl] [--top 10]
+        [--sort total|count|max]
+
+Les requêtes sont regroupées par forme normalisée. Pour chaque forme :
+nombre d'exécutions, durées totale / moyenne / maximale, actions et sites
+d'appel concernés, et plan d'exécution de l'exécution la plus lente.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from softdesk_support.slowqueries import read_log
+
+SORT_KEYS = {
+    "total": lambda group: group["total_ms"],
+    "count": lambda group: group["count"],
+    "max": lambda group: group["slowest"]["duration_ms"],
+}
+
+
+def aggregate(records):
+    """Regroupe les enregistrements par forme de requête"""
+    groups = {}
+    for record in records:
+        group = groups.get(record["fingerprint"])
+        if group is None:
+            group = groups[record["fingerprint"]] = {
+                "fingerprint": record["fingerprint"],
+                "count": 0,
+                "total_ms": 0.0,
+                "views": Counter(),
+                "call_sites": Counter(),
+                "slowest": record,
+            }
+        group["count"] += 1
+        group["total_ms"] += record["duration_ms"]
+        if record.get("view"):
+            label = record["view"]
+            if record.get("action"):
+                label = f"{label}.{record['action']}"
+            group["views"][label] += 1
+        if record.get("call_site"):
+            group["call_sites"][record["call_site"]] += 1
+        if record["duration_ms"] > group["slowest"]["duration_ms"]:
+            group["slowest"] = record
+    return list(groups.values())
+
+
+class Command(BaseCommand):
+    help = "Agrège le journal des requêtes SQL lentes par forme de requête"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log", default=None, help="Journal JSONL à analyser")
+        parser.add_argument("--top", type=int, default=10)
+        parser.add_argument("--sort", choices=sorted(SORT_KEYS), default="total")
+
+    def handle(self, *args, **options):
+        path = options["log"] or settings.SLOW_QUERY_LOG_PATH
+        try:
+            groups = aggregate(read_log(path))
+        except FileNotFoundError:
+            raise CommandError(f"Journal introuvable : {path}")
+        if not groups:
+            self.stdout.write("Aucune requête lente journalisée")
+            return
+
+        groups.sort(key=SORT_KEYS[options["sort"]], reverse=True)
+        total = sum(group["count"] for group in groups)
+        self.stdout.write(
+            f"{total} requêtes lentes, {len(groups)} formes distinctes ({path})"
+        )
+        for rank, group in enumerate(groups[: options["top"]], start=1):
+            slowest = group["slowest"]
+            self.stdout.write("")
+            self.stdout.write(
+                self.style.MIGRATE_HEADING(
+                    f"#{rank}  {group['count']} exécutions"
+                    f"  total {group['total_ms']:.1f} ms"
+                    f"  moyenne {group['total_ms'] / group['count']:.1f} ms"
+                    f"  max {slowest['duration_ms']:.1f} ms"
+                )
+            )
+            self.stdout.write(f"  {group['fingerprint']}")
+            for label, count in group["views"].most_common(3):
+                self.stdout.write(f"  action : {label} ({count})")
+            for site, count in group["call_sites"].most_common(3):
+                self.stdout.write(f"  depuis : {site} ({count})")
+            for line in slowest.get("plan") or []:
+                self.stdout.write(f"  plan   : {line}")
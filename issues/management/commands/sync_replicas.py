@@ -0,0 +1,60 @@
+"""
+Copie la base principale SQLite vers les réplicas en lecture.
+
+    python manage.py sync_replicas [--interval 5]
+
+La copie utilise l'API de sauvegarde de SQLite : cohérente même pendant des
+écritures, et les lecteurs du réplica voient l'ancienne ou la nouvelle copie,
+jamais un état intermédiaire. Avec `--interval`, la copie est répétée en
+boucle, ce qui simule localement une réplication avec retard.
+"""
+
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def sync_replica(alias, source=DEFAULT_DB_ALIAS):
+    """Remplace le contenu du réplica `alias` par celui de `source`"""
+    primary = connections[source]
+    primary.ensure_connection()
+    target = sqlite3.connect(connections[alias].settings_dict["NAME"])
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
+
+
+class Command(BaseCommand):
+    help = "Copie la base principale SQLite vers les réplicas en lecture"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Répète la copie toutes les N secondes (Ctrl+C pour arrêter)",
+        )
+
+    def handle(self, *args, **options):
+        replicas = getattr(settings, "REPLICA_DATABASES", [])
+        if not replicas:
+            raise CommandError("Aucun réplica : définir DATABASE_REPLICAS")
+        for alias in [DEFAULT_DB_ALIAS, *replicas]:
+            if connections[alias].vendor != "sqlite":
+                raise CommandError(f"{alias} : seul SQLite est pris en charge")
+
+        while True:
+            start = time.perf_counter()
+            for alias in replicas:
+                sync_replica(alias)
+            self.stdout.write(
+                f"{len(replicas)} réplica(s) synchronisé(s) en "
+                f"{(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
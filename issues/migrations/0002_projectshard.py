@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issues", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectShard",
+            fields=[
+                (
+                    "project_id",
+                    models.PositiveBigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("database", models.CharField(max_length=100)),
+            ],
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+import issues.fields
+
+# Valeurs texte dans l'ordre des codes 1, 2, 3 (voir issues/fields.py)
+CHOICES = {
+    "priority": ["LOW", "MEDIUM", "HIGH"],
+    "tag": ["BUG", "FEATURE", "TASK"],
+    "status": ["To Do", "In Progress", "Finished"],
+}
+
+
+def check_values(expected):
+    """
+    Vérification avant le CASE, qui mettrait NULL à la place d'une valeur
+    inconnue (et ferait échouer la reconstruction NOT NULL de la table)
+    """
+
+    def check(apps, schema_editor):
+        with schema_editor.connection.cursor() as cursor:
+            for column, values in expected.items():
+                placeholders = ", ".join(["%s"] * len(values))
+                cursor.execute(
+                    f"SELECT DISTINCT {column} FROM issues_issue "
+                    f"WHERE {column} NOT IN ({placeholders})",
+                    [str(value) for value in values],
+                )
+                unknown = sorted(str(row[0]) for row in cursor.fetchall())
+                if unknown:
+                    raise ValueError(
+                        f"issues_issue.{column} : valeurs inconnues "
+                        f"{', '.join(unknown)} (attendues : "
+                        f"{', '.join(map(str, values))}), à corriger avant "
+                        "la migration"
+                    )
+
+    return check
+
+
+CODES = {column: list(range(1, len(values) + 1)) for column, values in CHOICES.items()}
+
+
+def case(column, pairs):
+    whens = " ".join(f"WHEN '{old}' THEN '{new}'" for old, new in pairs)
+    return f"{column} = CASE {column} {whens} END"
+
+
+def to_codes():
+    """Texte -> code, tant que les colonnes sont encore des chaînes"""
+    return "UPDATE issues_issue SET " + ", ".join(
+        case(column, [(value, code) for code, value in enumerate(values, 1)])
+        for column, values in CHOICES.items()
+    )
+
+
+def to_values():
+    """Code -> texte, une fois les colonnes redevenues des chaînes"""
+    return "UPDATE issues_issue SET " + ", ".join(
+        case(column, [(code, value) for code, value in enumerate(values, 1)])
+        for column, values in CHOICES.items()
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issues", "0002_projectshard"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(check_values(CHOICES), migrations.RunPython.noop),
+        # Les colonnes changent ensuite de type : les codes '1', '2'... écrits
+        # en texte sont convertis en entiers
+        migrations.RunSQL(to_codes(), reverse_sql=to_values()),
+        # Retour arrière : codes vérifiés avant le CASE inverse
+        migrations.RunPython(migrations.RunPython.noop, check_values(CODES)),
+        migrations.AlterField(
+            model_name="issue",
+            name="priority",
+            field=issues.fields.CodedChoiceField(
+                choices=[("LOW", "Low"), ("MEDIUM", "Medium"), ("HIGH", "High")],
+                default="LOW",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="status",
+            field=issues.fields.CodedChoiceField(
+                choices=[
+                    ("To Do", "To Do"),
+                    ("In Progress", "In Progress"),
+                    ("Finished", "Finished"),
+                ],
+                default="To Do",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issue",
+            name="tag",
+            field=issues.fields.CodedChoiceField(
+                choices=[("BUG", "Bug"), ("FEATURE", "Feature"), ("TASK", "Task")]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["project", "priority", "id"], name="issue_project_priority_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("issues", "0003_coded_choices"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["issue", "created_time"], name="comment_issue_created_idx"
+            ),
+        ),
+    ]
@@ -2,6 +2,8 @@ import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from .fields import CodedChoiceField
+
 User = get_user_model()
 
 
@@ -96,9 +98,10 @@ class Issue(models.Model):
 
     name = models.CharField(max_length=200)
     description = models.TextField()
-    priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default="LOW")
-    tag = models.CharField(max_length=10, choices=TAG_CHOICES)
-    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default="To Do")
+    # Stockés en petits entiers dans l'ordre des choix (voir issues/fields.py)
+    priority = CodedChoiceField(choices=PRIORITY_CHOICES, default="LOW")
+    tag = CodedChoiceField(choices=TAG_CHOICES)
+    status = CodedChoiceField(choices=STATUS_CHOICES, default="To Do")
     project = models.ForeignKey(
         Project, on_delete=models.CASCADE, related_name="issues"
     )
@@ -115,6 +118,15 @@ class Issue(models.Model):
     )
     created_time = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Tri par sévérité des issues d'un projet (?ordering=-priority)
+            models.Index(
+                fields=["project", "priority", "id"],
+                name="issue_project_priority_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.project.name}"
 
@@ -136,5 +148,26 @@ class Comment(models.Model):
     )
     created_time = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Dernier commentaire de chaque issue (latest_comment)
+            models.Index(
+                fields=["issue", "created_time"], name="comment_issue_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"Comment on {self.issue.name} by {self.author.username}"
+
+
+class ProjectShard(models.Model):
+    """
+    Projets déplacés vers un autre shard que celui de leur identifiant
+    (voir softdesk_support/sharding.py), toujours stockés sur `default`
+    """
+
+    project_id = models.PositiveBigIntegerField(primary_key=True)
+    database = models.CharField(max_length=100)
+
+    def __str__(self):
+        return f"Projet {self.project_id} -> {self.database}"
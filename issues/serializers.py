@@ -1,10 +1,21 @@
+import uuid
+from datetime import UTC
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, JSONObject, Substr
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from softdesk_support.sharding import fan_out
 from users.serializers import UserSerializer, UserMiniSerializer
 from .models import Project, Contributor, Issue, Comment
 
 User = get_user_model()
 
+# Longueur de l'aperçu du dernier commentaire dans la liste des issues
+COMMENT_PREVIEW_LENGTH = 100
+
 
 class ContributorSerializer(serializers.ModelSerializer):
     """Serializer pour afficher les contributeurs d'un projet"""
@@ -102,7 +113,11 @@ class ProjectSerializer(serializers.ModelSerializer):
     def get_contributors(self, obj):
         """Retourne la liste des utilisateurs contributeurs"""
         # Récupérer les users via la relation Contributor
-        users = User.objects.filter(contributor__project=obj)
+        users = User.objects.using(obj._state.db).filter(contributor__project=obj)
+        included = self.context.get("included_users")
+        if included is not None:
+            # Format normalisé (?include=users) : identifiants seulement
+            return [included.add(user) for user in users]
         return UserSerializer(users, many=True).data
 
 
@@ -132,8 +147,28 @@ class ProjectListSerializer(serializers.ModelSerializer):
 
     def get_contributors_names(self, obj):
         """Retourne la liste des noms des contributeurs"""
-        # Optimisation : utiliser values_list pour éviter de charger tout l'objet
-        return list(obj.contributors.values_list("user__username", flat=True))
+        # Utilise le prefetch "contributors__user" du ViewSet (pas de requête
+        # par projet)
+        return [contributor.user.username for contributor in obj.contributors.all()]
+
+
+def project_contributors_summary(project_ids):
+    """
+    Nombre et noms des contributeurs de plusieurs projets en une seule requête
+    (champs calculés de ProjectListSerializer pour le serializer compilé)
+    """
+    summary = {
+        pk: {"contributors_count": 0, "contributors_names": []} for pk in project_ids
+    }
+    contributors = fan_out(
+        Contributor.objects.filter(project_id__in=project_ids)
+        .order_by("id")
+        .values_list("project_id", "user__username")
+    )
+    for project_id, username in contributors:
+        summary[project_id]["contributors_count"] += 1
+        summary[project_id]["contributors_names"].append(username)
+    return summary
 
 
 class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
@@ -170,14 +205,92 @@ class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
+class LatestCommentField(serializers.Field):
+    """
+    Aperçu du dernier commentaire d'une issue, à partir de l'objet JSON
+    annoté par `annotate_comment_summary`
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+        self.created_time = serializers.DateTimeField()
+
+    def to_representation(self, value):
+        # Le JSON de la base contient l'UUID et la date sous forme de texte
+        created_time = parse_datetime(value["created_time"])
+        if timezone.is_naive(created_time):
+            created_time = timezone.make_aware(created_time, UTC)
+        return {
+            "id": str(uuid.UUID(value["id"])),
+            "author": value["author"],
+            "description": value["description"],
+            "created_time": self.created_time.to_representation(created_time),
+        }
+
+
+def annotate_comment_summary(queryset, count=True, latest=False):
+    """
+    Nombre de commentaires (`comments_count`) et aperçu du dernier
+    (`latest_comment`) de chaque issue, par sous-requêtes corrélées : seules
+    les issues de la page sont concernées et aucun commentaire n'est chargé
+    """
+    comments = Comment.objects.filter(issue=OuterRef("pk")).order_by()
+    if count:
+        queryset = queryset.annotate(
+            comments_count=Coalesce(
+                Subquery(
+                    comments.values("issue").annotate(count=Count("pk")).values("count")
+                ),
+                0,
+            )
+        )
+    if latest:
+        queryset = queryset.annotate(
+            latest_comment=Subquery(
+                comments.order_by("-created_time", "-pk").values(
+                    preview=JSONObject(
+                        id="id",
+                        author="author__username",
+                        description=Substr("description", 1, COMMENT_PREVIEW_LENGTH),
+                        created_time="created_time",
+                    )
+                )[:1]
+            )
+        )
+    return queryset
+
+
 class IssueListSerializer(serializers.ModelSerializer):
     """Serializer simplifié pour la liste des issues"""
 
     author = serializers.CharField(source="author.username", read_only=True)
+    # Annotations de annotate_comment_summary
+    comments_count = serializers.IntegerField(read_only=True)
+    latest_comment = LatestCommentField(allow_null=True)
 
     class Meta:
         model = Issue
-        fields = ["id", "name", "priority", "tag", "status", "author", "created_time"]
+        fields = [
+            "id",
+            "name",
+            "priority",
+            "tag",
+            "status",
+            "author",
+            "created_time",
+            "comments_count",
+            "latest_comment",
+        ]
+
+
+class IssueBoardSerializer(IssueListSerializer):
+    """Issue d'une colonne du tableau kanban, sans aperçu du dernier commentaire"""
+
+    class Meta(IssueListSerializer.Meta):
+        fields = [
+            name for name in IssueListSerializer.Meta.fields if name != "latest_comment"
+        ]
 
 
 class IssueSerializer(serializers.ModelSerializer):
@@ -262,3 +375,40 @@ class CommentSerializer(serializers.ModelSerializer):
                 "Le commentaire ne peut pas dépasser 2000 caractères."
             )
         return value.strip()
+
+
+# Objets liés renvoyés par ?expand= (softdesk_support/expand.py) : les
+# relations y restent des identifiants, dépliables à leur tour
+
+
+class ProjectMiniSerializer(serializers.ModelSerializer):
+    """Projet d'une issue dépliée"""
+
+    class Meta:
+        model = Project
+        fields = ["id", "name", "type", "author", "created_time"]
+
+
+class IssueMiniSerializer(serializers.ModelSerializer):
+    """Issue d'un projet déplié"""
+
+    class Meta:
+        model = Issue
+        fields = [
+            "id",
+            "name",
+            "priority",
+            "tag",
+            "status",
+            "author",
+            "assigned_to",
+            "created_time",
+        ]
+
+
+class CommentMiniSerializer(serializers.ModelSerializer):
+    """Commentaire d'une issue dépliée"""
+
+    class Meta:
+        model = Comment
+        fields = ["id", "description", "author", "created_time"]
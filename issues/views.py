@@ -6,13 +6,22 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from softdesk_support.compiled import CompiledListMixin, CompiledSerializer
+from softdesk_support.expand import ExpandMixin, Expansion
+from softdesk_support.fieldsets import SparseFieldsetMixin
+from softdesk_support.normalize import NormalizedUsersMixin
+from softdesk_support.filters import StableOrderingFilter
+from softdesk_support.sharding import fan_out
+from softdesk_support.throttling import RateLimitHeadersMixin
+from softdesk_support.writes import atomic_write
+from users.serializers import UserMiniSerializer, UserSerializer
 
 from .permissions import (
     IsProjectAuthorOrContributor,
     IsProjectContributorOrObjectAuthorOrReadOnly,
 )
 
+from .board import BoardColumnPagination, board_statuses, first_rows
 from .models import Project, Contributor, Issue, Comment
 from .serializers import (
     ProjectSerializer,
@@ -20,28 +29,96 @@ from .serializers import (
     ProjectCreateUpdateSerializer,
     IssueSerializer,
     IssueListSerializer,
+    IssueBoardSerializer,
     CommentSerializer,
     ContributorSerializer,
     AddContributorSerializer,
+    CommentMiniSerializer,
+    IssueMiniSerializer,
+    ProjectMiniSerializer,
+    annotate_comment_summary,
+    project_contributors_summary,
 )
 
 User = get_user_model()
 
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(
+    NormalizedUsersMixin,
+    ExpandMixin,
+    SparseFieldsetMixin,
+    CompiledListMixin,
+    RateLimitHeadersMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet pour les projets"""
 
     permission_classes = [IsAuthenticated, IsProjectAuthorOrContributor]
+    # GREEN CODE: liste construite depuis values_list(), sans instances
+    compiled_list_serializer = CompiledSerializer(
+        ProjectListSerializer,
+        extra=project_contributors_summary,
+        extra_fields=["contributors_count", "contributors_names"],
+    )
+    # Relations utilisées par les champs calculés (pour ?fields= / ?omit=)
+    sparse_field_relations = {
+        "contributors_count": ["contributors"],
+        "contributors_names": ["contributors"],
+    }
+    # ?expand= : une requête par relation pour toute la page
+    expandable_fields = {
+        "author": Expansion(UserMiniSerializer),
+        "contributors": Expansion(
+            ContributorSerializer,
+            many=True,
+            queryset=lambda: Contributor.objects.select_related("user"),
+        ),
+        "issues": Expansion(
+            IssueMiniSerializer,
+            many=True,
+            expandable={
+                "author": Expansion(UserMiniSerializer),
+                "assigned_to": Expansion(UserMiniSerializer),
+            },
+        ),
+    }
+    # ?include=users : chaque utilisateur une seule fois dans included.users
+    normalized_user_fields = ("author",)
+    included_user_serializer = UserSerializer
+    # Coût de chaque action débité du budget de throttling
+    throttle_costs = {
+        "list": 3,
+        "retrieve": 2,
+        "create": 3,
+        "update": 2,
+        "partial_update": 2,
+        "destroy": 5,  # Suppression en cascade des issues et commentaires
+        "add_contributor": 2,
+        "board": 2,
+    }
 
     def get_queryset(self):
         """Retourne uniquement les projets où l'utilisateur est contributeur"""
-        return (
+        queryset = (
             Project.objects.filter(contributors__user=self.request.user)
             .select_related("author")
             .prefetch_related("contributors__user")
             .distinct()
             .order_by("id")
         )  # Ajouter order_by
+        if self.action == "list":
+            # Shards : projets de toutes les bases, fusionnés par id
+            return fan_out(queryset)
+        if self.action == "board":
+            # Seuls le projet et son auteur (permissions) sont utilisés
+            return queryset.prefetch_related(None)
+        return queryset
+
+    def get_normalized_user_fields(self):
+        # La liste ne contient que des noms (author_username, contributors_names)
+        if self.action == "list":
+            return ()
+        return super().get_normalized_user_fields()
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -71,13 +148,13 @@ class ProjectViewSet(viewsets.ModelViewSet):
             output_serializer.data, status=status.HTTP_201_CREATED, headers=headers
         )
 
-    @transaction.atomic
+    @atomic_write
     def perform_create(self, serializer):
         """Création atomique du projet et du contributeur"""
         serializer.save(author=self.request.user)
         # Le contributeur est créé automatiquement dans Project.save()
 
-    @transaction.atomic
+    @atomic_write
     @action(detail=True, methods=["post"])
     def add_contributor(self, request, pk=None):
         """Ajout atomique d'un contributeur"""
@@ -100,36 +177,87 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=["get"])
+    def board(self, request, pk=None):
+        """
+        Tableau kanban : premières issues et total de chaque statut en une
+        requête (voir issues/board.py). `?status=...&cursor=...` renvoie la
+        suite d'une colonne, `?limit=` la taille des pages.
+        """
+        project = self.get_object()
+        issues = annotate_comment_summary(
+            Issue.objects.filter(project=project).select_related("author")
+        )
+        paginator = BoardColumnPagination()
+
+        column_status = request.query_params.get("status")
+        if column_status is not None:
+            if column_status not in board_statuses():
+                raise ValidationError({"status": f"Statut inconnu : {column_status}"})
+            page = paginator.paginate_queryset(
+                issues.filter(status=column_status), request, view=self
+            )
+            return Response(
+                {
+                    "status": column_status,
+                    "results": IssueBoardSerializer(page, many=True).data,
+                    "next": paginator.get_next_link(),
+                }
+            )
+
+        columns, totals = first_rows(issues, paginator.get_page_size(request))
+        return Response(
+            {
+                "columns": [
+                    {
+                        "status": column_status,
+                        "count": totals[column_status],
+                        "results": IssueBoardSerializer(column, many=True).data,
+                        "next": (
+                            paginator.column_link(request, column_status, column[-1].id)
+                            if totals[column_status] > len(column)
+                            else None
+                        ),
+                    }
+                    for column_status, column in columns.items()
+                ]
+            }
+        )
+
 
-class ContributorViewSet(viewsets.ModelViewSet):
+class ContributorViewSet(
+    SparseFieldsetMixin, RateLimitHeadersMixin, viewsets.ModelViewSet
+):
     """ViewSet pour les contributeurs d'un projet"""
 
     serializer_class = ContributorSerializer
     permission_classes = [IsAuthenticated]
+    throttle_costs = {"list": 2, "create": 2}
 
     def get_queryset(self):
         """Retourne uniquement les contributeurs du projet spécifié"""
         project_id = self.kwargs.get("project_pk")
 
         try:
-            project = (
-                Project.objects.select_related("author")
-                .prefetch_related("contributors__user")
-                .get(pk=project_id)
-            )
+            # Seul author_id est utilisé : pas de jointure ni de prefetch
+            project = Project.objects.only("id", "author_id").get(pk=project_id)
         except Project.DoesNotExist:
             raise NotFound("Projet non trouvé")
 
         # Vérification des permissions pour la lecture
         if not (
-            project.author == self.request.user
+            project.author_id == self.request.user.id
             or project.contributors.filter(user=self.request.user).exists()
         ):
             raise PermissionDenied("Vous n'avez pas accès à ce projet")
 
-        return Contributor.objects.filter(project=project).select_related("user")
+        return (
+            Contributor.objects.filter(project=project)
+            .select_related("user")
+            .order_by("id")
+        )
 
-    @transaction.atomic
+    @atomic_write
     def perform_create(self, serializer):
         """Crée un contributeur lié au projet et à l'utilisateur spécifiés"""
         project_id = self.kwargs.get("project_pk")
@@ -144,10 +272,47 @@ class ContributorViewSet(viewsets.ModelViewSet):
         serializer.save(project=project)
 
 
-class IssueViewSet(viewsets.ModelViewSet):
+class IssueViewSet(
+    NormalizedUsersMixin,
+    ExpandMixin,
+    SparseFieldsetMixin,
+    CompiledListMixin,
+    RateLimitHeadersMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet pour les issues d'un projet"""
 
     permission_classes = [IsAuthenticated, IsProjectContributorOrObjectAuthorOrReadOnly]
+    compiled_list_serializer = CompiledSerializer(IssueListSerializer)
+    # ?ordering=-priority : HIGH, MEDIUM, LOW (index issue_project_priority_idx)
+    filter_backends = [StableOrderingFilter]
+    ordering_fields = ["priority", "id"]
+    # Le projet est utilisé par les permissions objet
+    sparse_required_relations = ("project",)
+    # Sous-requête par issue : uniquement avec ?fields=...,latest_comment
+    sparse_optional_fields = ("latest_comment",)
+    expandable_fields = {
+        "author": Expansion(UserMiniSerializer),
+        "assigned_to": Expansion(UserMiniSerializer),
+        "project": Expansion(
+            ProjectMiniSerializer, expandable={"author": Expansion(UserMiniSerializer)}
+        ),
+        "comments": Expansion(
+            CommentMiniSerializer,
+            many=True,
+            ordering=("created_time", "id"),
+            expandable={"author": Expansion(UserMiniSerializer)},
+        ),
+    }
+    normalized_user_fields = ("author", "assigned_to", "assigned_to_details")
+    included_user_serializer = UserMiniSerializer
+    throttle_costs = {
+        "list": 3,
+        "create": 2,
+        "update": 2,
+        "partial_update": 2,
+        "destroy": 3,  # Suppression en cascade des commentaires
+    }
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -157,14 +322,22 @@ class IssueViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Retourne les issues du projet spécifié dans l'URL"""
         project_id = self.kwargs.get("project_pk")
-        return (
+        queryset = (
             Issue.objects.filter(project_id=project_id)
             .select_related("author", "project", "assigned_to")
-            .prefetch_related("comments")
             .order_by("id")
         )  # Ajouter order_by
+        if self.action == "list":
+            # Champs calculés en SQL, seulement s'ils sont renvoyés
+            fields = self.get_sparse_fields() or ()
+            queryset = annotate_comment_summary(
+                queryset,
+                count="comments_count" in fields,
+                latest="latest_comment" in fields,
+            )
+        return queryset
 
-    @transaction.atomic
+    @atomic_write
     def perform_create(self, serializer):
         """Création atomique avec vérifications optimisées"""
         project_id = self.kwargs.get("project_pk")
@@ -197,11 +370,21 @@ class IssueViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user, project=project)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    NormalizedUsersMixin,
+    SparseFieldsetMixin,
+    CompiledListMixin,
+    RateLimitHeadersMixin,
+    viewsets.ModelViewSet,
+):
     """ViewSet pour les commentaires d'une issue"""
 
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
+    compiled_list_serializer = CompiledSerializer(CommentSerializer)
+    normalized_user_fields = ("author",)
+    included_user_serializer = UserMiniSerializer
+    throttle_costs = {"list": 2, "create": 2}
 
     def get_queryset(self):
         """Retourne les commentaires de l'issue spécifiée dans l'URL"""
@@ -211,7 +394,7 @@ class CommentViewSet(viewsets.ModelViewSet):
         # Vérifier que l'utilisateur a accès au projet
         project = get_object_or_404(Project, pk=project_id)
         if not (
-            project.author == self.request.user
+            project.author_id == self.request.user.id
             or project.contributors.filter(user=self.request.user).exists()
         ):
             raise PermissionDenied("Vous n'avez pas accès à ce projet")
@@ -222,7 +405,7 @@ class CommentViewSet(viewsets.ModelViewSet):
             .order_by("id")
         )  # Ajouter order_by
 
-    @transaction.atomic
+    @atomic_write
     def perform_create(self, serializer):
         """Création atomique avec vérifications optimisées"""
         issue_id = self.kwargs.get("issue_pk")
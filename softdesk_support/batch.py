@@ -0,0 +1,221 @@
+"""
+Plusieurs appels d'API en une requête HTTP (`POST /api/batch/`).
+
+    POST /api/batch/
+    [
+        {"method": "GET", "path": "/api/projects/1/", "name": "project"},
+        {"method": "POST", "path": "/api/projects/{{project.id}}/issues/",
+         "body": {"name": "Bug", "description": "...", "tag": "BUG"}},
+        {"method": "GET", "path": "/api/projects/1/issues/{{1.id}}/comments/"}
+    ]
+
+Les sous-requêtes sont exécutées dans l'ordre, dans le processus, par les
+ViewSets de `softdesk_support/urls.py` : mêmes permissions, mêmes
+serializers, sans nouvelle authentification (l'utilisateur du batch est
+réutilisé). Le throttling est débité une fois, de la somme des coûts des
+sous-requêtes. `{{<index ou name>.<chemin>}}` insère une valeur de la
+réponse d'une sous-requête précédente dans le chemin ou le corps ; si
+celle-ci a échoué, la sous-requête qui la référence renvoie 424.
+
+La réponse contient un résultat par sous-requête, dans l'ordre :
+`[{"status": 200, "body": {...}}, ...]`. Au plus `BATCH_MAX_REQUESTS`
+sous-requêtes par batch.
+"""
+
+import io
+import json
+import re
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .nplusone import query_scope
+from .sharding import request_shard, set_current_shard, shard_context, shard_databases
+from .throttling import RateLimitHeadersMixin
+
+# {{0.id}}, {{project.results.0.name}}
+REFERENCE = re.compile(r"\{\{\s*([\w-]+)((?:\.[\w-]+)*)\s*\}\}")
+
+# En-têtes propres au corps du batch, redéfinis pour chaque sous-requête
+_BODY_HEADERS = ("CONTENT_TYPE", "CONTENT_LENGTH", "QUERY_STRING", "HTTP_ACCEPT")
+
+
+def batch_max_requests():
+    return getattr(settings, "BATCH_MAX_REQUESTS", 20)
+
+
+class BatchReferenceError(Exception):
+    """Référence vers une sous-requête absente, échouée ou sans cette valeur"""
+
+
+class BatchEntrySerializer(serializers.Serializer):
+    """Une sous-requête du batch"""
+
+    method = serializers.ChoiceField(choices=["GET", "POST", "PUT", "PATCH", "DELETE"])
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False, allow_null=True)
+    name = serializers.RegexField(r"^[A-Za-z_][\w-]*$", required=False)
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict) and isinstance(data.get("method"), str):
+            data = {**data, "method": data["method"].upper()}
+        return super().to_internal_value(data)
+
+
+def _lookup(results, names, ref, path):
+    """Valeur `path` (liste de clés) de la réponse référencée par `ref`"""
+    index = int(ref) if ref.isdigit() else names.get(ref)
+    if index is None or index >= len(results):
+        raise BatchReferenceError(f"Sous-requête inconnue : {ref}")
+    result = results[index]
+    if result["status"] >= 400:
+        raise BatchReferenceError(f"La sous-requête {ref} a échoué")
+    value = result["body"]
+    for key in path:
+        try:
+            value = value[int(key) if isinstance(value, list) else key]
+        except (KeyError, IndexError, TypeError, ValueError):
+            raise BatchReferenceError(f"Valeur absente : {ref}.{'.'.join(path)}")
+    return value
+
+
+def resolve_references(value, results, names):
+    """Remplace les `{{...}}` d'une valeur (chaîne, liste ou dictionnaire)"""
+    if isinstance(value, dict):
+        return {
+            key: resolve_references(item, results, names) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [resolve_references(item, results, names) for item in value]
+    if not isinstance(value, str):
+        return value
+
+    def lookup(match):
+        path = match.group(2).split(".")[1:]
+        return _lookup(results, names, match.group(1), path)
+
+    whole = REFERENCE.fullmatch(value)
+    if whole:
+        # Référence seule : la valeur garde son type (identifiant entier...)
+        return lookup(whole)
+    return REFERENCE.sub(lambda match: str(lookup(match)), value)
+
+
+def _api_view(path):
+    """(vue, correspondance d'URL) d'un chemin d'API, None sinon"""
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return None
+    view_class = getattr(match.func, "cls", None)
+    if (
+        view_class is None
+        or not issubclass(view_class, APIView)
+        or issubclass(view_class, BatchView)
+    ):
+        return None
+    return view_class, match
+
+
+class BatchView(RateLimitHeadersMixin, APIView):
+    """Exécute une liste de sous-requêtes et renvoie leurs résultats"""
+
+    permission_classes = [IsAuthenticated]
+
+    def get_throttle_cost(self, request):
+        """Somme des coûts de throttling des sous-requêtes"""
+        entries = request.data if isinstance(request.data, list) else []
+        cost = 0
+        for entry in entries[: batch_max_requests()]:
+            if not isinstance(entry, dict):
+                continue
+            # Références pas encore résolues : le coût ne dépend que de la route
+            view = _api_view(REFERENCE.sub("0", str(entry.get("path", ""))))
+            if view is None:
+                continue
+            view_class, match = view
+            actions = getattr(match.func, "actions", None) or {}
+            action = actions.get(str(entry.get("method", "")).lower())
+            cost += (getattr(view_class, "throttle_costs", None) or {}).get(action, 1)
+        return max(cost, 1)
+
+    def post(self, request):
+        serializer = BatchEntrySerializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=batch_max_requests(),
+        )
+        serializer.is_valid(raise_exception=True)
+
+        results, names = [], {}
+        for entry in serializer.validated_data:
+            if "name" in entry:
+                names[entry["name"]] = len(results)
+            try:
+                path = resolve_references(entry["path"], results, names)
+                body = resolve_references(entry.get("body"), results, names)
+            except BatchReferenceError as exc:
+                code, data = status.HTTP_424_FAILED_DEPENDENCY, {"detail": str(exc)}
+            else:
+                code, data = self.dispatch_entry(request, entry["method"], path, body)
+            result = {"status": code, "body": data}
+            if "name" in entry:
+                result["name"] = entry["name"]
+            results.append(result)
+        return Response(results)
+
+    def dispatch_entry(self, request, method, path, body):
+        """(statut, données) de la sous-requête, exécutée par sa vue"""
+        view = _api_view(str(path))
+        if view is None:
+            return status.HTTP_404_NOT_FOUND, {"detail": f"Route inconnue : {path}"}
+        _, match = view
+
+        sub_request = self.sub_request(request, method, str(path), body)
+        sub_request.resolver_match = match
+        # Comme ShardRoutingMiddleware et NPlusOneMiddleware, par sous-requête
+        with shard_context(None), query_scope():
+            if shard_databases():
+                set_current_shard(
+                    request_shard(match.url_name or "", method, match.kwargs)
+                )
+            response = match.func(sub_request, *match.args, **match.kwargs)
+        if hasattr(response, "data"):
+            return response.status_code, response.data
+        # Réponse Django hors DRF (texte) : contenu tel quel
+        return response.status_code, response.content.decode(response.charset)
+
+    def sub_request(self, request, method, path, body):
+        """Requête Django de la sous-requête, authentifiée comme le batch"""
+        url = urlsplit(path)
+        sub_request = HttpRequest()
+        sub_request.method = method
+        sub_request.path = sub_request.path_info = url.path
+        sub_request.META = {
+            key: value
+            for key, value in request.META.items()
+            if key not in _BODY_HEADERS
+        }
+        sub_request.META["QUERY_STRING"] = url.query
+        sub_request.META["HTTP_ACCEPT"] = "application/json"
+        sub_request.GET = QueryDict(url.query)
+        sub_request.COOKIES = request._request.COOKIES
+
+        payload = b"" if body is None else json.dumps(body).encode()
+        sub_request.META["CONTENT_TYPE"] = "application/json"
+        sub_request.META["CONTENT_LENGTH"] = str(len(payload))
+        sub_request._stream = io.BytesIO(payload)
+        sub_request._read_started = False
+
+        # Pas de nouvelle authentification ni de nouveau débit de throttling
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        sub_request.batched = True
+        return sub_request
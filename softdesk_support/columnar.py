@@ -0,0 +1,73 @@
+"""
+Format en colonnes des listes, pour les gros exports.
+
+    GET /api/projects/1/issues/?format=columnar
+    Accept: application/vnd.softdesk.columnar+json
+
+Dans le format par défaut, chaque objet répète le nom de tous ses champs :
+sur une grande page, les clés représentent environ la moitié du JSON. Le
+format en colonnes les donne une seule fois :
+
+    {"count": ..., "next": ..., "previous": ..., "columns": ["id", "author.id", ...],
+     "rows": [[1, 3, ...], ...]}
+
+Les relations imbriquées sont mises à plat (`author.username`). Avec les
+serializers compilés, chaque ligne est une liste construite directement
+depuis le tuple de `values_list()`, sans dictionnaire intermédiaire.
+Seule l'action `list` propose ce format ; ailleurs, l'en-tête `Accept`
+seul donne 406 et `?format=columnar` donne 404 (négociation de DRF).
+"""
+
+from rest_framework import serializers
+
+from .renderers import FastJSONRenderer
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """JSON compact `{"columns": [...], "rows": [[...], ...]}`"""
+
+    media_type = "application/vnd.softdesk.columnar+json"
+    format = "columnar"
+
+
+def wants_columnar(request):
+    """Indique si la négociation de contenu a choisi le format en colonnes"""
+    return isinstance(getattr(request, "accepted_renderer", None), ColumnarJSONRenderer)
+
+
+def serializer_columns(serializer, label=""):
+    """Noms des colonnes d'un serializer, relations imbriquées à plat"""
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.Serializer):
+            columns += serializer_columns(field, f"{label}{name}.")
+        else:
+            columns.append(label + name)
+    return columns
+
+
+def _cell(item, path):
+    for name in path:
+        if item is None:
+            return None
+        item = item[name]
+    return item
+
+
+def dict_rows(items, columns):
+    """Lignes de valeurs à partir des dictionnaires d'un serializer DRF"""
+    paths = [column.split(".") for column in columns]
+    return [[_cell(item, path) for path in paths] for item in items]
+
+
+def columnar_data(data, columns, rows):
+    """Remplace les `results` d'une réponse (paginée ou non) par des colonnes"""
+    if isinstance(data, dict) and "results" in data:
+        data = {key: value for key, value in data.items() if key != "results"}
+    else:
+        data = {}
+    data["columns"] = columns
+    data["rows"] = rows
+    return data
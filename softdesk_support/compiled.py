@@ -0,0 +1,396 @@
+"""
+Serializers compilés pour les listes en lecture seule.
+
+Pour chaque ligne, un serializer DRF parcourt ses champs, résout les
+attributs de l'instance puis appelle `to_representation` champ par champ.
+Sur une grande page, ce travail domine le temps CPU.
+
+`CompiledSerializer` analyse une fois les champs d'un serializer et assemble
+des fonctions de conversion (fermetures, une par champ) qui construisent
+directement le dictionnaire de sortie à partir des tuples de `values_list()`.
+Aucune instance de modèle n'est créée et seuls les champs qui le nécessitent
+(dates, UUID...) passent par `to_representation`. La sortie est identique à
+celle du serializer d'origine (voir tests/test_compiled_serializers.py). Les
+mêmes fonctions construisent la ligne sous forme de liste pour le format en
+colonnes (softdesk_support.columnar).
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .columnar import (
+    ColumnarJSONRenderer,
+    columnar_data,
+    dict_rows,
+    serializer_columns,
+    wants_columnar,
+)
+from .instrumentation import serializer_timing
+
+# Champs dont la représentation est la valeur renvoyée par la base
+IDENTITY_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def _datetime_transform(field):
+    """
+    Équivalent de DateTimeField.to_representation au format ISO 8601, dont le
+    fuseau horaire est résolu une fois par page au lieu d'une fois par ligne
+    """
+    fallback = field.to_representation
+
+    def convert(value, tz):
+        if tz is None or value.tzinfo is None:
+            return fallback(value)
+        value = value.astimezone(tz).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+class CompiledPlan:
+    """Colonnes à lire et fonctions de conversion d'une ligne"""
+
+    def __init__(self, lookups, convert, pk_index, field_names, columns, convert_row):
+        self.lookups = lookups
+        self.convert = convert
+        self.pk_index = pk_index
+        self.field_names = field_names
+        # Format en colonnes : noms des colonnes et ligne sous forme de liste
+        self.columns = columns
+        self.convert_row = convert_row
+
+
+def _column(index):
+    """Valeur de la colonne telle que renvoyée par la base"""
+    return lambda row, extras, tz: row[index]
+
+
+def _extra(pk, name):
+    """Champ fourni par `extra`, indexé par clé primaire"""
+    return lambda row, extras, tz: extras[row[pk]][name]
+
+
+def _transform(index, func):
+    """`func(valeur)` de la colonne, None si elle est NULL"""
+
+    def get(row, extras, tz):
+        value = row[index]
+        return None if value is None else func(value)
+
+    return get
+
+
+def _datetime(index, convert):
+    """Date convertie dans le fuseau de la page, None si NULL"""
+
+    def get(row, extras, tz):
+        value = row[index]
+        return None if value is None else convert(value, tz)
+
+    return get
+
+
+def _nullable(index, getter):
+    """Relation imbriquée : None si la clé étrangère est nulle"""
+
+    def get(row, extras, tz):
+        return None if row[index] is None else getter(row, extras, tz)
+
+    return get
+
+
+def _dict(names, getters):
+    """Dictionnaire `{nom: valeur}` dans l'ordre des champs"""
+    names, getters = tuple(names), tuple(getters)
+
+    def get(row, extras, tz):
+        return dict(zip(names, [getter(row, extras, tz) for getter in getters]))
+
+    return get
+
+
+def _list(getters):
+    """Liste des valeurs (ligne du format en colonnes)"""
+    getters = tuple(getters)
+    return lambda row, extras, tz: [getter(row, extras, tz) for getter in getters]
+
+
+class _PlanBuilder:
+    """
+    Assemble les fonctions de conversion d'une ligne : chaque champ devient
+    une fonction `(row, extras, tz) -> valeur` sur le tuple de `values_list()`
+    """
+
+    def __init__(self):
+        self.lookups = []
+        self.pk_index = self.column("pk")
+
+    def column(self, lookup):
+        """Index de la colonne `lookup` (ajoutée si nécessaire)"""
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    def dict_getter(
+        self, serializer, prefix, field_names=None, extra_fields=(), references=()
+    ):
+        """Fonction construisant le dictionnaire d'un serializer"""
+        names, getters = [], []
+        for name, field in serializer.fields.items():
+            if field.write_only or (
+                field_names is not None and name not in field_names
+            ):
+                continue
+            names.append(name)
+            if name in extra_fields:
+                getters.append(_extra(self.pk_index, name))
+            elif name in references:
+                # Identifiant de l'objet lié (clé étrangère), sans jointure
+                getters.append(_column(self.column(prefix + field.source_attrs[0])))
+            else:
+                getters.append(self.field_getter(field, prefix))
+        return _dict(names, getters)
+
+    def column_getters(
+        self, serializer, prefix, field_names=None, extra_fields=(), references=()
+    ):
+        """
+        (nom de colonne, fonction) de chaque valeur d'un serializer, les
+        relations imbriquées mises à plat (`author.username`)
+        """
+        columns = []
+        for name, field in serializer.fields.items():
+            if field.write_only or (
+                field_names is not None and name not in field_names
+            ):
+                continue
+            if name in extra_fields:
+                columns.append((name, _extra(self.pk_index, name)))
+            elif name in references:
+                index = self.column(prefix + field.source_attrs[0])
+                columns.append((name, _column(index)))
+            elif isinstance(field, serializers.Serializer):
+                lookup = prefix + "__".join(field.source_attrs)
+                index = self.column(lookup)
+                columns += [
+                    (f"{name}.{column}", _nullable(index, getter))
+                    for column, getter in self.column_getters(field, lookup + "__")
+                ]
+            else:
+                columns.append((name, self.field_getter(field, prefix)))
+        return columns
+
+    def field_getter(self, field, prefix):
+        """Fonction donnant la valeur d'un champ"""
+        if isinstance(field, serializers.SerializerMethodField):
+            raise ImproperlyConfigured(
+                f"Le champ '{field.field_name}' doit être fourni par `extra`"
+            )
+        if isinstance(field, serializers.ListSerializer) or field.source == "*":
+            raise ImproperlyConfigured(
+                f"Le champ '{field.field_name}' ne peut pas être compilé"
+            )
+
+        lookup = prefix + "__".join(field.source_attrs)
+        index = self.column(lookup)
+
+        if isinstance(field, serializers.BaseSerializer):
+            return _nullable(index, self.dict_getter(field, lookup + "__"))
+
+        if isinstance(field, IDENTITY_FIELDS):
+            return _column(index)
+
+        if (
+            isinstance(field, serializers.DateTimeField)
+            and not hasattr(field, "timezone")
+            and str(getattr(field, "format", api_settings.DATETIME_FORMAT)).lower()
+            == ISO_8601
+        ):
+            return _datetime(index, _datetime_transform(field))
+
+        if (
+            isinstance(field, serializers.UUIDField)
+            and field.uuid_format == "hex_verbose"
+        ):
+            return _transform(index, str)
+
+        return _transform(index, field.to_representation)
+
+
+class CompiledSerializer:
+    """
+    Version compilée d'un serializer en lecture seule.
+
+    `extra` est une fonction optionnelle qui reçoit la liste des clés
+    primaires d'une page et retourne `{pk: {champ: valeur}}` pour les champs
+    `extra_fields` qui ne correspondent pas à une colonne (SerializerMethodField).
+    Les champs de `references` sont renvoyés sous forme d'identifiant (format
+    normalisé, voir softdesk_support/normalize.py).
+    """
+
+    def __init__(self, serializer_class, extra=None, extra_fields=()):
+        self.serializer_class = serializer_class
+        self.extra = extra
+        self.extra_fields = tuple(extra_fields)
+        self._plans = {}
+
+    def plan(self, field_names=None, references=()):
+        """Plan compilé (mis en cache) pour un sous-ensemble de champs"""
+        field_names = None if field_names is None else frozenset(field_names)
+        key = (field_names, frozenset(references))
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = self._compile(*key)
+        return plan
+
+    def _compile(self, field_names, references):
+        builder = _PlanBuilder()
+        serializer = self.serializer_class()
+        convert = builder.dict_getter(
+            serializer,
+            "",
+            field_names,
+            extra_fields=self.extra_fields,
+            references=references,
+        )
+        columns = builder.column_getters(
+            serializer,
+            "",
+            field_names,
+            extra_fields=self.extra_fields,
+            references=references,
+        )
+
+        names = [
+            name
+            for name, field in serializer.fields.items()
+            if not field.write_only and (field_names is None or name in field_names)
+        ]
+        return CompiledPlan(
+            builder.lookups,
+            convert,
+            builder.pk_index,
+            names,
+            [name for name, _ in columns],
+            _list(getter for _, getter in columns),
+        )
+
+    def values(self, queryset, field_names=None, references=()):
+        """Queryset de tuples contenant uniquement les colonnes du plan"""
+        plan = self.plan(field_names, references)
+        return queryset.prefetch_related(None).values_list(*plan.lookups)
+
+    def serialize(self, rows, field_names=None, references=()):
+        """Convertit des tuples de `values()` en dictionnaires de sortie"""
+        plan = self.plan(field_names, references)
+        return self._convert(rows, plan, plan.convert)
+
+    def serialize_columns(self, rows, field_names=None, references=()):
+        """(colonnes, lignes) : tuples de `values()` convertis en listes"""
+        plan = self.plan(field_names, references)
+        return plan.columns, self._convert(rows, plan, plan.convert_row)
+
+    def _convert(self, rows, plan, convert):
+        with serializer_timing():
+            rows = list(rows)
+            extras = None
+            if self.extra and any(
+                name in plan.field_names for name in self.extra_fields
+            ):
+                extras = self.extra([row[plan.pk_index] for row in rows])
+            tz = timezone.get_current_timezone() if settings.USE_TZ else None
+            return [convert(row, extras, tz) for row in rows]
+
+
+class CompiledListMixin:
+    """
+    Mixin de ViewSet : l'action `list` utilise `compiled_list_serializer`
+    au lieu du serializer DRF, si le setting `COMPILED_LIST_SERIALIZERS`
+    est actif (par défaut). L'action `list` propose aussi le format en
+    colonnes (ColumnarJSONRenderer).
+    """
+
+    compiled_list_serializer = None
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == "list":
+            renderers.append(ColumnarJSONRenderer())
+        return renderers
+
+    def get_compiled_list_serializer(self):
+        """Serializer compilé à utiliser, ou None pour le chemin DRF"""
+        if not getattr(settings, "COMPILED_LIST_SERIALIZERS", True):
+            return None
+        return self.compiled_list_serializer
+
+    def list(self, request, *args, **kwargs):
+        compiled = self.get_compiled_list_serializer()
+        if compiled is None:
+            response = super().list(request, *args, **kwargs)
+            if wants_columnar(request):
+                # Chemin DRF : colonnes déduites du serializer de la vue
+                columns = serializer_columns(self.get_serializer())
+                results = response.data
+                if isinstance(results, dict):
+                    results = results["results"]
+                response.data = columnar_data(
+                    response.data, columns, dict_rows(results, columns)
+                )
+            return response
+
+        # Sélection de champs (?fields=) : seules ces colonnes sont lues
+        get_sparse_fields = getattr(self, "get_sparse_fields", None)
+        fields = get_sparse_fields() if get_sparse_fields else None
+
+        # Format normalisé (?include=users) : identifiants des utilisateurs
+        get_user_references = getattr(self, "get_user_references", None)
+        references = get_user_references() if get_user_references else ()
+
+        rows = compiled.values(
+            self.filter_queryset(self.get_queryset()), fields, references
+        )
+        page = self.paginate_queryset(rows)
+        rows = rows if page is None else page
+        if wants_columnar(request):
+            columns, data = compiled.serialize_columns(rows, fields, references)
+            self._include_user_ids(
+                row[index]
+                for index, name in enumerate(columns)
+                if name in references
+                for row in data
+            )
+            if page is not None:
+                response = self.get_paginated_response(data)
+                response.data = columnar_data(response.data, columns, data)
+                return response
+            return Response(columnar_data(None, columns, data))
+
+        data = compiled.serialize(rows, fields, references)
+        if references:
+            self._include_user_ids(
+                row[name] for row in data for name in references if name in row
+            )
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def _include_user_ids(self, ids):
+        """Utilisateurs référencés par une liste au format normalisé"""
+        get_included_users = getattr(self, "get_included_users", None)
+        included = get_included_users() if get_included_users else None
+        if included is not None:
+            for pk in ids:
+                included.add_id(pk)
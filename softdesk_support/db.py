@@ -0,0 +1,65 @@
+"""
+Profils de connexion SQLite.
+
+- "development" : SQLite par défaut (journal rollback, connexion ouverte et
+  fermée à chaque requête HTTP).
+- "production" : journal WAL (lectures non bloquées par l'écrivain),
+  `synchronous=NORMAL` (fsync aux checkpoints seulement, sûr en WAL),
+  attente des verrous au lieu d'un « database is locked » immédiat, mmap et
+  cache de pages élargis, et connexions persistantes (`CONN_MAX_AGE`).
+
+Les PRAGMA sont exécutés à l'ouverture de chaque connexion (`init_command`).
+Dans les deux profils, les transactions sont ouvertes par `BEGIN IMMEDIATE`
+(`transaction_mode`, voir softdesk_support/writes.py).
+"""
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,  # ms
+    "mmap_size": 256 * 1024 * 1024,  # octets
+    "cache_size": -64 * 1024,  # négatif : en Kio (64 Mio)
+    "temp_store": "MEMORY",
+}
+
+PROFILES = ("development", "production")
+
+
+def sqlite_database(name, profile="development", conn_max_age=600):
+    """Entrée `DATABASES` pour une base SQLite selon le profil"""
+    if profile not in PROFILES:
+        raise ValueError(f"Profil de base de données inconnu : {profile!r}")
+    database = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": name,
+        # Lu à chaque ouverture de connexion, y compris une reconnexion
+        "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+    }
+    if profile == "production":
+        database["OPTIONS"]["init_command"] = "; ".join(
+            f"PRAGMA {pragma} = {value}" for pragma, value in SQLITE_PRAGMAS.items()
+        )
+        database["CONN_MAX_AGE"] = conn_max_age
+        # Connexion persistante vérifiée avant réutilisation
+        database["CONN_HEALTH_CHECKS"] = True
+    return database
+
+
+def sqlite_replicas(paths, profile="development"):
+    """Entrées `DATABASES` des réplicas en lecture : `replica_1`, `replica_2`..."""
+    return {
+        f"replica_{index}": {
+            **sqlite_database(path, profile=profile),
+            # Tests : les réplicas pointent sur la base de test principale
+            "TEST": {"MIRROR": "default"},
+        }
+        for index, path in enumerate(paths, start=1)
+    }
+
+
+def sqlite_shards(paths, profile="development"):
+    """Entrées `DATABASES` des shards de projets : `shard_1`, `shard_2`..."""
+    return {
+        f"shard_{index}": sqlite_database(path, profile=profile)
+        for index, path in enumerate(paths, start=1)
+    }
@@ -0,0 +1,179 @@
+"""
+Relations incluses dans la réponse (`?expand=`).
+
+    GET /api/projects/1/issues/12/?expand=comments.author,assigned_to,project
+
+Chaque relation demandée est chargée par un seul `prefetch_related` pour
+toute la page, quel que soit le nombre de lignes, et son champ est remplacé
+(ou ajouté) par l'objet sérialisé. Les relations imbriquées s'écrivent avec
+un point. Limites : `EXPAND_MAX_DEPTH` niveaux, `EXPAND_MAX_RELATIONS`
+relations par requête, et `EXPAND_MAX_ITEMS` éléments par relation multiple
+et par ligne (les suivants restent accessibles par leur endpoint).
+Ne s'applique qu'aux méthodes de lecture (GET, HEAD, OPTIONS).
+"""
+
+from django.conf import settings
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+class Expansion:
+    """
+    Relation dépliable : serializer de l'objet lié, et relations dépliables
+    à l'intérieur de celui-ci (`expandable`). `queryset` (fonction sans
+    argument) personnalise la requête du prefetch ; `ordering` fixe l'ordre
+    des relations multiples.
+    """
+
+    def __init__(
+        self,
+        serializer_class,
+        many=False,
+        source=None,
+        queryset=None,
+        ordering=("pk",),
+        expandable=None,
+    ):
+        self.serializer_class = serializer_class
+        self.many = many
+        self.source = source
+        self.queryset = queryset
+        self.ordering = ordering
+        self.expandable = expandable or {}
+
+    def attname(self, name):
+        """
+        Attribut qui reçoit la relation : les relations multiples, tronquées,
+        sont rangées dans une liste à part (`to_attr`) car Django ne peut pas
+        mettre en cache un queryset découpé dans le manager de la relation
+        """
+        relation = self.source or name
+        return f"expanded_{relation}" if self.many else relation
+
+    def prefetch(self, model, name, prefix=""):
+        """
+        (Prefetch, modèle lié, chemin) de la relation `name` de `model` ;
+        `prefix` est le chemin de la relation parente
+        """
+        relation = self.source or name
+        related_model = model._meta.get_field(relation).related_model
+        if self.queryset is not None:
+            queryset = self.queryset()
+        else:
+            queryset = related_model._default_manager.all()
+        path = prefix + self.attname(name)
+        if not self.many:
+            return Prefetch(prefix + relation, queryset=queryset), related_model, path
+        queryset = queryset.order_by(*self.ordering)[: expand_max_items()]
+        prefetch = Prefetch(
+            prefix + relation, queryset=queryset, to_attr=self.attname(name)
+        )
+        return prefetch, related_model, path
+
+    def field(self, name):
+        kwargs = {"many": self.many, "read_only": True}
+        if self.attname(name) != name:
+            kwargs["source"] = self.attname(name)
+        return self.serializer_class(**kwargs)
+
+
+def expand_max_depth():
+    return getattr(settings, "EXPAND_MAX_DEPTH", 2)
+
+
+def expand_max_relations():
+    return getattr(settings, "EXPAND_MAX_RELATIONS", 6)
+
+
+def expand_max_items():
+    return getattr(settings, "EXPAND_MAX_ITEMS", 20)
+
+
+class ExpandMixin:
+    """
+    Mixin de ViewSet pour `?expand=`. `expandable_fields` associe le nom
+    d'un champ à son `Expansion`. À placer avant SparseFieldsetMixin et
+    CompiledListMixin : la liste repasse par le serializer DRF lorsqu'une
+    relation est dépliée.
+    """
+
+    expandable_fields = {}
+
+    def get_expansions(self):
+        """Arbre `{champ: {sous-champ: {}}}` des relations demandées"""
+        if not hasattr(self, "_expansions"):
+            self._expansions = self._parse_expansions()
+        return self._expansions
+
+    def _parse_expansions(self):
+        request = self.request
+        if request is None or request.method not in SAFE_METHODS:
+            return {}
+        params = request.query_params.get("expand", "")
+        paths = [path.strip() for path in params.split(",") if path.strip()]
+
+        tree, relations = {}, 0
+        for path in paths:
+            names = path.split(".")
+            if len(names) > expand_max_depth():
+                raise ValidationError(
+                    {"expand": f"{path} : au plus {expand_max_depth()} niveaux"}
+                )
+            node, expandable = tree, self.expandable_fields
+            for name in names:
+                if name not in expandable:
+                    raise ValidationError({"expand": f"Relation inconnue : {path}"})
+                if name not in node:
+                    node[name] = {}
+                    relations += 1
+                node, expandable = node[name], expandable[name].expandable
+        if relations > expand_max_relations():
+            raise ValidationError(
+                {"expand": f"Au plus {expand_max_relations()} relations"}
+            )
+        return tree
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        prefetches = self._prefetches(
+            queryset.model, self.expandable_fields, self.get_expansions()
+        )
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+    def _prefetches(self, model, expandable, tree, prefix=""):
+        prefetches = []
+        for name, subtree in tree.items():
+            prefetch, related_model, path = expandable[name].prefetch(
+                model, name, prefix
+            )
+            prefetches.append(prefetch)
+            prefetches += self._prefetches(
+                related_model, expandable[name].expandable, subtree, path + "__"
+            )
+        return prefetches
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        tree = self.get_expansions()
+        if tree:
+            self._expand(
+                getattr(serializer, "child", serializer), self.expandable_fields, tree
+            )
+        return serializer
+
+    def _expand(self, serializer, expandable, tree):
+        for name, subtree in tree.items():
+            field = expandable[name].field(name)
+            if subtree:
+                self._expand(
+                    getattr(field, "child", field), expandable[name].expandable, subtree
+                )
+            serializer.fields[name] = field
+
+    def get_compiled_list_serializer(self):
+        if self.get_expansions():
+            return None
+        return super().get_compiled_list_serializer()
@@ -0,0 +1,174 @@
+"""
+Sélection des champs renvoyés (sparse fieldsets) : `?fields=` et `?omit=`.
+
+    GET /api/projects/1/issues/?fields=id,name,status
+    GET /api/projects/1/issues/12/?omit=description
+
+Les champs sélectionnés réduisent à la fois le JSON et la requête SQL :
+les colonnes non demandées sont exclues avec `defer()`, et les
+`select_related` / `prefetch_related` qui ne servent plus sont retirés.
+Ne s'applique qu'aux méthodes de lecture (GET, HEAD, OPTIONS).
+"""
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+# Besoins SQL (colonnes, relations) de chaque champ, par vue et serializer
+_field_requirements = {}
+
+
+def _flatten_select_related(tree, prefix=""):
+    """Chemins `a__b` d'un arbre `query.select_related`"""
+    paths = []
+    for name, subtree in tree.items():
+        path = prefix + name
+        paths.append(path)
+        paths.extend(_flatten_select_related(subtree, path + "__"))
+    return paths
+
+
+def _lookup_path(lookup):
+    """Chemin d'un prefetch (chaîne ou objet Prefetch)"""
+    return getattr(lookup, "prefetch_through", lookup)
+
+
+class SparseFieldsetMixin:
+    """
+    Mixin de ViewSet pour `?fields=` et `?omit=`.
+
+    Les SerializerMethodField ne révèlent pas les relations qu'ils utilisent :
+    `sparse_field_relations` les déclare (`{"champ": ["relation", ...]}`).
+    `sparse_required_relations` liste les relations toujours conservées
+    (utilisées par les permissions par exemple). Les champs de
+    `sparse_optional_fields`, coûteux, ne sont renvoyés que s'ils sont
+    nommés dans `?fields=`.
+    """
+
+    sparse_field_relations = {}
+    sparse_required_relations = ()
+    sparse_optional_fields = ()
+
+    def get_sparse_fields(self):
+        """Noms des champs demandés, ou None si la sélection est inactive"""
+        if not hasattr(self, "_sparse_fields"):
+            self._sparse_fields = self._parse_sparse_fields()
+        return self._sparse_fields
+
+    def _parse_sparse_fields(self):
+        request = self.request
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+
+        params = request.query_params
+        requested = [name for name in params.get("fields", "").split(",") if name]
+        omitted = [name for name in params.get("omit", "").split(",") if name]
+        available = list(self.get_field_requirements())
+        optional = [name for name in available if name in self.sparse_optional_fields]
+        if not requested and not omitted and not optional:
+            return None
+
+        unknown = sorted(set(requested + omitted) - set(available))
+        if unknown:
+            raise ValidationError({"fields": f"Champs inconnus : {', '.join(unknown)}"})
+
+        if requested:
+            selected = [name for name in available if name in requested]
+        else:
+            selected = [name for name in available if name not in optional]
+        return [name for name in selected if name not in omitted]
+
+    def get_field_requirements(self):
+        """
+        `{champ: (colonnes, relations)}` pour le serializer de l'action,
+        calculé une fois par classe de vue et de serializer
+        """
+        serializer_class = self.get_serializer_class()
+        key = (type(self), serializer_class)
+        requirements = _field_requirements.get(key)
+        if requirements is None:
+            requirements = _field_requirements[key] = {
+                name: self._field_requirement(name, field)
+                for name, field in serializer_class().fields.items()
+                if not field.write_only
+            }
+        return requirements
+
+    def _field_requirement(self, name, field):
+        if isinstance(field, serializers.SerializerMethodField):
+            return set(), set(self.sparse_field_relations.get(name, ()))
+        if field.source == "*":
+            return None  # Besoin de l'objet entier
+        attrs = field.source_attrs
+        if isinstance(field, serializers.PrimaryKeyRelatedField) or len(attrs) == 1:
+            relations = set()
+            if isinstance(field, serializers.BaseSerializer):
+                relations.add(attrs[0])  # Relation imbriquée
+            return {attrs[0]}, relations
+        # Source traversant des relations : "issue.project.id"
+        return {attrs[0]}, {"__".join(attrs[:i]) for i in range(1, len(attrs))}
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            target = getattr(serializer, "child", serializer)
+            for name in list(target.fields):
+                if name not in fields:
+                    target.fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        return self.restrict_queryset(queryset, fields)
+
+    def restrict_queryset(self, queryset, fields):
+        """Retire colonnes, jointures et prefetch inutiles aux champs demandés"""
+        requirements = self.get_field_requirements()
+        columns, relations = set(), set(self.sparse_required_relations)
+        for name in fields:
+            if requirements[name] is None:
+                return queryset
+            field_columns, field_relations = requirements[name]
+            columns |= field_columns
+            relations |= field_relations
+
+        # Colonnes : ne jamais différer la clé primaire ni les clés étrangères
+        deferred = [
+            field.name
+            for field in queryset.model._meta.concrete_fields
+            if not field.primary_key
+            and not field.is_relation
+            and field.name not in columns
+        ]
+        if deferred:
+            queryset = queryset.defer(*deferred)
+
+        # Jointures : garder le plus long préfixe utile de chaque chemin
+        if isinstance(queryset.query.select_related, dict):
+            kept = set()
+            for path in _flatten_select_related(queryset.query.select_related):
+                parts = path.split("__")
+                for size in range(len(parts), 0, -1):
+                    prefix = "__".join(parts[:size])
+                    if prefix in relations:
+                        kept.add(prefix)
+                        break
+            queryset = queryset.select_related(None)
+            if kept:
+                queryset = queryset.select_related(*sorted(kept))
+
+        # Prefetch : garder ceux dont la première relation est utilisée
+        lookups = queryset._prefetch_related_lookups
+        if lookups:
+            first_relations = {relation.split("__")[0] for relation in relations}
+            kept = [
+                lookup
+                for lookup in lookups
+                if _lookup_path(lookup).split("__")[0] in first_relations
+            ]
+            queryset = queryset.prefetch_related(None).prefetch_related(*kept)
+        return queryset
@@ -0,0 +1,22 @@
+"""
+Filtres DRF communs aux ViewSets
+"""
+
+from rest_framework.filters import OrderingFilter
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    `?ordering=` terminé par la clé primaire, dans le sens du premier critère :
+    pagination stable entre égalités, et tri servi par un index
+    (colonne, id) parcouru dans un sens ou dans l'autre.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        ordering = list(ordering)
+        if not any(term.lstrip("-") in ("id", "pk") for term in ordering):
+            ordering.append("-id" if ordering[0].startswith("-") else "id")
+        return ordering
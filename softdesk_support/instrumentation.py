@@ -0,0 +1,191 @@
+"""
+Mesures par requête : nombre de requêtes SQL, temps base de données,
+temps de sérialisation et de rendu.
+
+`request_tracking()` ouvre une période de mesure pour la requête HTTP en cours
+et installe un `execute_wrapper` sur les connexions. Les middlewares qui ont
+besoin de ces mesures (Server-Timing, détection N+1, métriques...) partagent le
+même `RequestStats` : la période n'est ouverte qu'une fois, même si plusieurs
+middlewares l'utilisent. En dehors d'une période de mesure, rien n'est installé.
+"""
+
+import re
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+_current_stats = ContextVar("request_stats", default=None)
+
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SQL_IN_LIST = re.compile(r"\bIN \((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+_SQL_SPACES = re.compile(r"\s+")
+
+# Modules de diagnostic ignorés lors de la recherche du site d'appel
+_DIAGNOSTIC_MODULES = {
+    "instrumentation.py",
+    "middleware.py",
+    "nplusone.py",
+    "slowqueries.py",
+}
+
+
+class RequestStats:
+    """Mesures d'une requête HTTP"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.render_time = 0.0
+        self.view = None
+        self.action = None
+        # Fonctions appelées après chaque requête SQL :
+        # observer(sql, params, many, duration, connection)
+        self.query_observers = []
+        self._serializer_depth = 0
+
+    def bind_view(self, view_func, method):
+        """Retient le ViewSet et l'action qui traitent la requête"""
+        self.view, self.action = view_label(view_func, method)
+
+    @property
+    def elapsed(self):
+        """Temps écoulé depuis le début de la requête (secondes)"""
+        return time.perf_counter() - self.start
+
+
+def view_label(view_func, method):
+    """(nom de la vue ou du ViewSet, action) pour une fonction de vue résolue"""
+    cls = getattr(view_func, "cls", None)
+    if cls is None:
+        return getattr(view_func, "__name__", None), None
+    actions = getattr(view_func, "actions", None) or {}
+    method = method.lower()
+    action = actions.get(method) or (actions.get("get") if method == "head" else None)
+    return cls.__name__, action
+
+
+def fingerprint(sql):
+    """
+    Forme normalisée d'une requête SQL : valeurs littérales et listes `IN`
+    remplacées, pour regrouper les requêtes qui ne diffèrent que par leurs
+    paramètres
+    """
+    sql = _SQL_STRING.sub("?", sql)
+    sql = _SQL_NUMBER.sub("?", sql)
+    sql = _SQL_IN_LIST.sub("IN (...)", sql)
+    return _SQL_SPACES.sub(" ", sql).strip()
+
+
+def call_site(depth=1, packages=None):
+    """
+    Frame la plus interne appartenant au code du projet (hors bibliothèques
+    et modules de diagnostic), au format `Classe.méthode (fichier:ligne)`.
+    `packages` restreint la recherche à certains dossiers (ex. `("issues",)`).
+    """
+    base_dir = Path(settings.BASE_DIR).resolve()
+    frame = sys._getframe(depth)
+    while frame is not None:
+        path = Path(frame.f_code.co_filename)
+        if (
+            path.is_relative_to(base_dir)
+            and "site-packages" not in path.parts
+            and not (
+                path.parent.name == "softdesk_support"
+                and path.name in _DIAGNOSTIC_MODULES
+            )
+            and (packages is None or path.relative_to(base_dir).parts[0] in packages)
+        ):
+            name = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+            location = path.relative_to(base_dir).as_posix()
+            return f"{name} ({location}:{frame.f_lineno})"
+        frame = frame.f_back
+    return None
+
+
+def current_stats():
+    """Mesures de la requête en cours, ou None hors période de mesure"""
+    return _current_stats.get()
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            duration = time.perf_counter() - start
+            stats.queries += 1
+            stats.db_time += duration
+            for observer in stats.query_observers:
+                observer(sql, params, many, duration, context["connection"])
+
+
+@contextmanager
+def request_tracking():
+    """
+    Période de mesure pour la requête en cours. Réutilise la période déjà
+    ouverte par un autre middleware le cas échéant.
+    """
+    stats = _current_stats.get()
+    if stats is not None:
+        yield stats
+        return
+
+    stats = RequestStats()
+    token = _current_stats.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_execute_wrapper))
+            yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def serializer_timing():
+    """Ajoute la durée du bloc au temps de sérialisation (hors imbrication)"""
+    stats = _current_stats.get()
+    if stats is None or stats._serializer_depth:
+        yield
+        return
+
+    stats._serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_time += time.perf_counter() - start
+        stats._serializer_depth -= 1
+
+
+_serializers_instrumented = False
+
+
+def instrument_serializers():
+    """
+    Mesure `serializer.data` pour tous les serializers DRF. Appelé une seule
+    fois, uniquement quand l'instrumentation est activée.
+    """
+    global _serializers_instrumented
+    if _serializers_instrumented:
+        return
+
+    original = BaseSerializer.data.fget
+
+    def data(self):
+        with serializer_timing():
+            return original(self)
+
+    BaseSerializer.data = property(data)
+    _serializers_instrumented = True
@@ -0,0 +1,367 @@
+"""
+Métriques cumulées au format Prometheus, sans service externe.
+
+Chaque thread écrit dans sa propre partition (`_Shard`) : l'enregistrement
+d'une requête ne prend aucun verrou. Les partitions sont fusionnées à la
+lecture. Chaque processus (worker gunicorn...) écrit régulièrement son
+instantané dans `METRICS_DIR` ; l'endpoint `/api/metrics/` fusionne les
+fichiers des processus. Le fichier d'un processus arrêté (à sa sortie, ou
+à la lecture suivante s'il a été tué) est ajouté au cumul des processus
+arrêtés (`metrics-retired.json`) puis supprimé : les compteurs ne diminuent
+jamais, ce que Prometheus prendrait pour une remise à zéro.
+
+Métriques exposées :
+- softdesk_http_requests_total{route, method, status}
+- softdesk_http_request_duration_seconds{route, method} (histogramme)
+- softdesk_db_queries_per_request{route, method} (histogramme)
+- softdesk_throttle_rejections_total{scope}
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+RETIRED_SNAPSHOT = "metrics-retired.json"  # Cumul des processus arrêtés
+
+
+def _process_token():
+    # Identifiant du fichier de ce processus (unique même si le PID est réutilisé)
+    return f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+PROCESS_TOKEN = _process_token()
+
+
+def _forked():
+    """Processus enfant (workers dupliqués après import) : son propre fichier"""
+    global PROCESS_TOKEN
+    PROCESS_TOKEN = _process_token()
+
+
+if hasattr(os, "register_at_fork"):  # POSIX
+    os.register_at_fork(after_in_child=_forked)
+
+_exit_cleanups = set()  # Répertoires où verser l'instantané à la sortie
+
+COUNTERS = {
+    "requests": ("softdesk_http_requests_total", "Requêtes HTTP traitées"),
+    "throttled": (
+        "softdesk_throttle_rejections_total",
+        "Requêtes refusées par le throttling",
+    ),
+}
+HISTOGRAMS = {
+    "latency": (
+        "softdesk_http_request_duration_seconds",
+        "Durée de traitement des requêtes HTTP",
+        LATENCY_BUCKETS,
+    ),
+    "queries": (
+        "softdesk_db_queries_per_request",
+        "Requêtes SQL par requête HTTP",
+        QUERY_BUCKETS,
+    ),
+}
+LABELS = {
+    "requests": ("route", "method", "status"),
+    "throttled": ("scope",),
+    "latency": ("route", "method"),
+    "queries": ("route", "method"),
+}
+
+
+class _Shard:
+    """
+    Métriques d'un thread. Compteurs : `{labels: n}` ; histogrammes :
+    `{labels: [n par classe..., n au-delà, somme]}`
+    """
+
+    def __init__(self):
+        self.tables = {name: {} for name in LABELS}
+
+    def count(self, name, labels, amount=1):
+        table = self.tables[name]
+        table[labels] = table.get(labels, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][2]
+        table = self.tables[name]
+        entry = table.get(labels)
+        if entry is None:
+            entry = table[labels] = [0] * (len(buckets) + 1) + [0.0]
+        entry[bisect_left(buckets, value)] += 1
+        entry[-1] += value
+
+
+_local = threading.local()
+_shards = []  # (thread, shard)
+_shards_lock = threading.Lock()  # Uniquement à la création d'un thread
+_retired = _Shard()  # Partitions des threads terminés
+
+
+def _shard():
+    shard = getattr(_local, "shard", None)
+    if shard is None:
+        shard = _local.shard = _Shard()
+        with _shards_lock:
+            _shards.append((threading.current_thread(), shard))
+    return shard
+
+
+def record_request(route, method, status, duration, queries):
+    """Enregistre une requête HTTP traitée"""
+    shard = _shard()
+    shard.count("requests", (route, method, str(status)))
+    shard.observe("latency", (route, method), duration)
+    shard.observe("queries", (route, method), queries)
+
+
+def record_throttle_rejection(scope):
+    """Enregistre une requête refusée par le throttling"""
+    _shard().count("throttled", (scope or "",))
+
+
+def _merge(target, source):
+    """Ajoute les tables `source` à `target` (format de snapshot)"""
+    for name, table in source.items():
+        merged = target.setdefault(name, {})
+        for labels, value in table.items():
+            labels = tuple(labels)
+            if name in HISTOGRAMS:
+                current = merged.get(labels)
+                merged[labels] = (
+                    list(value)
+                    if current is None
+                    else [a + b for a, b in zip(current, value)]
+                )
+            else:
+                merged[labels] = merged.get(labels, 0) + value
+    return target
+
+
+def snapshot():
+    """Métriques de ce processus : `{table: {labels: valeur}}`"""
+    with _shards_lock:
+        alive = []
+        for thread, shard in _shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                _merge(_retired.tables, _copy(shard.tables))
+        _shards[:] = alive
+        tables = [_copy(_retired.tables)]
+        tables += [_copy(shard.tables) for _, shard in alive]
+
+    result = {}
+    for table in tables:
+        _merge(result, table)
+    return result
+
+
+def _copy(tables):
+    # list(dict.items()) est atomique : sûr pendant que le thread écrit
+    return {
+        name: {
+            labels: list(value) if isinstance(value, list) else value
+            for labels, value in list(table.items())
+        }
+        for name, table in tables.items()
+    }
+
+
+def _write(path, tables):
+    """Écrit des tables au format de snapshot (remplacement atomique)"""
+    data = {
+        name: [[list(labels), value] for labels, value in table.items()]
+        for name, table in tables.items()
+    }
+    tmp = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def _read(path):
+    """Tables d'un fichier de snapshot, ou None s'il est absent ou illisible"""
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return {name: dict(map(_entry, rows)) for name, rows in data.items()}
+
+
+@contextmanager
+def _locked(directory, exclusive):
+    """
+    Verrou des processus sur `directory` : exclusif pour modifier le cumul
+    des processus arrêtés, partagé pour le lire avec les autres fichiers
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(directory / ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def flush(directory):
+    """Écrit l'instantané de ce processus dans `directory` (remplacement atomique)"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    _write(directory / f"metrics-{PROCESS_TOKEN}.json", snapshot())
+
+
+def _retire(directory, paths, tables=None):
+    """
+    Ajoute les fichiers `paths` au cumul des processus arrêtés, puis les
+    supprime. `tables` remplace leur contenu (instantané à jour du processus)
+    """
+    with _locked(directory, exclusive=True):
+        retired = _read(directory / RETIRED_SNAPSHOT) or {}
+        if tables is not None:
+            _merge(retired, tables)
+        else:
+            for path in paths:
+                # Absent : déjà versé par un autre processus
+                _merge(retired, _read(path) or {})
+        _write(directory / RETIRED_SNAPSHOT, retired)
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+
+def retire_snapshot(directory):
+    """Verse les métriques de ce processus dans le cumul des processus arrêtés"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    _retire(directory, [directory / f"metrics-{PROCESS_TOKEN}.json"], snapshot())
+
+
+def retire_snapshot_at_exit(directory):
+    """Appelle `retire_snapshot` à la sortie du processus (inscrit une fois)"""
+    directory = str(directory)
+    if directory not in _exit_cleanups:
+        _exit_cleanups.add(directory)
+        atexit.register(retire_snapshot, directory)
+
+
+def _snapshot_pid(path):
+    """PID du processus d'un fichier `metrics-<pid>-<jeton>.json`, ou None"""
+    pid = path.stem.removeprefix("metrics-").split("-")[0]
+    return int(pid) if pid.isdigit() else None
+
+
+def _process_exists(pid):
+    """Faux si le processus `pid` n'existe plus (POSIX ; toujours vrai ailleurs)"""
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Processus d'un autre utilisateur
+    return True
+
+
+def _snapshot_paths(directory):
+    """Fichiers des autres processus (hors cumul des processus arrêtés)"""
+    own = f"metrics-{PROCESS_TOKEN}.json"
+    return [
+        path
+        for path in sorted(directory.glob("metrics-*.json"))
+        if path.name not in (own, RETIRED_SNAPSHOT)
+    ]
+
+
+def collect(directory):
+    """Métriques fusionnées de tous les processus ayant écrit dans `directory`"""
+    result = snapshot()
+    directory = Path(directory)
+    if not directory.is_dir():
+        return result
+
+    # Worker arrêté sans verser son fichier (tué, plantage)
+    dead = [
+        path
+        for path in _snapshot_paths(directory)
+        if (pid := _snapshot_pid(path)) is not None and not _process_exists(pid)
+    ]
+    if dead:
+        _retire(directory, dead)
+
+    with _locked(directory, exclusive=False):
+        for path in [directory / RETIRED_SNAPSHOT, *_snapshot_paths(directory)]:
+            # None : fichier absent, en cours de remplacement ou illisible
+            _merge(result, _read(path) or {})
+    return result
+
+
+def _entry(row):
+    labels, value = row
+    return tuple(labels), value
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(data):
+    """Format texte d'exposition Prometheus (version 0.0.4)"""
+    lines = []
+    for name, (metric, help_text) in COUNTERS.items():
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+        for labels, value in sorted(data.get(name, {}).items()):
+            lines.append(f"{metric}{_labels(LABELS[name], labels)} {value}")
+
+    for name, (metric, help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for labels, entry in sorted(data.get(name, {}).items()):
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], entry[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _number(float(bound))
+                lines.append(
+                    f"{metric}_bucket{_labels(LABELS[name], labels, [('le', le)])}"
+                    f" {cumulative}"
+                )
+            lines.append(
+                f"{metric}_sum{_labels(LABELS[name], labels)} {_number(entry[-1])}"
+            )
+            lines.append(f"{metric}_count{_labels(LABELS[name], labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class Flusher:
+    """Écrit l'instantané au plus une fois par `interval` secondes"""
+
+    def __init__(self, directory, interval):
+        self.directory = directory
+        self.interval = interval
+        self.next_flush = 0.0
+
+    def maybe_flush(self):
+        now = time.monotonic()
+        if now >= self.next_flush:
+            self.next_flush = now + self.interval
+            flush(self.directory)
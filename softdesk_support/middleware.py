@@ -0,0 +1,272 @@
+"""
+Middlewares de diagnostic des performances de l'API
+"""
+
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+
+from .instrumentation import (
+    current_stats,
+    instrument_serializers,
+    request_tracking,
+    view_label,
+)
+from .metrics import Flusher, record_request, retire_snapshot_at_exit
+from .nplusone import NPlusOneDetector
+from .profiling import check_token, sampler
+from .routers import (
+    is_sticky,
+    mark_sticky,
+    replica_databases,
+    replica_routing,
+    token_user_id,
+)
+from .sharding import (
+    request_shard,
+    set_current_shard,
+    shard_context,
+    shard_databases,
+)
+from .slowqueries import SlowQueryLog
+
+logger = logging.getLogger("softdesk_support.requests")
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Mesure chaque requête (requêtes SQL, temps base de données, sérialisation,
+    rendu) et l'expose dans l'en-tête `Server-Timing` ainsi que dans une ligne
+    de log structurée portant le ViewSet et l'action.
+
+    Activé par le setting `REQUEST_INSTRUMENTATION` ; désactivé, le middleware
+    se retire de la chaîne au démarrage et ne coûte rien.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_INSTRUMENTATION", False):
+            raise MiddlewareNotUsed
+        instrument_serializers()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_tracking() as stats:
+            request.request_stats = stats
+            response = self.get_response(request)
+
+        total = stats.elapsed
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"',
+                f"serializer;dur={stats.serializer_time * 1000:.2f}",
+                f"render;dur={stats.render_time * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+        logger.info(
+            "api_request view=%s action=%s method=%s path=%s status=%s "
+            "queries=%d db_ms=%.2f serializer_ms=%.2f render_ms=%.2f total_ms=%.2f",
+            stats.view,
+            stats.action,
+            request.method,
+            request.path,
+            response.status_code,
+            stats.queries,
+            stats.db_time * 1000,
+            stats.serializer_time * 1000,
+            stats.render_time * 1000,
+            total * 1000,
+            extra={
+                "view": stats.view,
+                "action": stats.action,
+                "queries": stats.queries,
+                "db_ms": round(stats.db_time * 1000, 2),
+            },
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.request_stats.bind_view(view_func, request.method)
+
+    def process_template_response(self, request, response):
+        """Les réponses DRF sont rendues juste après cette étape"""
+        stats = request.request_stats
+        start = time.perf_counter()
+
+        def rendered(response):
+            stats.render_time += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class NPlusOneMiddleware:
+    """
+    Signale les requêtes SQL répétées au sein d'une même requête HTTP
+    (développement et tests). Actif si `NPLUSONE_MODE` vaut "warn" ou "raise".
+    """
+
+    def __init__(self, get_response):
+        self.mode = getattr(settings, "NPLUSONE_MODE", "off")
+        if self.mode not in ("warn", "raise"):
+            raise MiddlewareNotUsed
+        self.threshold = getattr(settings, "NPLUSONE_THRESHOLD", 5)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detector = NPlusOneDetector(self.threshold)
+        with request_tracking() as stats:
+            stats.query_observers.append(detector)
+            response = self.get_response(request)
+
+        detector.report(self.mode, label=f"{request.method} {request.path}")
+        return response
+
+
+class SlowQueryMiddleware:
+    """
+    Journalise les requêtes SQL plus longues que `SLOW_QUERY_THRESHOLD` ms
+    avec leur plan d'exécution et leur origine (softdesk_support.slowqueries).
+    Actif si `SLOW_QUERY_LOG_ENABLED`.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "SLOW_QUERY_LOG_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.threshold = getattr(settings, "SLOW_QUERY_THRESHOLD", 100)
+        self.path = settings.SLOW_QUERY_LOG_PATH
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_tracking() as stats:
+            stats.query_observers.append(
+                SlowQueryLog(self.threshold, self.path, request)
+            )
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        current_stats().bind_view(view_func, request.method)
+
+
+class MetricsMiddleware:
+    """
+    Enregistre chaque requête dans les métriques Prometheus (softdesk_support
+    .metrics) : compteur par route, méthode et statut, histogrammes de durée et
+    de requêtes SQL. Actif si `METRICS_ENABLED` ; l'instantané du processus est
+    écrit dans `METRICS_DIR` toutes les `METRICS_FLUSH_INTERVAL` secondes.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.flusher = Flusher(
+            settings.METRICS_DIR, getattr(settings, "METRICS_FLUSH_INTERVAL", 10)
+        )
+        retire_snapshot_at_exit(settings.METRICS_DIR)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with request_tracking() as stats:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        record_request(
+            match.view_name if match else "unmatched",
+            request.method,
+            response.status_code,
+            stats.elapsed,
+            stats.queries,
+        )
+        self.flusher.maybe_flush()
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile par échantillonnage (softdesk_support.profiling) une fraction
+    `PROFILING_SAMPLE_RATE` des requêtes, ainsi que toute requête portant un
+    jeton signé valide dans l'en-tête `X-Profile-Token`. Actif si
+    `PROFILING_ENABLED` ; les piles sont agrégées par `ViewSet.action`.
+    """
+
+    header = "HTTP_X_PROFILE_TOKEN"
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.sample_rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        self.token_max_age = getattr(settings, "PROFILING_TOKEN_MAX_AGE", 3600)
+        sampler.interval = getattr(settings, "PROFILING_INTERVAL", 0.005)
+        sampler.max_concurrent = getattr(settings, "PROFILING_MAX_CONCURRENT", 4)
+        self.get_response = get_response
+
+    def wants_profile(self, request):
+        token = request.META.get(self.header)
+        if token is not None:
+            return check_token(token, self.token_max_age)
+        return random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self.wants_profile(request) or not sampler.start(
+            "unmatched", ProfilingMiddleware.__call__.__code__
+        ):
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        response["X-Profiled"] = "1"
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view, action = view_label(view_func, request.method)
+        sampler.relabel(f"{view}.{action}" if action else view)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Envoie les lectures des requêtes sûres vers un réplica (softdesk_support
+    .routers). Les écritures, les lectures qui les suivent et les requêtes
+    d'un utilisateur ayant écrit depuis moins de `REPLICA_STICKY_SECONDS`
+    restent sur la base principale. Actif si `REPLICA_DATABASES` est défini.
+    """
+
+    def __init__(self, get_response):
+        if not replica_databases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user_id = token_user_id(request)
+        primary = request.method not in SAFE_METHODS or is_sticky(user_id)
+        with replica_routing(primary) as state:
+            response = self.get_response(request)
+        if state.wrote:
+            mark_sticky(user_id)
+        return response
+
+
+class ShardRoutingMiddleware:
+    """
+    Fixe le shard des projets pour la requête (softdesk_support.sharding) :
+    celui du projet de l'URL (`/api/projects/<id>/...`), un shard choisi pour
+    la création d'un projet. Ailleurs (liste des projets...), les vues
+    interrogent toutes les bases. Actif si `SHARD_DATABASES` est défini.
+    """
+
+    def __init__(self, get_response):
+        if not shard_databases():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with shard_context(None):
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        url_name = getattr(request.resolver_match, "url_name", None) or ""
+        set_current_shard(request_shard(url_name, request.method, view_kwargs))
@@ -0,0 +1,172 @@
+"""
+Format normalisé des réponses (`?include=users`).
+
+    GET /api/projects/1/issues/12/comments/?include=users
+
+Par défaut, chaque ligne embarque le dictionnaire complet de ses
+utilisateurs (auteur, assigné...) : un même auteur est sérialisé autant de
+fois qu'il apparaît dans la page. Avec `?include=users`, ces champs ne
+contiennent plus que l'identifiant et chaque utilisateur est sérialisé une
+seule fois dans `included.users` (clé : identifiant) :
+
+    {"count": ..., "results": [{"author": 3, ...}], "included": {"users": {"3": {...}}}}
+
+Les utilisateurs des relations dépliées (`?expand=`) sont eux aussi
+remplacés par leur identifiant. Le détail d'un objet est renvoyé sous
+`data`. Ne s'applique qu'aux méthodes de lecture (GET, HEAD, OPTIONS) ;
+une action sans champ utilisateur répond 400.
+"""
+
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+class IncludedUsers:
+    """Utilisateurs référencés par une réponse, sérialisés une fois chacun"""
+
+    def __init__(self):
+        self.users = {}
+        self.ids = set()
+
+    def add(self, user):
+        """Référence un utilisateur déjà chargé ; retourne son identifiant"""
+        if user is None:
+            return None
+        self.users.setdefault(user.pk, user)
+        return user.pk
+
+    def add_id(self, pk):
+        """Référence un utilisateur par son identifiant (chargé plus tard)"""
+        if pk is not None:
+            self.ids.add(pk)
+        return pk
+
+    def serialize(self, serializer_class):
+        """`{identifiant: utilisateur sérialisé}`, une requête au plus"""
+        missing = self.ids - set(self.users)
+        if missing:
+            for user in get_user_model().objects.filter(pk__in=missing):
+                self.users[user.pk] = user
+        users = [self.users[pk] for pk in sorted(self.users)]
+        return {
+            str(user["id"]): user for user in serializer_class(users, many=True).data
+        }
+
+
+class UserReferenceField(serializers.Field):
+    """Identifiant d'un utilisateur, ajouté aux utilisateurs inclus"""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.context["included_users"].add(value)
+
+
+def user_reference(name, field):
+    """UserReferenceField remplaçant le champ utilisateur `name`"""
+    source = field.source_attrs[0]
+    return UserReferenceField(**({"source": source} if source != name else {}))
+
+
+def is_user_serializer(field):
+    return (
+        isinstance(field, serializers.ModelSerializer)
+        and field.Meta.model is get_user_model()
+    )
+
+
+class NormalizedUsersMixin:
+    """
+    Mixin de ViewSet pour `?include=users`. `normalized_user_fields` liste
+    les champs utilisateur remplacés par un identifiant et
+    `included_user_serializer` sérialise les utilisateurs inclus. À placer
+    avant ExpandMixin : les relations dépliées sont normalisées à leur tour.
+    """
+
+    normalized_user_fields = ()
+    included_user_serializer = None
+
+    def get_included_users(self):
+        """Utilisateurs inclus de la réponse, ou None hors format normalisé"""
+        if not hasattr(self, "_included_users"):
+            self._included_users = self._parse_include()
+        return self._included_users
+
+    def _parse_include(self):
+        request = self.request
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        include = request.query_params.get("include")
+        if not include:
+            return None
+        if include != "users":
+            raise ValidationError({"include": "Valeur autorisée : users"})
+        if not self.get_normalized_user_fields():
+            raise ValidationError({"include": "Aucun utilisateur pour cette action"})
+        return IncludedUsers()
+
+    def get_normalized_user_fields(self):
+        """Champs utilisateur de l'action courante"""
+        return self.normalized_user_fields
+
+    def get_user_references(self):
+        """Champs renvoyés sous forme d'identifiant pour cette requête"""
+        if self.get_included_users() is None:
+            return ()
+        return tuple(self.get_normalized_user_fields())
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        included = self.get_included_users()
+        if included is not None:
+            context["included_users"] = included
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        references = self.get_user_references()
+        if not references:
+            return serializer
+        target = getattr(serializer, "child", serializer)
+        for name in references:
+            field = target.fields.get(name)
+            if field is not None:
+                target.fields[name] = user_reference(name, field)
+        get_expansions = getattr(self, "get_expansions", None)
+        for name in get_expansions() if get_expansions else ():
+            field = target.fields.get(name)
+            if is_user_serializer(field):
+                target.fields[name] = user_reference(name, field)
+            elif field is not None:
+                self._reference_nested_users(getattr(field, "child", field))
+        return serializer
+
+    def _reference_nested_users(self, serializer):
+        """Utilisateurs imbriqués dans une relation dépliée : identifiants"""
+        for name, field in list(serializer.fields.items()):
+            if is_user_serializer(field):
+                serializer.fields[name] = user_reference(name, field)
+            elif isinstance(field, serializers.BaseSerializer):
+                self._reference_nested_users(getattr(field, "child", field))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        included = getattr(self, "_included_users", None)
+        if (
+            included is not None
+            and response.status_code == 200
+            and not response.exception
+        ):
+            data = response.data
+            if isinstance(data, list):
+                data = {"results": data}
+            elif self.action != "list":
+                data = {"data": data}
+            data["included"] = {
+                "users": included.serialize(self.included_user_serializer)
+            }
+            response.data = data
+        return super().finalize_response(request, response, *args, **kwargs)
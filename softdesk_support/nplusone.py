@@ -0,0 +1,79 @@
+"""
+Détection des requêtes N+1.
+
+Pendant une requête HTTP, chaque requête SQL est réduite à sa forme
+(`instrumentation.fingerprint`). Quand une même forme s'exécute plus de
+`NPLUSONE_THRESHOLD` fois, on retient le site d'appel responsable dans le code
+du projet (par exemple `ProjectListSerializer.get_contributors_names`) puis, en
+fin de requête, on émet un avertissement ou on lève une exception selon
+`NPLUSONE_MODE` ("off", "warn" ou "raise").
+"""
+
+import itertools
+import logging
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .instrumentation import call_site, fingerprint
+
+logger = logging.getLogger("softdesk_support.nplusone")
+
+# Requête logique en cours : une sous-requête de /api/batch/ est comptée à
+# part, dix détails d'issues dans un batch ne sont pas un N+1
+_scopes = itertools.count(1)
+_current_scope = ContextVar("nplusone_scope", default=0)
+
+
+@contextmanager
+def query_scope():
+    """Les requêtes SQL du bloc sont comptées à part"""
+    token = _current_scope.set(next(_scopes))
+    try:
+        yield
+    finally:
+        _current_scope.reset(token)
+
+
+class NPlusOneWarning(UserWarning):
+    """Requête répétée détectée (mode "warn")"""
+
+
+class NPlusOneError(AssertionError):
+    """Requête répétée détectée (mode "raise")"""
+
+
+class NPlusOneDetector:
+    """Compte les formes de requêtes SQL d'une requête HTTP"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.sites = {}
+
+    def __call__(self, sql, params, many, duration, connection):
+        """Observateur de requêtes (voir RequestStats.query_observers)"""
+        # Par base : une même requête sur chaque shard n'est pas un N+1
+        key = (_current_scope.get(), connection.alias, fingerprint(sql))
+        self.counts[key] += 1
+        if self.counts[key] == self.threshold + 1:
+            self.sites[key] = call_site(depth=2)
+
+    def violations(self):
+        """Liste de (forme, nombre d'exécutions, site d'appel)"""
+        return [(key[2], self.counts[key], site) for key, site in self.sites.items()]
+
+    def report(self, mode, label=""):
+        """Signale les violations selon le mode ("warn" ou "raise")"""
+        violations = self.violations()
+        if not violations:
+            return
+        message = "\n".join(
+            f"N+1 {label}: {count} exécutions de « {shape} » depuis {site}"
+            for shape, count, site in violations
+        )
+        if mode == "raise":
+            raise NPlusOneError(message)
+        logger.warning(message)
+        warnings.warn(message, NPlusOneWarning, stacklevel=2)
@@ -0,0 +1,163 @@
+"""
+Profilage par échantillonnage des requêtes, utilisable en production.
+
+Un unique thread échantillonneur relève, toutes les `PROFILING_INTERVAL`
+secondes, la pile d'appels des seuls threads qui traitent une requête
+profilée (`sys._current_frames()`), sans trace ni hook : le coût pour la
+requête est nul, celui de l'échantillonneur est borné par l'intervalle et
+par `PROFILING_MAX_CONCURRENT` requêtes profilées simultanément.
+
+Les piles sont agrégées par `ViewSet.action` au format « collapsed stacks »
+(`module:fonction;module:fonction N`), lu par flamegraph.pl et speedscope.
+Le nombre de piles distinctes par action est plafonné. Les profils restent
+en mémoire dans le processus : contrairement aux métriques, ils ne sont pas
+fusionnés entre workers.
+"""
+
+import sys
+import threading
+import time
+
+from django.core import signing
+
+TOKEN_SALT = "softdesk_support.profiling"
+MAX_STACKS_PER_VIEW = 5000
+TRUNCATED = "[truncated]"
+
+
+def profiling_token():
+    """Jeton signé (valeur de l'en-tête de profilage)"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign("profile")
+
+
+def check_token(token, max_age):
+    """Vrai si le jeton a été signé avec SECRET_KEY il y a moins de `max_age` s"""
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=max_age)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def collapse(frame, root_code):
+    """Pile `module:fonction;...` de la plus externe à `frame`, depuis `root_code`"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}")
+        if code is root_code:
+            break
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _Profile:
+    """Échantillons d'une action : `{pile: n}` et nombre de requêtes"""
+
+    def __init__(self):
+        self.stacks = {}
+        self.requests = 0
+
+    def add(self, stack):
+        stacks = self.stacks
+        if stack not in stacks and len(stacks) >= MAX_STACKS_PER_VIEW:
+            stack = TRUNCATED
+        stacks[stack] = stacks.get(stack, 0) + 1
+
+
+class Sampler:
+    """Échantillonneur partagé par tous les threads du processus"""
+
+    def __init__(self, interval=0.005, max_concurrent=4):
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.active = {}  # ident du thread -> [libellé, code racine]
+        self.profiles = {}  # libellé -> _Profile
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self, label, root_code):
+        """Profile le thread courant ; faux si la limite de requêtes est atteinte"""
+        ident = threading.get_ident()
+        with self.lock:
+            if len(self.active) >= self.max_concurrent:
+                return False
+            self.active[ident] = [label, root_code]
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self._run, name="softdesk-profiler", daemon=True
+                )
+                self.thread.start()
+        return True
+
+    def relabel(self, label):
+        """Libellé définitif (`ViewSet.action`), connu après la résolution"""
+        entry = self.active.get(threading.get_ident())
+        if entry is not None:
+            entry[0] = label
+
+    def stop(self):
+        """Fin de la requête profilée du thread courant"""
+        with self.lock:
+            label, _ = self.active.pop(threading.get_ident())
+            self._profile(label).requests += 1
+
+    def _profile(self, label):
+        profile = self.profiles.get(label)
+        if profile is None:
+            profile = self.profiles[label] = _Profile()
+        return profile
+
+    def sample(self):
+        """Relève une pile par requête profilée en cours"""
+        frames = sys._current_frames()
+        with self.lock:
+            for ident, (label, root_code) in self.active.items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    self._profile(label).add(collapse(frame, root_code))
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                if not self.active:
+                    # Aucun coût en l'absence de requête profilée
+                    self.thread = None
+                    return
+            self.sample()
+
+    def summary(self):
+        """`{libellé: {"requests": n, "samples": n}}`"""
+        with self.lock:
+            return {
+                label: {
+                    "requests": profile.requests,
+                    "samples": sum(profile.stacks.values()),
+                }
+                for label, profile in sorted(self.profiles.items())
+            }
+
+    def collapsed(self, label=None):
+        """Piles au format collapsed, d'une action ou de toutes (préfixées)"""
+        with self.lock:
+            items = [
+                (name, dict(profile.stacks))
+                for name, profile in sorted(self.profiles.items())
+                if label is None or name == label
+            ]
+        lines = []
+        for name, stacks in items:
+            prefix = "" if label else f"{name};"
+            lines += [
+                f"{prefix}{stack} {count}"
+                for stack, count in sorted(stacks.items(), key=lambda item: -item[1])
+            ]
+        return "".join(f"{line}\n" for line in lines)
+
+    def reset(self):
+        with self.lock:
+            self.profiles = {}
+
+
+sampler = Sampler()
@@ -0,0 +1,104 @@
+"""
+Renderer et parser JSON rapides.
+
+Le `JSONRenderer` de DRF passe par le module `json` de la bibliothèque
+standard et ses hooks d'encodage. Quand `orjson` est installé, ce module
+l'utilise à la place (datetimes et UUID encodés nativement en C) ; sinon il
+retombe sur le comportement standard de DRF.
+
+Le backend se choisit avec le setting `JSON_BACKEND` :
+- "auto" (défaut) : orjson s'il est installé, sinon la bibliothèque standard
+- "orjson" : orjson obligatoire
+- "stdlib" : toujours la bibliothèque standard
+"""
+
+import codecs
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépend de l'environnement
+    orjson = None
+
+# Équivalent des séparateurs compacts de DRF, dates UTC suffixées par "Z"
+# comme le fait serializers.DateTimeField
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z) if orjson else 0
+
+
+def use_orjson():
+    """Indique si le backend orjson doit être utilisé"""
+    backend = getattr(settings, "JSON_BACKEND", "auto")
+    if backend == "stdlib":
+        return False
+    if backend == "orjson" and orjson is None:
+        raise ImproperlyConfigured(
+            "JSON_BACKEND='orjson' mais orjson n'est pas installé"
+        )
+    return orjson is not None
+
+
+def _codec_name(encoding):
+    """Nom normalisé d'un encodage, None s'il est inconnu"""
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer utilisant orjson quand il est disponible.
+
+    Les cas que orjson ne sait pas reproduire à l'identique (sortie indentée
+    de l'interface navigable, sortie ASCII, séparateurs non compacts) passent
+    par l'implémentation de DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if (
+            indent is not None
+            or self.ensure_ascii
+            or not self.compact
+            or not use_orjson()
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data, default=self.encoder_class().default, option=ORJSON_OPTIONS
+        )
+
+        # Comme DRF : échapper \u2028 et \u2029 pour rester un sous-ensemble
+        # strict de JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser utilisant orjson pour les corps encodés en UTF-8"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not use_orjson() or _codec_name(encoding) != "utf-8":
+            # Autres encodages (et leur validation) : comportement de DRF
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
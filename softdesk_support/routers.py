@@ -0,0 +1,110 @@
+"""
+Routage des lectures vers les réplicas.
+
+`ReplicaRoutingMiddleware` décide, pour chaque requête HTTP, où vont les
+lectures :
+- méthodes sûres (GET, HEAD, OPTIONS) : un réplica de `REPLICA_DATABASES`,
+  le même pour toute la requête ;
+- autres méthodes, et toute lecture qui suit une écriture dans la même
+  requête : la base principale ;
+- pendant `REPLICA_STICKY_SECONDS` après une écriture d'un utilisateur, ses
+  requêtes lisent aussi la base principale (il relit ce qu'il vient d'écrire
+  malgré le retard des réplicas).
+
+Hors requête HTTP (commandes, shell, tests), tout va sur la base principale.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+_routing = ContextVar("replica_routing", default=None)
+
+STICKY_KEY = "replica:sticky:{}"
+
+
+class RoutingState:
+    """Choix de base d'une requête HTTP"""
+
+    def __init__(self, replica=None):
+        # None : lectures sur la base principale
+        self.replica = replica
+        self.wrote = False
+
+
+class ReplicaRouter:
+    """Lectures vers le réplica choisi pour la requête, écritures vers default"""
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or state.replica is None:
+            return None
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            # Lecture après écriture : la suite de la requête lit la base
+            # principale
+            state.wrote = True
+            state.replica = None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_databases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Les réplicas sont des copies de la base principale
+        if db in replica_databases():
+            return False
+        return None
+
+
+def replica_databases():
+    return getattr(settings, "REPLICA_DATABASES", [])
+
+
+def token_user_id(request):
+    """Identifiant de l'utilisateur du jeton JWT, sans requête SQL"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def is_sticky(user_id):
+    return user_id is not None and cache.get(STICKY_KEY.format(user_id)) is not None
+
+
+def mark_sticky(user_id):
+    window = getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+    if user_id is not None and window > 0:
+        cache.set(STICKY_KEY.format(user_id), True, timeout=window)
+
+
+@contextmanager
+def replica_routing(primary):
+    """Période de routage d'une requête HTTP ; `primary` : pas de réplica"""
+    replicas = replica_databases()
+    state = RoutingState(None if primary or not replicas else random.choice(replicas))
+    token = _routing.set(state)
+    try:
+        yield state
+    finally:
+        _routing.reset(token)
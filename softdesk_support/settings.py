@@ -14,6 +14,8 @@ from pathlib import Path
 from datetime import timedelta
 import os
 
+from softdesk_support.db import sqlite_database, sqlite_replicas, sqlite_shards
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -75,23 +77,97 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,  # Taille de page optimisée pour les performances
     # GREEN CODE: Limitation du taux de requêtes pour éviter la surcharge serveur
+    # Compteurs partagés entre workers (voir THROTTLE_STORE_PATH)
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "softdesk_support.throttling.SharedAnonRateThrottle",
+        "softdesk_support.throttling.SharedUserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "100/hour",  # 100 requêtes par heure pour les anonymes
         "user": "1000/hour",  # 1000 requêtes par heure pour les utilisateurs connectés
     },
-    # GREEN CODE: Optimisation des renderers
+    # GREEN CODE: Optimisation des renderers (orjson si installé, voir JSON_BACKEND)
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "softdesk_support.renderers.FastJSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",  # Interface de navigation DRF
         # Supprimer BrowsableAPIRenderer en production pour économiser les ressources
     ],
+    "DEFAULT_PARSER_CLASSES": [
+        "softdesk_support.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# Listes construites par les serializers compilés (softdesk_support.compiled)
+COMPILED_LIST_SERIALIZERS = (
+    os.getenv("COMPILED_LIST_SERIALIZERS", "True").lower() == "true"
+)
+
+# Limites de ?expand= (softdesk_support.expand) : niveaux d'imbrication,
+# relations par requête, éléments par relation multiple et par ligne
+EXPAND_MAX_DEPTH = int(os.getenv("EXPAND_MAX_DEPTH", "2"))
+EXPAND_MAX_RELATIONS = int(os.getenv("EXPAND_MAX_RELATIONS", "6"))
+EXPAND_MAX_ITEMS = int(os.getenv("EXPAND_MAX_ITEMS", "20"))
+
+# Nombre maximal de sous-requêtes de POST /api/batch/
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+
+# Encodeur JSON : "auto" (orjson si installé), "orjson" ou "stdlib"
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+# Base SQLite commune à tous les workers pour les compteurs de throttling
+THROTTLE_STORE_PATH = os.getenv("THROTTLE_STORE_PATH", BASE_DIR / "throttle.sqlite3")
+
+# Mesures par requête (en-tête Server-Timing + log structuré)
+REQUEST_INSTRUMENTATION = (
+    os.getenv("REQUEST_INSTRUMENTATION", "False").lower() == "true"
+)
+
+# Détection des requêtes N+1 : "off", "warn" ou "raise". Une même requête
+# SQL (aux paramètres près) exécutée plus de NPLUSONE_THRESHOLD fois au cours
+# d'une requête HTTP est signalée avec le code qui l'a déclenchée.
+NPLUSONE_MODE = os.getenv("NPLUSONE_MODE", "warn" if DEBUG else "off")
+NPLUSONE_THRESHOLD = int(os.getenv("NPLUSONE_THRESHOLD", "5"))
+
+# Transactions d'écriture (softdesk_support/writes.py) : BEGIN IMMEDIATE,
+# sérialisées dans le processus et rejouées si la base est verrouillée
+WRITE_SERIALIZE = os.getenv("WRITE_SERIALIZE", "True").lower() == "true"
+WRITE_RETRY_ATTEMPTS = int(os.getenv("WRITE_RETRY_ATTEMPTS", "5"))
+WRITE_RETRY_BACKOFF = float(os.getenv("WRITE_RETRY_BACKOFF", "0.05"))  # s
+
+# Journal des requêtes SQL lentes (une ligne JSON par requête au-delà du seuil,
+# avec plan d'exécution et origine) ; `manage.py slow_queries` l'agrège
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "False").lower() == "true"
+SLOW_QUERY_THRESHOLD = float(os.getenv("SLOW_QUERY_THRESHOLD", "100"))  # ms
+SLOW_QUERY_LOG_PATH = os.getenv(
+    "SLOW_QUERY_LOG_PATH", BASE_DIR / "logs" / "slow_queries.jsonl"
+)
+
+# Métriques Prometheus (GET /api/metrics/, administrateurs) : chaque processus
+# écrit son instantané dans METRICS_DIR, l'endpoint fusionne les fichiers
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False").lower() == "true"
+METRICS_DIR = os.getenv("METRICS_DIR", BASE_DIR / "metrics")
+METRICS_FLUSH_INTERVAL = int(os.getenv("METRICS_FLUSH_INTERVAL", "10"))
+
+# Profilage par échantillonnage (GET /api/profiling/, administrateurs) : une
+# fraction des requêtes, ou celles qui portent un jeton signé dans l'en-tête
+# X-Profile-Token (POST /api/profiling/ pour en obtenir un)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", "0.005"))
+PROFILING_MAX_CONCURRENT = int(os.getenv("PROFILING_MAX_CONCURRENT", "4"))
+PROFILING_TOKEN_MAX_AGE = int(os.getenv("PROFILING_TOKEN_MAX_AGE", "3600"))
+
 MIDDLEWARE = [
+    # Premiers pour mesurer l'ensemble de la requête (inactifs par défaut)
+    "softdesk_support.middleware.MetricsMiddleware",
+    "softdesk_support.middleware.RequestInstrumentationMiddleware",
+    "softdesk_support.middleware.NPlusOneMiddleware",
+    "softdesk_support.middleware.SlowQueryMiddleware",
+    "softdesk_support.middleware.ProfilingMiddleware",
+    "softdesk_support.middleware.ReplicaRoutingMiddleware",
+    "softdesk_support.middleware.ShardRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -103,6 +179,18 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = "softdesk_support.urls"
 
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # Logs de performance de l'API (instrumentation des requêtes...)
+        "softdesk_support": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -124,13 +212,46 @@ WSGI_APPLICATION = "softdesk_support.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# DATABASE_PROFILE=production : WAL, PRAGMA réglés et connexions persistantes
+# (voir softdesk_support/db.py)
+DATABASE_PROFILE = os.getenv("DATABASE_PROFILE", "development")
 DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+    "default": sqlite_database(
+        os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+        profile=DATABASE_PROFILE,
+        conn_max_age=int(os.getenv("CONN_MAX_AGE", "600")),
+    )
 }
 
+# Réplicas en lecture : chemins SQLite séparés par des virgules, copiés depuis
+# la base principale par `manage.py sync_replicas` (voir softdesk_support/
+# routers.py). Plusieurs workers : configurer un cache partagé (CACHES) pour
+# la fenêtre REPLICA_STICKY_SECONDS après une écriture.
+DATABASES.update(
+    sqlite_replicas(
+        [path for path in os.getenv("DATABASE_REPLICAS", "").split(",") if path],
+        profile=DATABASE_PROFILE,
+    )
+)
+REPLICA_DATABASES = [alias for alias in DATABASES if alias.startswith("replica_")]
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+# Répartition des projets (et de leurs contributeurs, issues et commentaires)
+# sur des bases SQLite séparées par des virgules : `shard_1`, `shard_2`...
+# Préparer chaque shard avec `manage.py init_shards` (voir softdesk_support/
+# sharding.py).
+DATABASES.update(
+    sqlite_shards(
+        [path for path in os.getenv("DATABASE_SHARDS", "").split(",") if path],
+        profile=DATABASE_PROFILE,
+    )
+)
+SHARD_DATABASES = [alias for alias in DATABASES if alias.startswith("shard_")]
+DATABASE_ROUTERS = [
+    "softdesk_support.sharding.ShardRouter",
+    "softdesk_support.routers.ReplicaRouter",
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
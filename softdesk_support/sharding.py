@@ -0,0 +1,437 @@
+"""
+Répartition optionnelle des projets sur plusieurs bases (shards).
+
+Un projet et tout ce qui en dépend (contributeurs, issues, commentaires)
+vivent sur un même shard. Les utilisateurs, l'authentification et la carte
+des shards restent sur `default` ; les utilisateurs sont recopiés sur chaque
+shard pour que les clés étrangères et les jointures restent locales.
+
+Le shard d'un projet se déduit de son identifiant : chaque shard numérote
+ses lignes à partir de `index × SHARD_ID_SPACE` (voir `reset_sequences`), les
+identifiants sont donc uniques sur l'ensemble des bases. Un projet déplacé
+(`manage.py move_project`) est inscrit dans la carte (`ProjectShard`) qui
+prime sur l'identifiant. Les identifiants inférieurs à `SHARD_ID_SPACE`
+désignent les projets créés sur `default` avant l'activation.
+
+`ShardRoutingMiddleware` fixe le shard de la requête d'après l'URL
+(`/api/projects/<id>/...`) ; la liste des projets interroge toutes les bases
+et fusionne les résultats (`fan_out`).
+"""
+
+import heapq
+import itertools
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from operator import attrgetter, itemgetter
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import QuerySet
+from django.db.models.query import (
+    FlatValuesListIterable,
+    NamedValuesListIterable,
+    ValuesIterable,
+    ValuesListIterable,
+)
+
+SHARDED_MODELS = {
+    "issues.project",
+    "issues.contributor",
+    "issues.issue",
+    "issues.comment",
+}
+SHARD_MAP_MODEL = "issues.projectshard"
+
+# Plage d'identifiants de chaque shard
+SHARD_ID_SPACE = 10**12
+
+_current_shard = ContextVar("current_shard", default=None)
+
+
+def shard_databases():
+    return getattr(settings, "SHARD_DATABASES", [])
+
+
+def locations():
+    """Bases pouvant contenir des projets : default (historique) et shards"""
+    return [DEFAULT_DB_ALIAS, *shard_databases()]
+
+
+def shard_for(project_id):
+    """
+    Base qui contient le projet `project_id`. Lit la carte sur `default` à
+    chaque appel : pas de cache, un déplacement est vu aussitôt par tous les
+    processus.
+    """
+    from issues.models import ProjectShard
+
+    try:
+        project_id = int(project_id)
+    except (TypeError, ValueError):
+        return DEFAULT_DB_ALIAS
+    moved = (
+        ProjectShard.objects.filter(project_id=project_id)
+        .values_list("database", flat=True)
+        .first()
+    )
+    return moved or _home_shard(project_id)
+
+
+def placement_shard():
+    """Shard d'un nouveau projet"""
+    return random.choice(shard_databases())
+
+
+def request_shard(url_name, method, view_kwargs):
+    """
+    Shard d'une requête d'après sa route : celui du projet de l'URL
+    (`/api/projects/<id>/...`), un shard choisi pour la création d'un projet,
+    None ailleurs (les vues interrogent alors toutes les bases)
+    """
+    if "project_pk" in view_kwargs:
+        return shard_for(view_kwargs["project_pk"])
+    if url_name.startswith("project-") and "pk" in view_kwargs:
+        return shard_for(view_kwargs["pk"])
+    if url_name == "project-list" and method == "POST":
+        return placement_shard()
+    return None
+
+
+@contextmanager
+def shard_context(alias):
+    """Les modèles répartis de ce bloc sont lus et écrits sur `alias`"""
+    token = _current_shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _current_shard.reset(token)
+
+
+def current_shard():
+    return _current_shard.get()
+
+
+def set_current_shard(alias):
+    """Fixe le shard pour la suite de la requête (voir ShardRoutingMiddleware)"""
+    _current_shard.set(alias)
+
+
+class ShardRouter:
+    """Modèles répartis vers le shard de l'instance ou de la requête"""
+
+    def _route(self, model, hints):
+        label = model._meta.label_lower
+        if label == SHARD_MAP_MODEL:
+            return DEFAULT_DB_ALIAS
+        if label not in SHARDED_MODELS or not shard_databases():
+            return None
+        instance = hints.get("instance")
+        if (
+            instance is not None
+            and instance._meta.label_lower in SHARDED_MODELS
+            and instance._state.db
+        ):
+            return instance._state.db
+        return _current_shard.get()
+
+    def db_for_read(self, model, **hints):
+        return self._route(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._route(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Les utilisateurs sont recopiés sur chaque shard
+        user_label = get_user_model()._meta.label_lower
+        if user_label in (obj1._meta.label_lower, obj2._meta.label_lower):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if model_name and f"{app_label}.{model_name}" == SHARD_MAP_MODEL:
+            return db == DEFAULT_DB_ALIAS
+        return None
+
+
+def _merge_key(queryset):
+    """(clé de tri des lignes, ordre décroissant) d'un queryset ordonné"""
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    if not ordering:
+        return None, False
+    field = ordering[0]
+    reverse = field.startswith("-")
+    field = field.lstrip("-")
+    pk = queryset.model._meta.pk
+    names = [field]
+    if field in ("pk", pk.name, pk.attname):
+        names = ["pk", pk.name, pk.attname]
+
+    iterable = queryset._iterable_class
+    if iterable is ValuesIterable:
+        name = next((name for name in names if name in queryset._fields), None)
+        return (itemgetter(name) if name else None), reverse
+    if iterable in (ValuesListIterable, NamedValuesListIterable):
+        fields = list(queryset._fields)
+        name = next((name for name in names if name in fields), None)
+        return (itemgetter(fields.index(name)) if name else None), reverse
+    if iterable is FlatValuesListIterable:
+        return (lambda value: value), reverse
+    return attrgetter(names[0]), reverse
+
+
+class FanOutQuerySet:
+    """
+    Même queryset exécuté sur plusieurs bases. Les méthodes qui renvoient un
+    queryset sont appliquées à chaque base ; la lecture fusionne les
+    résultats selon le premier critère de tri (`order_by`). Une page
+    `[début:fin]` lit au plus `fin` lignes par base.
+    """
+
+    def __init__(self, querysets):
+        self.querysets = querysets
+
+    def __getattr__(self, name):
+        attribute = getattr(self.querysets[0], name)
+        if not callable(attribute):
+            return attribute
+
+        def method(*args, **kwargs):
+            results = [
+                getattr(queryset, name)(*args, **kwargs) for queryset in self.querysets
+            ]
+            if all(isinstance(result, QuerySet) for result in results):
+                return FanOutQuerySet(results)
+            return results
+
+        return method
+
+    @property
+    def ordered(self):
+        return self.querysets[0].ordered
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def exists(self):
+        return any(queryset.exists() for queryset in self.querysets)
+
+    def _merge(self, querysets):
+        key, reverse = _merge_key(self.querysets[0])
+        if key is None:
+            return itertools.chain.from_iterable(querysets)
+        return heapq.merge(*querysets, key=key, reverse=reverse)
+
+    def __iter__(self):
+        return iter(self._merge(self.querysets))
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if isinstance(index, int):
+            return self[index : index + 1][0]
+        start, stop = index.start or 0, index.stop
+        if index.step is not None or stop is None:
+            return list(self)[index]
+        rows = self._merge([list(queryset[:stop]) for queryset in self.querysets])
+        return list(itertools.islice(rows, start, stop))
+
+
+def fan_out(queryset):
+    """`queryset` sur toutes les bases de projets si la répartition est active"""
+    if not shard_databases():
+        return queryset
+    return FanOutQuerySet([queryset.using(alias) for alias in locations()])
+
+
+def _user_fields():
+    User = get_user_model()
+    return [
+        field.attname for field in User._meta.concrete_fields if not field.primary_key
+    ]
+
+
+def mirror_users(users, aliases=None):
+    """Recopie (insère ou met à jour) des utilisateurs sur les shards"""
+    User = get_user_model()
+    users = list(users)
+    for alias in shard_databases() if aliases is None else aliases:
+        User.objects.using(alias).bulk_create(
+            users,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=_user_fields(),
+        )
+
+
+def user_saved(sender, instance, raw=False, using=None, **kwargs):
+    """Signal post_save de l'utilisateur : recopie sur les shards"""
+    if raw or using != DEFAULT_DB_ALIAS or not shard_databases():
+        return
+    mirror_users([instance])
+
+
+def user_deleted(sender, instance, using=None, **kwargs):
+    """Signal post_delete : suppression en cascade sur chaque shard"""
+    if using != DEFAULT_DB_ALIAS or not shard_databases():
+        return
+    for alias in shard_databases():
+        sender.objects.using(alias).filter(pk=instance.pk).delete()
+
+
+def sharded_models():
+    return [apps.get_model(label) for label in sorted(SHARDED_MODELS)]
+
+
+def shard_index(alias):
+    """0 pour default, `k` pour le k-ième shard de `SHARD_DATABASES`"""
+    if alias == DEFAULT_DB_ALIAS:
+        return 0
+    return shard_databases().index(alias) + 1
+
+
+def sequences(alias):
+    """Compteurs d'identifiants de `alias` : {table: dernier identifiant}"""
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT name, seq FROM sqlite_sequence")
+        return dict(cursor.fetchall())
+
+
+def reset_sequences(alias, previous=None):
+    """
+    Replace les compteurs d'identifiants de `alias` dans sa plage, sans
+    jamais les abaisser : un identifiant attribué (puis supprimé ou déplacé)
+    n'est pas réattribué. `previous` : compteurs relevés avant une copie de
+    lignes d'une autre plage, qui déplace ceux de SQLite.
+    """
+    start = shard_index(alias) * SHARD_ID_SPACE
+    end = start + SHARD_ID_SPACE
+    current = sequences(alias)
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        for model in sharded_models():
+            if not model._meta.pk.get_internal_type().endswith("AutoField"):
+                continue  # Clé UUID : déjà unique
+            table = model._meta.db_table
+            pk = connection.ops.quote_name(model._meta.pk.column)
+            cursor.execute(
+                f"SELECT MAX({pk}) FROM {connection.ops.quote_name(table)} "
+                f"WHERE {pk} >= %s AND {pk} < %s",
+                [start, end],
+            )
+            candidates = [start, cursor.fetchone()[0] or start]
+            for counters in (current, previous or {}):
+                if start <= counters.get(table, -1) < end:
+                    candidates.append(counters[table])
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = %s", [table])
+            cursor.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)",
+                [table, max(candidates)],
+            )
+
+
+def prepare_shard(alias):
+    """Numérote les lignes du shard dans sa plage et y recopie les utilisateurs"""
+    reset_sequences(alias)
+    User = get_user_model()
+    users = User.objects.using(DEFAULT_DB_ALIAS).order_by("pk").iterator()
+    while batch := list(itertools.islice(users, 1000)):
+        mirror_users(batch, [alias])
+
+
+# Lignes d'un projet, par table (paramètre : identifiant du projet)
+_PROJECT_ROWS = {
+    "issues.project": "id = %s",
+    "issues.contributor": "project_id = %s",
+    "issues.issue": "project_id = %s",
+    "issues.comment": (
+        "issue_id IN (SELECT id FROM source.issues_issue WHERE project_id = %s)"
+    ),
+}
+
+
+def move_project(project_id, target):
+    """
+    Déplace un projet et ses lignes vers le shard `target` :
+    copie à l'identique (ATTACH SQLite), mise à jour de la carte, puis
+    suppression de la source. Les écritures sur la source attendent la fin du
+    déplacement (transaction IMMEDIATE).
+    """
+    from issues.models import Comment, Contributor, Issue, Project, ProjectShard
+
+    source = shard_for(project_id)
+    if source == target:
+        return source
+    User = get_user_model()
+    target_connection = connections[target]
+
+    with transaction.atomic(using=source):
+        project = Project.objects.using(source).get(pk=project_id)
+        issues = Issue.objects.using(source).filter(project=project)
+        user_ids = {project.author_id}
+        user_ids |= set(
+            Contributor.objects.using(source)
+            .filter(project=project)
+            .values_list("user_id", flat=True)
+        )
+        user_ids |= set(issues.values_list("author_id", flat=True))
+        user_ids |= set(issues.values_list("assigned_to_id", flat=True))
+        user_ids |= set(
+            Comment.objects.using(source)
+            .filter(issue__project=project)
+            .values_list("author_id", flat=True)
+        )
+        if target != DEFAULT_DB_ALIAS:
+            mirror_users(
+                User.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=user_ids - {None}),
+                [target],
+            )
+
+        # ATTACH est interdit dans une transaction
+        target_connection.ensure_connection()
+        with target_connection.cursor() as cursor:
+            cursor.execute(
+                "ATTACH DATABASE %s AS source",
+                [str(connections[source].settings_dict["NAME"])],
+            )
+        try:
+            with transaction.atomic(using=target):
+                previous = sequences(target)
+                with target_connection.cursor() as cursor:
+                    for label, where in _PROJECT_ROWS.items():
+                        model = apps.get_model(label)
+                        table = target_connection.ops.quote_name(model._meta.db_table)
+                        columns = ", ".join(
+                            target_connection.ops.quote_name(field.column)
+                            for field in model._meta.concrete_fields
+                        )
+                        cursor.execute(
+                            f"INSERT INTO {table} ({columns}) "
+                            f"SELECT {columns} FROM source.{table} WHERE {where}",
+                            [project_id],
+                        )
+                reset_sequences(target, previous)
+        finally:
+            with target_connection.cursor() as cursor:
+                cursor.execute("DETACH DATABASE source")
+
+        if target == _home_shard(project_id):
+            ProjectShard.objects.filter(project_id=project_id).delete()
+        else:
+            ProjectShard.objects.update_or_create(
+                project_id=project_id, defaults={"database": target}
+            )
+        project.delete(using=source)
+    return source
+
+
+def _home_shard(project_id):
+    """Shard désigné par l'identifiant seul"""
+    shards = shard_databases()
+    index = project_id // SHARD_ID_SPACE
+    if 1 <= index <= len(shards):
+        return shards[index - 1]
+    return DEFAULT_DB_ALIAS
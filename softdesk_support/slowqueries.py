@@ -0,0 +1,115 @@
+"""
+Journal des requêtes SQL lentes.
+
+Toute requête SQL plus longue que `SLOW_QUERY_THRESHOLD` millisecondes au
+cours d'une requête HTTP est écrite dans `SLOW_QUERY_LOG_PATH` (une ligne
+JSON par requête) avec sa forme normalisée, son plan d'exécution
+(`EXPLAIN QUERY PLAN` sous SQLite), le ViewSet et l'action, et la méthode de
+`issues/` ou `users/` qui l'a déclenchée. Les paramètres ne sont pas écrits.
+
+`python manage.py slow_queries` agrège le journal par forme de requête.
+"""
+
+import json
+import sys
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+
+from django.db import DatabaseError
+
+from .instrumentation import call_site, current_stats, fingerprint
+
+# Code applicatif auquel les requêtes lentes sont attribuées
+APPLICATION_PACKAGES = ("issues", "users")
+
+_write_lock = threading.Lock()
+
+
+def explain(connection, sql, params):
+    """
+    Plan d'exécution d'une requête, ou None. Le curseur du backend est
+    utilisé directement : l'EXPLAIN ne passe pas par les execute_wrapper
+    (il n'est ni compté ni journalisé lui-même).
+    """
+    if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        return None
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    try:
+        cursor = connection.create_cursor()
+        try:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+    except DatabaseError:
+        return None
+    if connection.vendor == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [" ".join(str(value) for value in row) for row in rows]
+
+
+def origin(depth=1):
+    """
+    Code applicatif responsable de la requête. Un queryset construit dans
+    `get_queryset()` est évalué plus tard par DRF : on remonte alors à la
+    méthode héritée exécutée pour une classe du projet, par exemple
+    `ProjectViewSet.list (via ListModelMixin.list)`.
+    """
+    site = call_site(depth + 1, packages=APPLICATION_PACKAGES)
+    if site is not None:
+        return site
+    frame = sys._getframe(depth)
+    while frame is not None:
+        owner = frame.f_locals.get("self")
+        if (
+            owner is not None
+            and type(owner).__module__.split(".")[0] in APPLICATION_PACKAGES
+        ):
+            code = frame.f_code
+            return f"{type(owner).__name__}.{code.co_name} (via {code.co_qualname})"
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    """Observateur de requêtes d'une requête HTTP (voir RequestStats)"""
+
+    def __init__(self, threshold, path, request):
+        self.threshold = threshold / 1000
+        self.path = Path(path)
+        self.request = request
+
+    def __call__(self, sql, params, many, duration, connection):
+        if duration < self.threshold:
+            return
+        stats = current_stats()
+        record = {
+            "time": datetime.now(UTC).isoformat(),
+            "duration_ms": round(duration * 1000, 3),
+            "fingerprint": fingerprint(sql),
+            "sql": sql,
+            "many": many,
+            "plan": None if many else explain(connection, sql, params),
+            "view": stats.view if stats else None,
+            "action": stats.action if stats else None,
+            "method": self.request.method,
+            "path": self.request.path,
+            "call_site": origin(depth=2),
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with _write_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as log:
+                log.write(line)
+
+
+def read_log(path):
+    """Enregistrements du journal (lignes illisibles ignorées)"""
+    with Path(path).open(encoding="utf-8") as log:
+        for line in log:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
@@ -0,0 +1,243 @@
+"""
+Limitation du taux de requêtes partagée entre tous les workers.
+
+Les throttles DRF par défaut conservent l'historique des requêtes dans le cache
+local du processus : avec N workers, la limite effective devient N fois le taux
+configuré, et la lecture/écriture de l'historique n'est pas atomique.
+
+Ce module stocke les compteurs dans une petite base SQLite commune à tous les
+workers. Chaque clé occupe une seule ligne (fenêtre glissante approchée par
+deux fenêtres fixes pondérées), le travail par requête est donc constant,
+et la transaction `BEGIN IMMEDIATE` rend la mise à jour atomique.
+
+Chaque action de ViewSet peut déclarer un coût (`throttle_costs`) : une page
+de liste consomme plus de budget qu'un détail, ce qui permet de limiter les
+opérations coûteuses sans affamer les lectures simples. Une vue peut aussi
+calculer le coût de la requête (`get_throttle_cost`, voir /api/batch/). Le
+budget restant est renvoyé dans les en-têtes `X-RateLimit-*` (voir
+`RateLimitHeadersMixin`).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    SimpleRateThrottle,
+    UserRateThrottle,
+)
+
+from .metrics import record_throttle_rejection
+
+# Résultat d'un passage dans le compteur
+WindowState = namedtuple("WindowState", ["allowed", "limit", "used", "wait"])
+
+
+class SlidingWindowStore:
+    """
+    Compteurs à fenêtre glissante stockés dans une base SQLite partagée.
+
+    Pour chaque clé on garde le numéro de la fenêtre courante, la consommation
+    de la fenêtre courante et celle de la fenêtre précédente. L'usage estimé
+    vaut `précédente × (1 - avancement) + courante`.
+    """
+
+    # Nombre de passages entre deux purges des clés expirées
+    PURGE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._hits = 0
+
+    def _connection(self):
+        """Connexion propre au thread (et recréée après un fork)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_window ("
+                " key TEXT PRIMARY KEY,"
+                " window INTEGER NOT NULL,"
+                " current REAL NOT NULL,"
+                " previous REAL NOT NULL,"
+                " expires REAL NOT NULL)"
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def hit(self, key, limit, duration, cost=1, now=None):
+        """
+        Consomme `cost` unités du budget de `key` si la limite le permet.
+
+        Retourne un `WindowState` (autorisé, limite, usage estimé, attente
+        recommandée en secondes ou None si la requête ne passera jamais).
+        """
+        now = time.time() if now is None else now
+        window = int(now // duration)
+        elapsed = (now % duration) / duration
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT window, current, previous FROM throttle_window WHERE key = ?",
+                (key,),
+            ).fetchone()
+            current, previous = self._shift(row, window)
+            used = previous * (1 - elapsed) + current
+            allowed = used + cost <= limit
+            if allowed:
+                current += cost
+                used += cost
+                conn.execute(
+                    "INSERT INTO throttle_window"
+                    " (key, window, current, previous, expires)"
+                    " VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET window = excluded.window,"
+                    " current = excluded.current, previous = excluded.previous,"
+                    " expires = excluded.expires",
+                    (key, window, current, previous, (window + 2) * duration),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        self._hits += 1
+        if self._hits % self.PURGE_EVERY == 0:
+            self.purge(now)
+
+        wait = None
+        if not allowed:
+            wait = self._wait(limit, cost, current, previous, elapsed, duration)
+        return WindowState(allowed, limit, used, wait)
+
+    @staticmethod
+    def _shift(row, window):
+        """Ramène les compteurs stockés sur la fenêtre courante"""
+        if row is None:
+            return 0.0, 0.0
+        stored_window, current, previous = row
+        if stored_window == window:
+            return current, previous
+        if stored_window == window - 1:
+            return 0.0, current
+        return 0.0, 0.0
+
+    @staticmethod
+    def _wait(limit, cost, current, previous, elapsed, duration):
+        """Temps avant que `cost` unités redeviennent disponibles"""
+        if cost > limit:
+            return None
+        # Dans la fenêtre courante, seule la part de la précédente décroît
+        if previous and current + cost <= limit:
+            target = 1 - (limit - cost - current) / previous
+            return max(0.0, (target - elapsed) * duration)
+        # Sinon attendre la fenêtre suivante, où `current` devient `previous`
+        target = max(0.0, 1 - (limit - cost) / current) if current else 0.0
+        return (1 - elapsed + target) * duration
+
+    def purge(self, now=None):
+        """Supprime les clés dont les deux fenêtres sont expirées"""
+        now = time.time() if now is None else now
+        self._connection().execute(
+            "DELETE FROM throttle_window WHERE expires < ?", (now,)
+        )
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    """Retourne le store associé au chemin configuré dans les settings"""
+    path = str(settings.THROTTLE_STORE_PATH)
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.setdefault(path, SlidingWindowStore(path))
+    return store
+
+
+class SharedRateThrottle(SimpleRateThrottle):
+    """
+    Throttle DRF dont les compteurs vivent dans le store SQLite partagé
+    au lieu de l'historique de timestamps du cache local.
+
+    Chaque requête est débitée du coût déclaré par l'action de la vue
+    (`throttle_costs = {"list": 2, ...}`), 1 par défaut.
+    """
+
+    def get_cost(self, request, view):
+        """Coût de la requête selon l'action du ViewSet"""
+        get_throttle_cost = getattr(view, "get_throttle_cost", None)
+        if get_throttle_cost is not None:
+            return get_throttle_cost(request)
+        costs = getattr(view, "throttle_costs", None) or {}
+        return costs.get(getattr(view, "action", None), 1)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        # Sous-requête de /api/batch/ : déjà débitée avec le batch
+        if getattr(request, "batched", False):
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        self.cost = self.get_cost(request, view)
+        self.state = get_store().hit(
+            self.key, self.num_requests, self.duration, cost=self.cost, now=self.now
+        )
+
+        # Mémorisé sur la requête pour les en-têtes X-RateLimit-*
+        if not hasattr(request, "throttle_states"):
+            request.throttle_states = []
+        request.throttle_states.append((self.cost, self.state))
+
+        if self.state.allowed:
+            return True
+        record_throttle_rejection(self.scope)
+        return self.throttle_failure()
+
+    def wait(self):
+        """Délai recommandé avant la prochaine requête (en-tête Retry-After)"""
+        return self.state.wait
+
+
+class SharedAnonRateThrottle(SharedRateThrottle, AnonRateThrottle):
+    """Limite les utilisateurs anonymes (clé : adresse IP)"""
+
+
+class SharedUserRateThrottle(SharedRateThrottle, UserRateThrottle):
+    """Limite les utilisateurs connectés (clé : identifiant utilisateur)"""
+
+
+class RateLimitHeadersMixin:
+    """
+    Mixin de ViewSet qui expose le budget restant le plus contraignant :
+    `X-RateLimit-Limit`, `X-RateLimit-Remaining` et `X-RateLimit-Cost`.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        states = getattr(request, "throttle_states", None)
+        if states:
+            cost, state = min(states, key=lambda item: item[1].limit - item[1].used)
+            response["X-RateLimit-Limit"] = str(state.limit)
+            response["X-RateLimit-Remaining"] = str(
+                max(0, int(state.limit - state.used))
+            )
+            response["X-RateLimit-Cost"] = str(cost)
+        return response
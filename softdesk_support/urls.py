@@ -21,6 +21,8 @@ from issues.views import (
     CommentViewSet,
     ContributorViewSet,
 )
+from softdesk_support.batch import BatchView
+from softdesk_support.views import MetricsView, ProfilingView
 
 
 # Routeur principal
@@ -47,6 +49,12 @@ urlpatterns = [
     # Endpoints d'authentification JWT
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    # Métriques Prometheus (administrateurs uniquement)
+    path("api/metrics/", MetricsView.as_view(), name="metrics"),
+    # Profils par échantillonnage (administrateurs uniquement)
+    path("api/profiling/", ProfilingView.as_view(), name="profiling"),
+    # Plusieurs appels d'API en une requête HTTP
+    path("api/batch/", BatchView.as_view(), name="batch"),
     # Routes principales (users, projects, issues, comments - accès direct)
     path("api/", include(router.urls)),
     # Routes imbriquées (projects/{id}/contributors, projects/{id}/issues)
@@ -0,0 +1,81 @@
+"""
+Endpoints d'exploitation (réservés aux administrateurs)
+"""
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .metrics import collect, render_prometheus
+from .profiling import profiling_token, sampler
+
+
+class PlainTextRenderer(BaseRenderer):
+    """Texte brut ; les erreurs DRF sont réduites à leur message"""
+
+    media_type = "text/plain"
+    format = "txt"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and "detail" in data:
+            return f"{data['detail']}\n"
+        return data
+
+
+class MetricsView(APIView):
+    """Métriques de tous les workers au format Prometheus"""
+
+    permission_classes = [IsAdminUser]
+    renderer_classes = [PlainTextRenderer]
+    # Le scraping ne consomme pas de budget de throttling
+    throttle_classes = []
+
+    def get(self, request):
+        return Response(
+            render_prometheus(collect(settings.METRICS_DIR)),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
+class ProfilingView(APIView):
+    """
+    Profils par échantillonnage de ce processus (pas des autres workers) :
+    - GET : nombre de requêtes et d'échantillons par action ;
+    - GET ?view=IssueViewSet.list (ou ?view=all) : piles au format collapsed ;
+    - POST : jeton signé à placer dans l'en-tête X-Profile-Token ;
+    - DELETE : remise à zéro.
+    """
+
+    permission_classes = [IsAdminUser]
+    throttle_classes = []
+
+    def get(self, request):
+        label = request.query_params.get("view")
+        if label is None:
+            return Response({"interval": sampler.interval, "views": sampler.summary()})
+        # Texte brut quel que soit le format négocié (téléchargement)
+        response = HttpResponse(
+            sampler.collapsed(None if label == "all" else label),
+            content_type="text/plain; charset=utf-8",
+        )
+        response["Content-Disposition"] = 'attachment; filename="profile.collapsed"'
+        return response
+
+    def post(self, request):
+        return Response(
+            {
+                "header": "X-Profile-Token",
+                "token": profiling_token(),
+                "expires_in": getattr(settings, "PROFILING_TOKEN_MAX_AGE", 3600),
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    def delete(self, request):
+        sampler.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
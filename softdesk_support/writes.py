@@ -0,0 +1,99 @@
+"""
+Écritures concurrentes sur SQLite.
+
+Une transaction Django ouverte par `BEGIN` (différée) lit d'abord sous verrou
+partagé puis doit obtenir le verrou d'écriture : deux transactions dans ce
+cas s'attendent mutuellement et SQLite en fait échouer une immédiatement
+(« database is locked »), sans tenir compte de `busy_timeout`.
+
+`atomic_write` remplace `transaction.atomic` sur les chemins d'écriture :
+- la transaction est ouverte par `BEGIN IMMEDIATE` (option `transaction_mode`
+  des connexions, voir softdesk_support/db.py) : le verrou d'écriture est
+  pris d'entrée, l'attente se fait au `BEGIN` et respecte `busy_timeout` ;
+- dans un même processus, les transactions d'écriture passent une à une
+  (`WRITE_SERIALIZE`) : les threads attendent sur un verrou plutôt que de
+  solliciter SQLite en boucle ;
+- une erreur de verrouillage relance la fonction entière après une attente
+  exponentielle aléatoire (`WRITE_RETRY_ATTEMPTS`, `WRITE_RETRY_BACKOFF`).
+
+À l'intérieur d'une transaction existante, la fonction est exécutée telle
+quelle : seule la transaction la plus externe peut être rejouée.
+"""
+
+import functools
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from .sharding import current_shard
+
+logger = logging.getLogger("softdesk_support.writes")
+
+_write_locks = {}  # alias -> verrou des transactions d'écriture du processus
+_write_locks_guard = threading.Lock()
+
+
+def is_lock_error(error):
+    """Vrai pour les erreurs SQLite de verrouillage (à rejouer)"""
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def backoff_delay(attempt, base, cap=1.0):
+    """Attente avant la tentative `attempt + 1` (exponentielle, « full jitter »)"""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def _write_lock(alias):
+    lock = _write_locks.get(alias)
+    if lock is None:
+        with _write_locks_guard:
+            lock = _write_locks.setdefault(alias, threading.RLock())
+    return lock
+
+
+def atomic_write(func=None, *, using=None):
+    """
+    Décorateur : exécute `func` dans une transaction d'écriture coordonnée,
+    rejouée en cas de verrouillage (voir le docstring du module)
+    """
+    if func is None:
+        return functools.partial(atomic_write, using=using)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Sans `using` : la base des projets de la requête (shard) ou default
+        alias = using or current_shard() or DEFAULT_DB_ALIAS
+        if connections[alias].in_atomic_block:
+            with transaction.atomic(using=alias):
+                return func(*args, **kwargs)
+
+        attempts = max(1, getattr(settings, "WRITE_RETRY_ATTEMPTS", 5))
+        base = getattr(settings, "WRITE_RETRY_BACKOFF", 0.05)
+        serialize = getattr(settings, "WRITE_SERIALIZE", True)
+        for attempt in range(attempts):
+            try:
+                with ExitStack() as stack:
+                    if serialize:
+                        stack.enter_context(_write_lock(alias))
+                    stack.enter_context(transaction.atomic(using=alias))
+                    return func(*args, **kwargs)
+            except OperationalError as error:
+                if not is_lock_error(error) or attempt == attempts - 1:
+                    raise
+                delay = backoff_delay(attempt, base)
+                logger.info(
+                    "write_retry function=%s attempt=%d delay_ms=%.1f error=%s",
+                    func.__qualname__,
+                    attempt + 1,
+                    delay * 1000,
+                    error,
+                )
+                time.sleep(delay)
+
+    return wrapper
@@ -7,6 +7,7 @@ import os
 import sys
 import django
 from pathlib import Path
+from django.db import connections
 
 # Ajouter le répertoire racine au path Python
 ROOT_DIR = Path(__file__).resolve().parent.parent
@@ -26,6 +27,19 @@ from issues.models import Project, Issue
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def isolated_throttle_store(settings, tmp_path):
+    """Compteurs de throttling propres à chaque test"""
+    settings.THROTTLE_STORE_PATH = tmp_path / "throttle.sqlite3"
+
+
+@pytest.fixture(autouse=True)
+def detect_n_plus_one(settings):
+    """Toute requête SQL répétée au-delà du seuil fait échouer le test"""
+    settings.NPLUSONE_MODE = "raise"
+    settings.NPLUSONE_THRESHOLD = 3
+
+
 @pytest.fixture
 def api_client():
     """Client API pour les tests"""
@@ -109,3 +123,34 @@ def create_issue(create_project, create_user):
         return Issue.objects.create(**defaults)
 
     return _create_issue
+
+
+@pytest.fixture
+def file_database(settings, tmp_path, transactional_db, django_db_blocker):
+    """
+    Factory : alias de base SQLite fichier (réglages de default), connexion
+    jamais ouverte. Rappelée pour un alias existant, elle ferme et oublie sa
+    connexion, comme au démarrage d'un nouveau processus.
+    """
+    aliases = []
+
+    def _file_database(alias):
+        if alias in aliases:
+            connections[alias].close()
+            del connections[alias]
+        else:
+            connections.settings[alias] = {
+                **connections["default"].settings_dict,
+                "NAME": str(tmp_path / f"{alias}.sqlite3"),
+            }
+            aliases.append(alias)
+        return alias
+
+    # La classe de test refuse d'ouvrir une connexion vers un alias inconnu
+    # à sa création : accès rétabli pour la durée du test
+    with django_db_blocker.unblock():
+        yield _file_database
+    for alias in aliases:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
@@ -0,0 +1,117 @@
+"""
+Tests pour les appels d'API groupés (POST /api/batch/)
+"""
+
+import pytest
+from django.urls import reverse
+
+from issues.models import Issue
+from softdesk_support.throttling import SharedUserRateThrottle
+
+
+@pytest.fixture
+def project(authenticated_client, create_project, create_user):
+    project = create_project(author=authenticated_client.user)
+    project.contributors.create(
+        user=create_user(username="member", email="member@example.com")
+    )
+    return project
+
+
+def batch(client, entries, expected=200):
+    response = client.post(reverse("batch"), entries, format="json")
+    assert response.status_code == expected, response.content
+    return response
+
+
+def test_screen_in_one_call(authenticated_client, project):
+    response = batch(
+        authenticated_client,
+        [
+            {"method": "GET", "path": f"/api/projects/{project.pk}/", "name": "p"},
+            {"method": "get", "path": "/api/projects/{{p.id}}/contributors/"},
+            {
+                "method": "POST",
+                "path": "/api/projects/{{p.id}}/issues/",
+                "body": {
+                    "name": "Depuis un batch",
+                    "description": "Description",
+                    "tag": "BUG",
+                    "assigned_to": "{{1.results.1.user.id}}",
+                },
+            },
+            {"method": "GET", "path": "/api/projects/{{p.id}}/issues/{{2.id}}/"},
+        ],
+    )
+    results = response.data
+    assert [result["status"] for result in results] == [200, 200, 201, 200]
+    assert results[0]["name"] == "p"
+    assert results[0]["body"]["name"] == project.name
+
+    issue = Issue.objects.get(name="Depuis un batch")
+    assert issue.author == authenticated_client.user
+    assert issue.assigned_to.username == "member"
+    assert results[3]["body"]["id"] == issue.pk
+
+
+def test_failed_dependency(authenticated_client, project):
+    results = batch(
+        authenticated_client,
+        [
+            {"method": "GET", "path": "/api/projects/999999/"},
+            {"method": "GET", "path": "/api/projects/{{0.id}}/issues/"},
+            {"method": "GET", "path": "/api/projects/{{5.id}}/issues/"},
+            {"method": "GET", "path": f"/api/projects/{project.pk}/"},
+        ],
+    ).data
+    assert [result["status"] for result in results] == [404, 424, 424, 200]
+
+
+@pytest.mark.parametrize("path", ["/api/unknown/", "/api/batch/", "/admin/"])
+def test_only_api_views(authenticated_client, path):
+    results = batch(authenticated_client, [{"method": "GET", "path": path}]).data
+    assert results[0]["status"] == 404
+
+
+def test_query_string(authenticated_client, create_project):
+    for index in range(12):
+        create_project(author=authenticated_client.user, name=f"Projet {index}")
+    results = batch(
+        authenticated_client, [{"method": "GET", "path": "/api/projects/?page=2"}]
+    ).data
+    assert len(results[0]["body"]["results"]) == 2
+
+
+def test_throttle_cost_is_shared(authenticated_client, project):
+    path = f"/api/projects/{project.pk}/"
+    response = batch(
+        authenticated_client,
+        [{"method": "GET", "path": path}, {"method": "GET", "path": path}],
+    )
+    # Deux détails de projet à 2 unités, débités une seule fois
+    assert response["X-RateLimit-Cost"] == "4"
+
+
+def test_throttled_as_a_whole(authenticated_client, project, monkeypatch):
+    monkeypatch.setattr(SharedUserRateThrottle, "rate", "3/hour", raising=False)
+    path = f"/api/projects/{project.pk}/"
+    batch(
+        authenticated_client,
+        [{"method": "GET", "path": path}, {"method": "GET", "path": path}],
+        expected=429,
+    )
+
+
+def test_limits(authenticated_client, settings):
+    settings.BATCH_MAX_REQUESTS = 2
+    entry = {"method": "GET", "path": "/api/projects/"}
+    batch(authenticated_client, [entry] * 3, expected=400)
+    batch(authenticated_client, [], expected=400)
+    batch(authenticated_client, [{"method": "TRACE", "path": "/"}], expected=400)
+
+
+def test_requires_authentication(api_client):
+    response = api_client.post(
+        reverse("batch"), [{"method": "GET", "path": "/api/projects/"}], format="json"
+    )
+    assert response.status_code == 401
@@ -0,0 +1,93 @@
+"""
+Tests pour le tableau kanban des issues d'un projet
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from issues.models import Comment, Issue
+
+
+@pytest.fixture
+def board(authenticated_client, create_project):
+    """Projet avec 12 issues « To Do », 2 « In Progress » et aucune « Finished »"""
+    project = create_project(author=authenticated_client.user)
+    statuses = ["To Do"] * 12 + ["In Progress"] * 2
+    Issue.objects.bulk_create(
+        Issue(
+            project=project,
+            author=authenticated_client.user,
+            name=f"Issue {index}",
+            description="Description",
+            tag="TASK",
+            status=status,
+        )
+        for index, status in enumerate(statuses)
+    )
+    return project
+
+
+def get_board(client, project, **params):
+    response = client.get(reverse("project-board", args=[project.pk]), params)
+    assert response.status_code == 200, response.content
+    return response.data
+
+
+def test_columns_with_totals_in_one_query(authenticated_client, board):
+    with CaptureQueriesContext(connection) as queries:
+        data = get_board(authenticated_client, board, limit=5)
+    window = [query["sql"] for query in queries if "ROW_NUMBER()" in query["sql"]]
+    assert len(window) == 1
+    assert "PARTITION BY" in window[0]
+
+    columns = {column["status"]: column for column in data["columns"]}
+    assert list(columns) == ["To Do", "In Progress", "Finished"]
+    assert [column["count"] for column in columns.values()] == [12, 2, 0]
+    assert [len(column["results"]) for column in columns.values()] == [5, 2, 0]
+    assert columns["To Do"]["results"][0]["name"] == "Issue 0"
+    assert columns["To Do"]["next"] is not None
+    assert columns["In Progress"]["next"] is None
+    assert columns["Finished"]["next"] is None
+
+
+def test_column_cursor_loads_the_rest(authenticated_client, board):
+    column = get_board(authenticated_client, board, limit=5)["columns"][0]
+    names = [issue["name"] for issue in column["results"]]
+    url = column["next"]
+    while url:
+        page = authenticated_client.get(url)
+        assert page.status_code == 200
+        assert page.data["status"] == "To Do"
+        names += [issue["name"] for issue in page.data["results"]]
+        url = page.data["next"]
+    assert names == [f"Issue {index}" for index in range(12)]
+
+
+def test_issues_carry_comment_counts(authenticated_client, board):
+    issue = Issue.objects.get(project=board, name="Issue 0")
+    Comment.objects.create(
+        issue=issue, author=authenticated_client.user, description="Commentaire"
+    )
+    column = get_board(authenticated_client, board, limit=5)["columns"][0]
+    assert [card["comments_count"] for card in column["results"]] == [1, 0, 0, 0, 0]
+    assert "latest_comment" not in column["results"][0]
+
+    page = authenticated_client.get(column["next"]).data
+    assert page["results"][0]["comments_count"] == 0
+    assert "latest_comment" not in page["results"][0]
+
+
+def test_unknown_status(authenticated_client, board):
+    response = authenticated_client.get(
+        reverse("project-board", args=[board.pk]), {"status": "Blocked"}
+    )
+    assert response.status_code == 400
+
+
+def test_board_requires_contributor(api_client, create_user, board):
+    outsider = create_user(username="outsider", email="outsider@example.com")
+    api_client.force_authenticate(outsider)
+    response = api_client.get(reverse("project-board", args=[board.pk]))
+    assert response.status_code == 404
@@ -0,0 +1,159 @@
+"""
+Tests pour les choix stockés en petits entiers (priorité, tag, statut)
+"""
+
+import pytest
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.urls import reverse
+
+from issues.models import Issue
+
+
+@pytest.fixture
+def issues(authenticated_client, create_project):
+    project = create_project(author=authenticated_client.user)
+    created = {}
+    for name, priority, status in [
+        ("a", "MEDIUM", "To Do"),
+        ("b", "HIGH", "Finished"),
+        ("c", "LOW", "In Progress"),
+        ("d", "HIGH", "To Do"),
+    ]:
+        created[name] = Issue.objects.create(
+            project=project,
+            author=authenticated_client.user,
+            name=name,
+            description="Description",
+            priority=priority,
+            tag="BUG",
+            status=status,
+        )
+    return project, created
+
+
+def names(response):
+    assert response.status_code == 200
+    return [issue["name"] for issue in response.data["results"]]
+
+
+class TestStorage:
+    """Valeurs texte en Python et dans l'API, entiers en base"""
+
+    def test_database_stores_codes(self, issues):
+        _, created = issues
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT priority, tag, status FROM issues_issue WHERE id = %s",
+                [created["b"].pk],
+            )
+            assert cursor.fetchone() == (3, 1, 3)
+        issue = Issue.objects.get(pk=created["b"].pk)
+        assert (issue.priority, issue.tag, issue.status) == ("HIGH", "BUG", "Finished")
+
+    def test_lookups_use_choice_order(self, issues):
+        assert Issue.objects.filter(priority="HIGH").count() == 2
+        assert Issue.objects.filter(priority__gte="MEDIUM").count() == 3
+        assert list(
+            Issue.objects.filter(status__in=["To Do", "Finished"])
+            .order_by("name")
+            .values_list("status", flat=True)
+        ) == ["To Do", "Finished", "To Do"]
+
+    def test_unknown_value_is_rejected(self, db):
+        with pytest.raises(ValueError):
+            Issue.objects.filter(priority="URGENT").exists()
+
+    def test_api_keeps_strings(self, authenticated_client, issues):
+        project, created = issues
+        response = authenticated_client.patch(
+            reverse("project-issues-detail", args=[project.pk, created["a"].pk]),
+            {"priority": "HIGH", "status": "In Progress"},
+            format="json",
+        )
+        assert response.status_code == 200
+        assert response.data["priority"] == "HIGH"
+        assert response.data["status"] == "In Progress"
+        invalid = authenticated_client.patch(
+            reverse("project-issues-detail", args=[project.pk, created["a"].pk]),
+            {"priority": "URGENT"},
+            format="json",
+        )
+        assert invalid.status_code == 400
+
+
+class TestPriorityOrdering:
+    """?ordering=priority : ordre de sévérité et non alphabétique"""
+
+    def test_descending_severity(self, authenticated_client, issues):
+        project, _ = issues
+        url = reverse("project-issues-list", args=[project.pk])
+        # Égalités départagées par id dans le même sens
+        assert names(authenticated_client.get(url, {"ordering": "-priority"})) == [
+            "d",
+            "b",
+            "a",
+            "c",
+        ]
+        assert names(authenticated_client.get(url, {"ordering": "priority"})) == [
+            "c",
+            "a",
+            "b",
+            "d",
+        ]
+
+    def test_default_and_unknown_ordering(self, authenticated_client, issues):
+        project, _ = issues
+        url = reverse("project-issues-list", args=[project.pk])
+        assert names(authenticated_client.get(url)) == ["a", "b", "c", "d"]
+        assert names(authenticated_client.get(url, {"ordering": "description"})) == [
+            "a",
+            "b",
+            "c",
+            "d",
+        ]
+
+    def test_ordering_uses_index(self, issues):
+        project, _ = issues
+        queryset = Issue.objects.filter(project=project).order_by("-priority", "-id")
+        plan = queryset.explain()
+        assert "issue_project_priority_idx" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_rejects_unknown_values(create_user):
+    """Une valeur hors des choix arrête la migration au lieu de devenir NULL"""
+    before, after = ("issues", "0002_projectshard"), ("issues", "0003_coded_choices")
+    executor = MigrationExecutor(connection)
+    executor.migrate([before])
+    old_apps = executor.loader.project_state(before).apps
+    author = create_user(username="author")
+    project = old_apps.get_model("issues", "Project").objects.create(
+        name="Projet", description="Description", type="back-end", author_id=author.pk
+    )
+    old_apps.get_model("issues", "Issue").objects.create(
+        project=project,
+        author_id=author.pk,
+        name="Ancienne",
+        description="Description",
+        priority="URGENT",
+        tag="BUG",
+        status="To Do",
+    )
+    try:
+        executor.loader.build_graph()
+        with pytest.raises(ValueError, match="priority : valeurs inconnues URGENT"):
+            executor.migrate([after])
+        old_apps.get_model("issues", "Issue").objects.update(priority="HIGH")
+        executor.loader.build_graph()
+        executor.migrate([after])
+        assert Issue.objects.get(name="Ancienne").priority == "HIGH"
+        # Retour arrière : codes vérifiés puis remis en texte
+        executor.loader.build_graph()
+        executor.migrate([before])
+        issue = old_apps.get_model("issues", "Issue").objects.get(name="Ancienne")
+        assert issue.priority == "HIGH"
+    finally:
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
@@ -0,0 +1,109 @@
+"""
+Tests pour le format en colonnes des listes
+"""
+
+import json
+
+import pytest
+from django.urls import reverse
+
+from issues.models import Comment, Issue
+from softdesk_support.columnar import ColumnarJSONRenderer
+
+COLUMNAR = ColumnarJSONRenderer.media_type
+
+
+@pytest.fixture
+def issue(authenticated_client, create_project, create_user):
+    user = authenticated_client.user
+    other = create_user(username="other", email="other@example.com")
+    project = create_project(author=user)
+    project.contributors.create(user=other)
+    issue = Issue.objects.create(
+        project=project,
+        author=user,
+        assigned_to=other,
+        name="Issue",
+        description="Description",
+        tag="BUG",
+    )
+    Comment.objects.bulk_create(
+        Comment(issue=issue, author=user, description=f"Commentaire {index}")
+        for index in range(3)
+    )
+    return issue
+
+
+def list_urls(issue):
+    return [
+        reverse("project-list"),
+        reverse("project-issues-list", args=[issue.project_id]),
+        reverse("issue-comments-list", args=[issue.project_id, issue.pk]),
+        reverse("user-list"),
+    ]
+
+
+def flatten(item, label=""):
+    flat = {}
+    for name, value in item.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{label}{name}."))
+        else:
+            flat[label + name] = value
+    return flat
+
+
+def as_objects(data):
+    return [dict(zip(data["columns"], row)) for row in data["rows"]]
+
+
+def get_both(client, url, **params):
+    default = client.get(url, params)
+    columnar = client.get(url, params, HTTP_ACCEPT=COLUMNAR)
+    assert default.status_code == columnar.status_code == 200, columnar.content
+    assert columnar["Content-Type"].startswith(COLUMNAR)
+    return json.loads(default.content), json.loads(columnar.content)
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_same_values_as_default_format(authenticated_client, issue, settings, compiled):
+    settings.COMPILED_LIST_SERIALIZERS = compiled
+    for url in list_urls(issue):
+        default, columnar = get_both(authenticated_client, url)
+        assert "results" not in columnar
+        assert columnar["count"] == default["count"]
+        assert as_objects(columnar) == [flatten(item) for item in default["results"]]
+
+
+def test_nested_user_is_flattened(authenticated_client, issue):
+    url = reverse("issue-comments-list", args=[issue.project_id, issue.pk])
+    _, columnar = get_both(authenticated_client, url)
+    assert columnar["columns"][-4:] == [
+        "author.id",
+        "author.username",
+        "author.email",
+        "created_time",
+    ]
+
+
+def test_format_query_parameter(authenticated_client, issue):
+    url = reverse("project-issues-list", args=[issue.project_id])
+    response = authenticated_client.get(url, {"format": "columnar", "fields": "id"})
+    assert response.status_code == 200
+    assert json.loads(response.content)["rows"] == [[issue.pk]]
+
+
+def test_with_normalized_users(authenticated_client, issue):
+    url = reverse("issue-comments-list", args=[issue.project_id, issue.pk])
+    _, columnar = get_both(authenticated_client, url, include="users")
+    assert "author" in columnar["columns"]
+    assert list(columnar["included"]["users"]) == [str(issue.author_id)]
+
+
+def test_only_for_list(authenticated_client, issue):
+    url = reverse("project-issues-detail", args=[issue.project_id, issue.pk])
+    response = authenticated_client.get(url, HTTP_ACCEPT=COLUMNAR)
+    assert response.status_code == 406
+    # Format demandé dans l'URL et absent de la route : 404 (DRF)
+    response = authenticated_client.get(url, {"format": "columnar"})
+    assert response.status_code == 404
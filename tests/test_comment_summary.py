@@ -0,0 +1,89 @@
+"""
+Tests pour le nombre de commentaires et l'aperçu du dernier commentaire dans
+la liste des issues
+"""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from issues.models import Comment
+from issues.serializers import COMMENT_PREVIEW_LENGTH
+
+
+@pytest.fixture
+def issues(authenticated_client, create_project, create_issue):
+    project = create_project(author=authenticated_client.user)
+    commented = create_issue(project=project, author=authenticated_client.user)
+    create_issue(project=project, author=authenticated_client.user, name="Vide")
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    for minutes in range(3):
+        comment = Comment.objects.create(
+            issue=commented,
+            author=authenticated_client.user,
+            description=f"Commentaire {minutes} " + "x" * COMMENT_PREVIEW_LENGTH,
+        )
+        Comment.objects.filter(pk=comment.pk).update(
+            created_time=start + timedelta(minutes=minutes, microseconds=123)
+        )
+    return project, commented
+
+
+def list_issues(client, project, **params):
+    response = client.get(reverse("project-issues-list", args=[project.pk]), params)
+    assert response.status_code == 200, response.content
+    return response.data["results"]
+
+
+def test_comments_count_without_loading_comments(authenticated_client, issues):
+    project, _ = issues
+    with CaptureQueriesContext(connection) as queries:
+        rows = list_issues(authenticated_client, project)
+    assert [row["comments_count"] for row in rows] == [3, 0]
+    assert "latest_comment" not in rows[0]
+    # Plus de prefetch des commentaires : aucune requête ne les lit
+    assert not [
+        query for query in queries if query["sql"].startswith('SELECT "issues_comment"')
+    ]
+
+
+def test_latest_comment_preview(authenticated_client, issues):
+    project, issue = issues
+    rows = list_issues(
+        authenticated_client, project, fields="id,comments_count,latest_comment"
+    )
+    latest = Comment.objects.filter(issue=issue).order_by("-created_time").first()
+    detail = authenticated_client.get(
+        reverse("issue-comments-detail", args=[project.pk, issue.pk, latest.pk])
+    ).data
+
+    preview = rows[0]["latest_comment"]
+    assert preview == {
+        "id": detail["id"],
+        "author": authenticated_client.user.username,
+        "description": latest.description[:COMMENT_PREVIEW_LENGTH],
+        "created_time": detail["created_time"],
+    }
+    assert rows[1]["latest_comment"] is None
+    assert rows[1]["comments_count"] == 0
+
+
+def test_omitted_count_is_not_computed(authenticated_client, issues):
+    project, _ = issues
+    with CaptureQueriesContext(connection) as queries:
+        rows = list_issues(authenticated_client, project, omit="comments_count")
+    assert "comments_count" not in rows[0]
+    assert not [query for query in queries if "issues_comment" in query["sql"]]
+
+
+def test_same_output_without_compiled_serializers(
+    authenticated_client, issues, settings
+):
+    project, _ = issues
+    params = {"fields": "id,name,comments_count,latest_comment"}
+    compiled = list_issues(authenticated_client, project, **params)
+    settings.COMPILED_LIST_SERIALIZERS = False
+    assert list_issues(authenticated_client, project, **params) == compiled
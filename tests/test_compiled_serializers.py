@@ -0,0 +1,173 @@
+"""
+Tests de propriété : les serializers compilés produisent exactement
+la même sortie que les serializers DRF sur des données aléatoires
+"""
+
+import random
+import string
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from issues.models import Comment, Contributor, Issue, Project
+from issues.serializers import (
+    CommentSerializer,
+    IssueListSerializer,
+    ProjectListSerializer,
+    annotate_comment_summary,
+    project_contributors_summary,
+)
+from softdesk_support.compiled import CompiledSerializer
+from users.serializers import UserSummarySerializer
+
+User = get_user_model()
+
+# Caractères variés : accents, emoji, séparateurs, guillemets
+ALPHABET = string.ascii_letters + string.digits + "éàçÉ ñ✓🚀\"'\\ "
+USERNAME_ALPHABET = string.ascii_letters + "éàç@.+-_"
+
+
+def random_text(rng, min_size=1, max_size=30, alphabet=ALPHABET):
+    return "".join(rng.choices(alphabet, k=rng.randint(min_size, max_size)))
+
+
+def random_time(rng):
+    start = datetime(2020, 1, 1, tzinfo=UTC)
+    return start + timedelta(
+        seconds=rng.randint(0, 10**8),
+        microseconds=rng.choice([0, rng.randint(0, 999999)]),
+    )
+
+
+def populate(rng):
+    """Jeu de données aléatoire (relations optionnelles, textes, dates)"""
+    users = [
+        User.objects.create_user(
+            username=f"user{i}_{random_text(rng, 0, 8, USERNAME_ALPHABET)}",
+            email=rng.choice(["", f"u{i}@example.com"]),
+            password=None,
+            age=rng.randint(15, 90),
+            can_be_contacted=rng.random() < 0.5,
+            can_data_be_shared=rng.random() < 0.5,
+        )
+        for i in range(rng.randint(2, 8))
+    ]
+    for _ in range(rng.randint(1, 5)):
+        project = Project.objects.create(
+            name=random_text(rng),
+            description=random_text(rng, 0, 200),
+            type=rng.choice(["back-end", "front-end", "iOS", "Android"]),
+            author=rng.choice(users),
+        )
+        for user in rng.sample(users, rng.randint(0, len(users))):
+            Contributor.objects.get_or_create(project=project, user=user)
+        for _ in range(rng.randint(0, 6)):
+            issue = Issue.objects.create(
+                name=random_text(rng),
+                description=random_text(rng, 0, 200),
+                priority=rng.choice(["LOW", "MEDIUM", "HIGH"]),
+                tag=rng.choice(["BUG", "FEATURE", "TASK"]),
+                status=rng.choice(["To Do", "In Progress", "Finished"]),
+                project=project,
+                author=rng.choice(users),
+                assigned_to=rng.choice([None, *users]),
+            )
+            for _ in range(rng.randint(0, 4)):
+                Comment.objects.create(
+                    description=random_text(rng, 1, 100),
+                    issue=issue,
+                    author=rng.choice(users),
+                )
+
+    # Dates de création aléatoires (auto_now_add les fixe à la création)
+    for model in (User, Project, Issue, Comment):
+        for pk in model.objects.values_list("pk", flat=True):
+            model.objects.filter(pk=pk).update(created_time=random_time(rng))
+
+
+def drf_output(serializer_class, queryset):
+    return [list(row.items()) for row in serializer_class(queryset, many=True).data]
+
+
+def compiled_output(compiled, queryset, field_names=None):
+    rows = compiled.values(queryset, field_names)
+    return [list(row.items()) for row in compiled.serialize(rows, field_names)]
+
+
+CASES = [
+    (
+        CompiledSerializer(
+            ProjectListSerializer,
+            extra=project_contributors_summary,
+            extra_fields=["contributors_count", "contributors_names"],
+        ),
+        lambda: Project.objects.select_related("author").order_by("id"),
+    ),
+    (
+        CompiledSerializer(IssueListSerializer),
+        lambda: annotate_comment_summary(
+            Issue.objects.select_related("author").order_by("id"), latest=True
+        ),
+    ),
+    (
+        CompiledSerializer(CommentSerializer),
+        lambda: Comment.objects.select_related("author", "issue__project").order_by(
+            "id"
+        ),
+    ),
+    (
+        CompiledSerializer(UserSummarySerializer),
+        lambda: User.objects.order_by("id"),
+    ),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("seed", range(8))
+def test_compiled_output_is_identical(seed):
+    """Propriété : sortie identique (valeurs et ordre des clés)"""
+    rng = random.Random(seed)
+    populate(rng)
+
+    for compiled, queryset in CASES:
+        assert compiled_output(compiled, queryset()) == drf_output(
+            compiled.serializer_class, queryset()
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("seed", range(4))
+def test_compiled_field_subset(seed):
+    """Propriété : un sous-ensemble de champs est une restriction de la sortie"""
+    rng = random.Random(seed)
+    populate(rng)
+
+    for compiled, queryset in CASES:
+        names = [
+            name
+            for name, field in compiled.serializer_class().fields.items()
+            if not field.write_only
+        ]
+        subset = rng.sample(names, rng.randint(1, len(names)))
+        expected = [
+            [(key, value) for key, value in row if key in subset]
+            for row in drf_output(compiled.serializer_class, queryset())
+        ]
+        assert compiled_output(compiled, queryset(), subset) == expected
+
+
+@pytest.mark.django_db
+def test_list_endpoint_matches_drf_path(authenticated_client, settings):
+    """Test que l'API renvoie la même liste avec ou sans compilation"""
+    populate(random.Random(42))
+    for project in Project.objects.all():
+        Contributor.objects.get_or_create(
+            project=project, user=authenticated_client.user
+        )
+    url = reverse("project-list")
+
+    compiled = authenticated_client.get(url).json()
+    settings.COMPILED_LIST_SERIALIZERS = False
+    assert authenticated_client.get(url).json() == compiled
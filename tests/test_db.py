@@ -0,0 +1,47 @@
+"""
+Tests pour les profils de connexion SQLite (softdesk_support/db.py)
+"""
+
+import pytest
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from softdesk_support.db import sqlite_database
+
+
+def open_connection(database):
+    """Connexion sqlite3 ouverte comme le fait le backend Django"""
+    wrapper = DatabaseWrapper({**database, "TIME_ZONE": None})
+    return wrapper.get_new_connection(wrapper.get_connection_params())
+
+
+def pragma(connection, name):
+    return connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_development_profile(tmp_path):
+    database = sqlite_database(tmp_path / "dev.sqlite3")
+    assert database["OPTIONS"] == {"transaction_mode": "IMMEDIATE"}
+    assert "CONN_MAX_AGE" not in database
+
+
+def test_production_profile_pragmas(tmp_path):
+    database = sqlite_database(
+        tmp_path / "prod.sqlite3", profile="production", conn_max_age=60
+    )
+    assert database["CONN_MAX_AGE"] == 60
+    assert database["CONN_HEALTH_CHECKS"] is True
+
+    connection = open_connection(database)
+    try:
+        assert pragma(connection, "journal_mode") == "wal"
+        assert pragma(connection, "synchronous") == 1  # NORMAL
+        assert pragma(connection, "busy_timeout") == 5000
+        assert pragma(connection, "cache_size") == -65536
+        assert pragma(connection, "temp_store") == 2  # MEMORY
+    finally:
+        connection.close()
+
+
+def test_unknown_profile(tmp_path):
+    with pytest.raises(ValueError):
+        sqlite_database(tmp_path / "db.sqlite3", profile="staging")
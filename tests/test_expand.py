@@ -0,0 +1,140 @@
+"""
+Tests pour les relations dépliées (?expand=) des projets et des issues
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from issues.models import Comment, Issue
+
+
+@pytest.fixture
+def project(authenticated_client, create_project, create_user):
+    """Projet avec 4 issues assignées, chacune avec 3 commentaires"""
+    user = authenticated_client.user
+    assignee = create_user(username="assignee", email="assignee@example.com")
+    project = create_project(author=user)
+    project.contributors.create(user=assignee)
+    issues = Issue.objects.bulk_create(
+        Issue(
+            project=project,
+            author=user,
+            assigned_to=assignee,
+            name=f"Issue {index}",
+            description="Description",
+            tag="TASK",
+        )
+        for index in range(4)
+    )
+    Comment.objects.bulk_create(
+        Comment(issue=issue, author=user, description=f"Commentaire {index}")
+        for issue in issues
+        for index in range(3)
+    )
+    return project
+
+
+def get(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == 200, response.content
+    return response.data
+
+
+def test_issue_detail_expanded(authenticated_client, project):
+    issue = project.issues.order_by("id").first()
+    url = reverse("project-issues-detail", args=[project.pk, issue.pk])
+    data = get(
+        authenticated_client,
+        url,
+        expand="comments.author,author,assigned_to,project",
+    )
+    assert data["author"]["username"] == authenticated_client.user.username
+    assert data["assigned_to"]["username"] == "assignee"
+    assert data["project"] == {
+        "id": project.pk,
+        "name": project.name,
+        "type": project.type,
+        "author": authenticated_client.user.pk,
+        "created_time": data["project"]["created_time"],
+    }
+    assert [comment["description"] for comment in data["comments"]] == [
+        "Commentaire 0",
+        "Commentaire 1",
+        "Commentaire 2",
+    ]
+    assert data["comments"][0]["author"]["id"] == authenticated_client.user.pk
+
+
+def test_list_loads_each_relation_once(authenticated_client, project):
+    url = reverse("project-issues-list", args=[project.pk])
+    expand = "comments.author,assigned_to"
+    with CaptureQueriesContext(connection) as few:
+        get(authenticated_client, url, expand=expand)
+    Issue.objects.bulk_create(
+        Issue(
+            project=project,
+            author=authenticated_client.user,
+            name=f"Autre {index}",
+            description="Description",
+            tag="BUG",
+        )
+        for index in range(4)
+    )
+    with CaptureQueriesContext(connection) as more:
+        rows = get(authenticated_client, url, expand=expand)["results"]
+    assert len(more) == len(few)
+    assert len(rows[0]["comments"]) == 3
+    assert rows[0]["assigned_to"]["username"] == "assignee"
+    assert rows[-1]["assigned_to"] is None
+
+
+def test_comments_capped(authenticated_client, project, settings):
+    settings.EXPAND_MAX_ITEMS = 2
+    issue = project.issues.order_by("id").first()
+    url = reverse("project-issues-detail", args=[project.pk, issue.pk])
+    data = get(authenticated_client, url, expand="comments")
+    assert [comment["description"] for comment in data["comments"]] == [
+        "Commentaire 0",
+        "Commentaire 1",
+    ]
+
+
+def test_project_expanded(authenticated_client, project):
+    url = reverse("project-detail", args=[project.pk])
+    data = get(authenticated_client, url, expand="issues.assigned_to,contributors")
+    assert len(data["issues"]) == 4
+    assert data["issues"][0]["assigned_to"]["username"] == "assignee"
+    assert [
+        contributor["user"]["username"] for contributor in data["contributors"]
+    ] == [
+        authenticated_client.user.username,
+        "assignee",
+    ]
+
+
+@pytest.mark.parametrize(
+    "expand",
+    [
+        "watchers",
+        "comments.issue",
+        "comments.author.projects",
+        "author,assigned_to,project,project.author,comments,comments.author,x",
+    ],
+)
+def test_invalid_expand(authenticated_client, project, expand):
+    url = reverse("project-issues-list", args=[project.pk])
+    response = authenticated_client.get(url, {"expand": expand})
+    assert response.status_code == 400
+    assert "expand" in response.data
+
+
+def test_expand_ignored_on_writes(authenticated_client, project):
+    url = reverse("project-issues-list", args=[project.pk])
+    payload = {"name": "Nouvelle", "description": "Description", "tag": "BUG"}
+    response = authenticated_client.post(
+        url + "?expand=comments", payload, format="json"
+    )
+    assert response.status_code == 201, response.content
+    assert "comments" not in response.data
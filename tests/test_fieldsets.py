@@ -0,0 +1,82 @@
+"""
+Tests pour la sélection de champs (?fields= / ?omit=)
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    """Tests pour ?fields= et ?omit= sur les ViewSets"""
+
+    def test_list_fields(self, authenticated_client, create_project, create_issue):
+        """Test que la liste ne contient que les champs demandés"""
+        project = create_project(author=authenticated_client.user)
+        create_issue(project=project, author=authenticated_client.user)
+        url = reverse("project-issues-list", kwargs={"project_pk": project.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(url, {"fields": "id,name"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data["results"][0]) == ["id", "name"]
+        issue_query = [q["sql"] for q in queries if 'FROM "issues_issue"' in q["sql"]]
+        assert '"issues_issue"."description"' not in issue_query[-1]
+
+    def test_detail_omit_defers_column(
+        self, authenticated_client, create_project, create_issue
+    ):
+        """Test que ?omit= retire le champ et la colonne de la requête"""
+        project = create_project(author=authenticated_client.user)
+        issue = create_issue(project=project, author=authenticated_client.user)
+        url = reverse(
+            "project-issues-detail", kwargs={"project_pk": project.id, "pk": issue.id}
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(
+                url, {"omit": "description,assigned_to_details"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "description" not in response.data
+        assert "assigned_to_details" not in response.data
+        assert response.data["name"] == issue.name
+        sql = " ".join(q["sql"] for q in queries)
+        assert '"issues_issue"."description"' not in sql
+        assert "comments" not in sql  # prefetch des commentaires retiré
+
+    def test_detail_drops_unused_prefetch(self, authenticated_client, create_project):
+        """Test que les prefetch inutiles ne sont plus exécutés"""
+        project = create_project(author=authenticated_client.user)
+        url = reverse("project-detail", kwargs={"pk": project.id})
+
+        with CaptureQueriesContext(connection) as full:
+            authenticated_client.get(url)
+        with CaptureQueriesContext(connection) as sparse:
+            response = authenticated_client.get(url, {"fields": "id,name"})
+
+        assert response.data == {"id": project.id, "name": project.name}
+        assert len(sparse) < len(full)
+
+    def test_unknown_field(self, authenticated_client):
+        """Test qu'un champ inconnu renvoie une erreur 400"""
+        response = authenticated_client.get(reverse("user-list"), {"fields": "secret"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "secret" in str(response.data)
+
+    def test_write_ignores_fields(self, authenticated_client):
+        """Test que ?fields= n'affecte pas les écritures"""
+        response = authenticated_client.post(
+            reverse("project-list") + "?fields=id",
+            {"name": "Projet", "description": "Description du projet", "type": "iOS"},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["name"] == "Projet"
@@ -0,0 +1,52 @@
+"""
+Tests pour l'instrumentation des requêtes (Server-Timing)
+"""
+
+import logging
+
+import pytest
+from django.urls import reverse
+
+
+def parse_server_timing(header):
+    """{"db": {"dur": "1.2", "desc": "..."}, ...}"""
+    metrics = {}
+    for entry in header.split(", "):
+        name, *params = entry.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db
+class TestRequestInstrumentation:
+    """Tests pour RequestInstrumentationMiddleware"""
+
+    def test_disabled_by_default(self, authenticated_client):
+        """Test qu'aucun en-tête n'est ajouté sans le setting"""
+        response = authenticated_client.get(reverse("user-list"))
+        assert "Server-Timing" not in response
+
+    def test_server_timing_and_log(
+        self, settings, authenticated_client, create_project, caplog
+    ):
+        """Test des mesures exposées et du log structuré"""
+        settings.REQUEST_INSTRUMENTATION = True
+        project = create_project(author=authenticated_client.user)
+
+        with caplog.at_level(logging.INFO, logger="softdesk_support.requests"):
+            response = authenticated_client.get(
+                reverse("project-detail", kwargs={"pk": project.id})
+            )
+
+        metrics = parse_server_timing(response["Server-Timing"])
+        assert set(metrics) == {"db", "serializer", "render", "total"}
+        assert float(metrics["serializer"]["dur"]) > 0
+        assert float(metrics["render"]["dur"]) > 0
+        queries = int(metrics["db"]["desc"].strip('"').split()[0])
+        assert queries > 0
+
+        record = caplog.records[-1]
+        assert record.view == "ProjectViewSet"
+        assert record.action == "retrieve"
+        assert record.queries == queries
+        assert "view=ProjectViewSet action=retrieve" in record.getMessage()
@@ -0,0 +1,226 @@
+"""
+Tests pour les métriques Prometheus (/api/metrics/)
+"""
+
+import json
+import re
+import subprocess
+import sys
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from softdesk_support import metrics
+from softdesk_support.middleware import MetricsMiddleware
+from softdesk_support.throttling import SharedUserRateThrottle
+
+
+def sample(text, metric, **labels):
+    """Valeur d'une série dans l'exposition Prometheus (0 si absente)"""
+    for line in text.splitlines():
+        match = re.fullmatch(rf"{metric}\{{(.*)\}} (\S+)", line)
+        if match and all(f'{k}="{v}"' in match.group(1) for k, v in labels.items()):
+            return float(match.group(2))
+    return 0.0
+
+
+@pytest.fixture
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_ENABLED = True
+    settings.METRICS_DIR = tmp_path / "metrics"
+    return settings.METRICS_DIR
+
+
+@pytest.fixture
+def admin_client(create_user):
+    admin = create_user(username="admin", email="admin@example.com", is_staff=True)
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(admin).access_token}"
+    )
+    return client
+
+
+def scrape(client):
+    response = client.get(reverse("metrics"))
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    return response.content.decode()
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    """Tests pour MetricsMiddleware et MetricsView"""
+
+    def test_admin_only(self, authenticated_client):
+        response = authenticated_client.get(reverse("metrics"))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_requests_are_counted(
+        self, metrics_dir, authenticated_client, admin_client
+    ):
+        before = scrape(admin_client)
+        for _ in range(3):
+            authenticated_client.get(reverse("user-list"))
+        text = scrape(admin_client)
+
+        labels = {"route": "user-list", "method": "GET"}
+        requests = sample(
+            text, "softdesk_http_requests_total", status="200", **labels
+        ) - sample(before, "softdesk_http_requests_total", status="200", **labels)
+        assert requests == 3
+        assert (
+            sample(text, "softdesk_http_request_duration_seconds_count", **labels)
+            - sample(before, "softdesk_http_request_duration_seconds_count", **labels)
+            == 3
+        )
+        # Au moins une requête SQL par appel (authentification)
+        assert sample(
+            text, "softdesk_db_queries_per_request_bucket", le="0.0", **labels
+        ) == sample(
+            before, "softdesk_db_queries_per_request_bucket", le="0.0", **labels
+        )
+
+    def test_throttle_rejections(
+        self, metrics_dir, authenticated_client, admin_client, monkeypatch
+    ):
+        monkeypatch.setattr(SharedUserRateThrottle, "rate", "1/hour", raising=False)
+        before = sample(
+            scrape(admin_client), "softdesk_throttle_rejections_total", scope="user"
+        )
+        url = reverse("user-detail", kwargs={"pk": authenticated_client.user.id})
+        authenticated_client.get(url)
+        assert authenticated_client.get(url).status_code == 429
+
+        after = sample(
+            scrape(admin_client), "softdesk_throttle_rejections_total", scope="user"
+        )
+        assert after - before == 1
+
+    def test_other_workers_are_merged(self, metrics_dir, admin_client):
+        """Test que les instantanés des autres processus sont additionnés"""
+        metrics_dir.mkdir()
+        (metrics_dir / "metrics-other-worker.json").write_text(
+            json.dumps(
+                {
+                    "requests": [[["project-list", "GET", "200"], 40]],
+                    "latency": [[["project-list", "GET"], [40] + [0] * 11 + [0.12]]],
+                }
+            )
+        )
+        before = sample(
+            scrape(admin_client),
+            "softdesk_http_requests_total",
+            route="project-list",
+        )
+        (metrics_dir / "metrics-third-worker.json").write_text(
+            json.dumps({"requests": [[["project-list", "GET", "200"], 2]]})
+        )
+        text = scrape(admin_client)
+        assert sample(text, "softdesk_http_requests_total", route="project-list") == (
+            before + 2
+        )
+        assert 'le="+Inf"' in text
+
+
+def test_flush_writes_process_snapshot(tmp_path):
+    metrics.record_request("flush-test", "GET", 200, 0.02, 3)
+    metrics.flush(tmp_path)
+
+    (path,) = tmp_path.glob("metrics-*.json")
+    assert path.name == f"metrics-{metrics.PROCESS_TOKEN}.json"
+    data = json.loads(path.read_text())
+    assert [["flush-test", "GET", "200"], 1] in data["requests"]
+
+
+def test_dead_process_snapshot_is_retired(tmp_path):
+    """L'instantané d'un worker arrêté rejoint le cumul : les totaux ne baissent pas"""
+    worker = subprocess.Popen([sys.executable, "-c", "pass"])
+    worker.wait()
+    stale = tmp_path / f"metrics-{worker.pid}-0123abcd.json"
+    stale.write_text(json.dumps({"requests": [[["dead-worker", "GET", "200"], 7]]}))
+    live = tmp_path / "metrics-other-worker.json"
+    live.write_text(json.dumps({"requests": [[["live-worker", "GET", "200"], 2]]}))
+
+    for _ in range(2):
+        data = metrics.collect(tmp_path)
+        assert data["requests"][("dead-worker", "GET", "200")] == 7
+        assert data["requests"][("live-worker", "GET", "200")] == 2
+    assert not stale.exists()
+    assert (tmp_path / metrics.RETIRED_SNAPSHOT).exists()
+
+
+WORKER = """
+import sys, time
+from softdesk_support import metrics
+metrics.record_request("killed-worker", "GET", 200, 0.01, 1)
+metrics.record_request("killed-worker", "GET", 200, 0.3, 4)
+metrics.flush(sys.argv[1])
+print("ready", flush=True)
+time.sleep(60)
+"""
+
+
+def test_killed_worker_totals_are_unchanged(tmp_path):
+    worker = subprocess.Popen(
+        [sys.executable, "-c", WORKER, str(tmp_path)], stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert worker.stdout.readline().strip() == "ready"
+        before = metrics.collect(tmp_path)
+    finally:
+        worker.kill()
+        worker.wait()
+        worker.stdout.close()
+
+    after = metrics.collect(tmp_path)
+    for name in ("requests", "latency", "queries"):
+        labels = next(labels for labels in before[name] if "killed-worker" in labels)
+        assert after[name][labels] == before[name][labels]
+    assert before["requests"][("killed-worker", "GET", "200")] == 2
+    assert not list(tmp_path.glob(f"metrics-{worker.pid}-*.json"))
+
+
+def test_exit_hook_is_registered_once(settings, tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(metrics, "_exit_cleanups", set())
+    monkeypatch.setattr(
+        metrics.atexit, "register", lambda *args: registered.append(args)
+    )
+    settings.METRICS_ENABLED = True
+    settings.METRICS_DIR = tmp_path
+    for _ in range(3):
+        MetricsMiddleware(lambda request: None)
+    assert registered == [(metrics.retire_snapshot, str(tmp_path))]
+
+    metrics.record_request("exit-test", "GET", 200, 0.02, 3)
+    metrics.flush(tmp_path)
+    metrics.retire_snapshot(tmp_path)
+    assert [path.name for path in tmp_path.glob("metrics-*.json")] == [
+        metrics.RETIRED_SNAPSHOT
+    ]
+    retired = json.loads((tmp_path / metrics.RETIRED_SNAPSHOT).read_text())
+    assert [["exit-test", "GET", "200"], 1] in retired["requests"]
+
+
+def test_histogram_rendering():
+    text = metrics.render_prometheus(
+        {"queries": {("r", "GET"): [0, 1, 0, 2, 0, 0, 0, 0, 0, 1, 12.0]}}
+    )
+    assert (
+        'softdesk_db_queries_per_request_bucket{route="r",method="GET",le="1.0"} 1'
+        in text
+    )
+    assert (
+        'softdesk_db_queries_per_request_bucket{route="r",method="GET",le="3.0"} 3'
+        in text
+    )
+    assert (
+        'softdesk_db_queries_per_request_bucket{route="r",method="GET",le="+Inf"} 4'
+        in text
+    )
+    assert 'softdesk_db_queries_per_request_count{route="r",method="GET"} 4' in text
+    assert 'softdesk_db_queries_per_request_sum{route="r",method="GET"} 12.0' in text
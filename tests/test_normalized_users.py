@@ -0,0 +1,149 @@
+"""
+Tests pour le format normalisé des réponses (?include=users)
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from issues.models import Comment, Issue
+from users.serializers import UserMiniSerializer, UserSerializer
+
+
+@pytest.fixture
+def issue(authenticated_client, create_project, create_user):
+    """Issue commentée 6 fois par deux utilisateurs"""
+    user = authenticated_client.user
+    other = create_user(username="other", email="other@example.com")
+    project = create_project(author=user)
+    project.contributors.create(user=other)
+    issue = Issue.objects.create(
+        project=project,
+        author=user,
+        assigned_to=other,
+        name="Issue",
+        description="Description",
+        tag="BUG",
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            issue=issue,
+            author=user if index % 2 else other,
+            description=f"Commentaire {index}",
+        )
+        for index in range(6)
+    )
+    return issue
+
+
+def get(client, url, **params):
+    response = client.get(url, params)
+    assert response.status_code == 200, response.content
+    return response.data
+
+
+def comments_url(issue):
+    return reverse("issue-comments-list", args=[issue.project_id, issue.pk])
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_comment_list_includes_each_user_once(
+    authenticated_client, issue, settings, compiled
+):
+    settings.COMPILED_LIST_SERIALIZERS = compiled
+    default = get(authenticated_client, comments_url(issue))
+    with CaptureQueriesContext(connection) as queries:
+        data = get(authenticated_client, comments_url(issue), include="users")
+
+    assert data["count"] == default["count"]
+    assert [row["author"] for row in data["results"]] == [
+        row["author"]["id"] for row in default["results"]
+    ]
+    users = {str(row["author"]["id"]): row["author"] for row in default["results"]}
+    assert data["included"]["users"] == users
+    assert len(queries) <= 6
+
+
+def test_issue_detail(authenticated_client, issue):
+    url = reverse("project-issues-detail", args=[issue.project_id, issue.pk])
+    data = get(authenticated_client, url, include="users")
+    assert data["data"]["author"] == issue.author_id
+    assert data["data"]["assigned_to"] == issue.assigned_to_id
+    assert data["data"]["assigned_to_details"] == issue.assigned_to_id
+    assert data["included"]["users"] == {
+        str(user.pk): UserMiniSerializer(user).data
+        for user in (issue.author, issue.assigned_to)
+    }
+
+
+def test_issue_list_with_sparse_fields(authenticated_client, issue):
+    url = reverse("project-issues-list", args=[issue.project_id])
+    data = get(authenticated_client, url, include="users", fields="id,author")
+    assert data["results"] == [{"id": issue.pk, "author": issue.author_id}]
+    assert list(data["included"]["users"]) == [str(issue.author_id)]
+
+
+def test_project_contributors(authenticated_client, issue):
+    url = reverse("project-detail", args=[issue.project_id])
+    default = get(authenticated_client, url)
+    data = get(authenticated_client, url, include="users")["data"]
+    assert data["contributors"] == [user["id"] for user in default["contributors"]]
+    assert data["author"] == default["author"]["id"]
+
+
+def test_project_users_serialized_with_user_serializer(authenticated_client, issue):
+    url = reverse("project-detail", args=[issue.project_id])
+    included = get(authenticated_client, url, include="users")["included"]
+    assert included["users"][str(issue.assigned_to_id)] == (
+        UserSerializer(issue.assigned_to).data
+    )
+
+
+def test_project_list_rejects_include(authenticated_client, issue):
+    # La liste des projets ne contient que des noms d'utilisateur
+    response = authenticated_client.get(reverse("project-list"), {"include": "users"})
+    assert response.status_code == 400
+    assert "include" in response.data
+
+
+def test_expanded_users_are_normalized(authenticated_client, issue):
+    url = reverse("project-issues-detail", args=[issue.project_id, issue.pk])
+    params = {"expand": "comments.author,project", "include": "users"}
+    data = get(authenticated_client, url, **params)
+    authors = {
+        str(pk): author for pk, author in issue.comments.values_list("id", "author_id")
+    }
+    comments = data["data"]["comments"]
+    assert len(comments) == len(authors)
+    assert all(comment["author"] == authors[comment["id"]] for comment in comments)
+    assert data["data"]["project"]["author"] == issue.project.author_id
+    assert set(data["included"]["users"]) == {
+        str(issue.author_id),
+        str(issue.assigned_to_id),
+    }
+
+
+def test_expanded_contributors_are_normalized(authenticated_client, issue):
+    url = reverse("project-detail", args=[issue.project_id])
+    data = get(authenticated_client, url, expand="contributors", include="users")
+    users = [contributor["user"] for contributor in data["data"]["contributors"]]
+    assert sorted(users) == sorted([issue.author_id, issue.assigned_to_id])
+    assert sorted(data["included"]["users"]) == sorted(str(pk) for pk in users)
+
+
+def test_unknown_include(authenticated_client, issue):
+    response = authenticated_client.get(comments_url(issue), {"include": "issues"})
+    assert response.status_code == 400
+    assert "include" in response.data
+
+
+def test_include_ignored_on_writes(authenticated_client, issue):
+    response = authenticated_client.post(
+        comments_url(issue) + "?include=users",
+        {"description": "Nouveau"},
+        format="json",
+    )
+    assert response.status_code == 201, response.content
+    assert "included" not in response.data
+    assert response.data["author"]["id"] == authenticated_client.user.pk
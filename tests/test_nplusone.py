@@ -0,0 +1,75 @@
+"""
+Tests pour la détection des requêtes N+1
+"""
+
+import pytest
+from django.urls import reverse
+
+from issues.serializers import ProjectListSerializer
+from softdesk_support.instrumentation import fingerprint
+from softdesk_support.nplusone import NPlusOneError, NPlusOneWarning
+
+
+def naive_contributors_names(self, obj):
+    """Ancienne implémentation : une requête par projet"""
+    return list(obj.contributors.values_list("user__username", flat=True))
+
+
+class TestFingerprint:
+    """Tests pour la normalisation des requêtes SQL"""
+
+    def test_literals_are_replaced(self):
+        assert fingerprint(
+            "SELECT * FROM t WHERE name = 'O''Hara' AND id = 12 LIMIT 21"
+        ) == fingerprint("SELECT * FROM t WHERE name = 'x' AND id = 3 LIMIT 1")
+
+    def test_in_lists_are_collapsed(self):
+        assert fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s)") == (
+            "SELECT * FROM t WHERE id IN (...)"
+        )
+
+    def test_different_shapes_stay_distinct(self):
+        assert fingerprint("SELECT a FROM t WHERE id = %s") != fingerprint(
+            "SELECT b FROM t WHERE id = %s"
+        )
+
+
+@pytest.mark.django_db
+class TestNPlusOneMiddleware:
+    """Tests pour NPlusOneMiddleware (activé en mode "raise" par conftest)"""
+
+    @pytest.fixture
+    def projects(self, settings, authenticated_client, create_project, monkeypatch):
+        settings.COMPILED_LIST_SERIALIZERS = False
+        monkeypatch.setattr(
+            ProjectListSerializer, "get_contributors_names", naive_contributors_names
+        )
+        for index in range(5):
+            create_project(name=f"Projet {index}", author=authenticated_client.user)
+
+    def test_raises_with_call_site(self, authenticated_client, projects):
+        """Test que l'erreur désigne la méthode responsable"""
+        with pytest.raises(NPlusOneError) as excinfo:
+            authenticated_client.get(reverse("project-list"))
+
+        message = str(excinfo.value)
+        assert "5 exécutions" in message
+        assert "naive_contributors_names (tests/test_nplusone.py:" in message
+
+    def test_warn_mode(self, settings, authenticated_client, projects):
+        """Test qu'en mode "warn" la réponse est renvoyée normalement"""
+        settings.NPLUSONE_MODE = "warn"
+        with pytest.warns(NPlusOneWarning, match="GET /api/projects/"):
+            response = authenticated_client.get(reverse("project-list"))
+        assert response.status_code == 200
+
+    def test_prefetched_list_is_clean(
+        self, settings, authenticated_client, create_project
+    ):
+        """Test que la liste DRF des projets n'exécute pas de N+1"""
+        settings.COMPILED_LIST_SERIALIZERS = False
+        for index in range(5):
+            create_project(name=f"Projet {index}", author=authenticated_client.user)
+        response = authenticated_client.get(reverse("project-list"))
+        assert response.status_code == 200
+        assert response.data["count"] == 5
@@ -0,0 +1,113 @@
+"""
+Tests pour le profilage par échantillonnage (/api/profiling/)
+"""
+
+import time
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from issues.views import ProjectViewSet
+from softdesk_support import profiling
+from softdesk_support.profiling import profiling_token, sampler
+
+
+@pytest.fixture
+def profiled(settings, monkeypatch):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 0.0
+    settings.PROFILING_INTERVAL = 0.001
+    sampler.reset()
+    original = ProjectViewSet.list
+
+    def slow_project_list(self, request, *args, **kwargs):
+        time.sleep(0.05)
+        return original(self, request, *args, **kwargs)
+
+    monkeypatch.setattr(ProjectViewSet, "list", slow_project_list)
+    yield
+    sampler.reset()
+
+
+@pytest.fixture
+def admin_client(create_user):
+    admin = create_user(username="admin", email="admin@example.com", is_staff=True)
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(admin).access_token}"
+    )
+    return client
+
+
+@pytest.mark.django_db
+class TestProfiling:
+    """Tests pour ProfilingMiddleware et ProfilingView"""
+
+    def test_admin_only(self, authenticated_client):
+        response = authenticated_client.get(reverse("profiling"))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_unsampled_requests_are_not_profiled(self, profiled, authenticated_client):
+        response = authenticated_client.get(reverse("project-list"))
+        assert "X-Profiled" not in response
+        assert sampler.summary() == {}
+
+    def test_signed_header_profiles_request(
+        self, profiled, authenticated_client, admin_client
+    ):
+        token = admin_client.post(reverse("profiling")).data["token"]
+        response = authenticated_client.get(
+            reverse("project-list"), HTTP_X_PROFILE_TOKEN=token
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response["X-Profiled"] == "1"
+
+        summary = admin_client.get(reverse("profiling")).data["views"]
+        assert summary["ProjectViewSet.list"]["requests"] == 1
+        assert summary["ProjectViewSet.list"]["samples"] > 0
+
+        response = admin_client.get(
+            reverse("profiling"), {"view": "ProjectViewSet.list"}
+        )
+        assert response["Content-Type"].startswith("text/plain")
+        lines = response.content.decode().splitlines()
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        # Piles depuis le middleware jusqu'à la vue profilée
+        assert stack.startswith("softdesk_support.middleware:ProfilingMiddleware")
+        assert "slow_project_list" in stack
+
+    def test_invalid_token_is_ignored(self, profiled, authenticated_client):
+        response = authenticated_client.get(
+            reverse("project-list"), HTTP_X_PROFILE_TOKEN=profiling_token() + "x"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "X-Profiled" not in response
+
+    def test_sample_rate(self, profiled, settings, authenticated_client):
+        settings.PROFILING_SAMPLE_RATE = 1.0
+        authenticated_client.get(reverse("project-list"))
+        assert sampler.summary()["ProjectViewSet.list"]["requests"] == 1
+
+    def test_reset(self, profiled, admin_client):
+        sampler.start("ProjectViewSet.list", None)
+        sampler.stop()
+        response = admin_client.delete(reverse("profiling"))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert sampler.summary() == {}
+
+
+def test_concurrent_profiles_are_capped():
+    sampler = profiling.Sampler(interval=0.001, max_concurrent=0)
+    assert sampler.start("ProjectViewSet.list", None) is False
+
+
+def test_distinct_stacks_are_capped(monkeypatch):
+    monkeypatch.setattr(profiling, "MAX_STACKS_PER_VIEW", 2)
+    profile = profiling._Profile()
+    for stack in ("a;b", "a;c", "a;d", "a;e", "a;b"):
+        profile.add(stack)
+    assert profile.stacks == {"a;b": 2, "a;c": 1, profiling.TRUNCATED: 2}
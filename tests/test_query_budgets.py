@@ -0,0 +1,593 @@
+"""
+Budgets de requêtes SQL par endpoint.
+
+Chaque action de chaque route de `softdesk_support/urls.py` a un budget
+(nombre maximal de requêtes SQL). L'appel est mesuré sur un petit jeu de
+données, puis à nouveau après l'avoir agrandi : le nombre de requêtes doit
+rester dans le budget et ne pas dépendre du volume de données.
+"""
+
+import itertools
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from issues.models import Comment, Contributor, Issue, Project
+from softdesk_support.urls import issues_router, projects_router, router
+
+User = get_user_model()
+
+PASSWORD = "TestPass123!"
+SMALL, LARGE = 2, 25
+
+_sequence = itertools.count()
+
+
+class Dataset:
+    """Projet de l'utilisateur connecté, avec contributeurs, issues et commentaires"""
+
+    def __init__(self, client):
+        self.client = client
+        self.owner = client.user
+        self.member = self.new_user()
+        self.project = self.new_project()
+        Contributor.objects.create(user=self.member, project=self.project)
+        self.issue = self.new_issue()
+        self.comment = self.new_comment()
+        self.grow(SMALL)
+
+    def new_user(self, **kwargs):
+        return User.objects.create_user(
+            username=f"budget{next(_sequence)}", password=PASSWORD, age=30, **kwargs
+        )
+
+    def new_project(self):
+        return Project.objects.create(
+            name="Projet", description="D", type="back-end", author=self.owner
+        )
+
+    def new_issue(self):
+        return Issue.objects.create(
+            name="Issue",
+            description="D",
+            tag="BUG",
+            project=self.project,
+            author=self.owner,
+            assigned_to=self.member,
+        )
+
+    def new_comment(self):
+        return Comment.objects.create(
+            description="D", issue=self.issue, author=self.owner
+        )
+
+    def grow(self, size):
+        """Ajoute `size` éléments de chaque type, sans passer par save()"""
+        users = User.objects.bulk_create(
+            User(username=f"budget{next(_sequence)}", age=30) for _ in range(size)
+        )
+        projects = Project.objects.bulk_create(
+            Project(name="P", description="D", type="iOS", author=self.owner)
+            for _ in range(size)
+        )
+        Contributor.objects.bulk_create(
+            [Contributor(user=self.owner, project=project) for project in projects]
+            + [Contributor(user=user, project=self.project) for user in users]
+            + [Contributor(user=users[0], project=project) for project in projects]
+        )
+        Issue.objects.bulk_create(
+            Issue(
+                name="I",
+                description="D",
+                tag="TASK",
+                project=self.project,
+                author=user,
+                assigned_to=user,
+            )
+            for user in users
+        )
+        Comment.objects.bulk_create(
+            Comment(description="D", issue=self.issue, author=user) for user in users
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    # Adresses
+    def project_kwargs(self, **kwargs):
+        return {"project_pk": self.project.id, **kwargs}
+
+    def issue_kwargs(self, **kwargs):
+        return {"project_pk": self.project.id, "issue_pk": self.issue.id, **kwargs}
+
+    def issue_payload(self):
+        return {
+            "name": "Nouvelle issue",
+            "description": "D",
+            "priority": "HIGH",
+            "tag": "FEATURE",
+            "status": "In Progress",
+            "assigned_to": self.member.id,
+        }
+
+
+def delete_own_account(ds):
+    """Suppression du compte d'un nouvel utilisateur, par lui-même"""
+    user = ds.new_user()
+    return (
+        ds.client_for(user),
+        "delete",
+        reverse("user-detail", kwargs={"pk": user.id}),
+        None,
+        204,
+    )
+
+
+def update_new_contributor(method):
+    """Préparation d'une modification (`method`) d'un nouveau contributeur"""
+
+    def prepare(ds):
+        contributor = Contributor.objects.create(user=ds.new_user(), project=ds.project)
+        return (
+            ds.client,
+            method,
+            reverse(
+                "project-contributors-detail",
+                kwargs=ds.project_kwargs(pk=contributor.id),
+            ),
+            {"user_id": contributor.user_id},
+            200,
+        )
+
+    return prepare
+
+
+# (nom de route, action) -> (budget, préparation). La préparation renvoie
+# (client, méthode, url, données, statut attendu) ; elle peut créer les objets
+# nécessaires, ses requêtes ne sont pas comptées.
+ENDPOINTS = {
+    ("token_obtain_pair", "post"): (
+        1,
+        lambda ds: (
+            APIClient(),
+            "post",
+            reverse("token_obtain_pair"),
+            {"username": ds.owner.username, "password": PASSWORD},
+            200,
+        ),
+    ),
+    ("token_refresh", "post"): (
+        1,
+        lambda ds: (
+            APIClient(),
+            "post",
+            reverse("token_refresh"),
+            {"refresh": str(RefreshToken.for_user(ds.owner))},
+            200,
+        ),
+    ),
+    ("metrics", "get"): (
+        1,
+        lambda ds: (
+            ds.client_for(ds.new_user(is_staff=True)),
+            "get",
+            reverse("metrics"),
+            None,
+            200,
+        ),
+    ),
+    ("profiling", "get"): (
+        1,
+        lambda ds: (
+            ds.client_for(ds.new_user(is_staff=True)),
+            "get",
+            reverse("profiling"),
+            None,
+            200,
+        ),
+    ),
+    ("profiling", "post"): (
+        1,
+        lambda ds: (
+            ds.client_for(ds.new_user(is_staff=True)),
+            "post",
+            reverse("profiling"),
+            None,
+            201,
+        ),
+    ),
+    ("profiling", "delete"): (
+        1,
+        lambda ds: (
+            ds.client_for(ds.new_user(is_staff=True)),
+            "delete",
+            reverse("profiling"),
+            None,
+            204,
+        ),
+    ),
+    # Détail du projet (6) puis ses issues (4), authentification partagée
+    ("batch", "post"): (
+        9,
+        lambda ds: (
+            ds.client,
+            "post",
+            reverse("batch"),
+            [
+                {"method": "GET", "path": f"/api/projects/{ds.project.id}/"},
+                {"method": "GET", "path": "/api/projects/{{0.id}}/issues/"},
+            ],
+            200,
+        ),
+    ),
+    # Utilisateurs
+    ("user-list", "list"): (
+        3,
+        lambda ds: (ds.client, "get", reverse("user-list"), None, 200),
+    ),
+    ("user-list", "create"): (
+        3,
+        lambda ds: (
+            APIClient(),
+            "post",
+            reverse("user-list"),
+            {
+                "username": f"signup{next(_sequence)}",
+                "email": "signup@example.com",
+                "password": PASSWORD,
+                "password_confirm": PASSWORD,
+                "age": 20,
+            },
+            201,
+        ),
+    ),
+    ("user-profile", "profile"): (
+        1,
+        lambda ds: (ds.client, "get", reverse("user-profile"), None, 200),
+    ),
+    ("user-detail", "retrieve"): (
+        2,
+        lambda ds: (
+            ds.client,
+            "get",
+            reverse("user-detail", kwargs={"pk": ds.member.id}),
+            None,
+            200,
+        ),
+    ),
+    ("user-detail", "update"): (
+        5,
+        lambda ds: (
+            ds.client,
+            "put",
+            reverse("user-detail", kwargs={"pk": ds.owner.id}),
+            {"username": ds.owner.username, "email": "new@example.com", "age": 31},
+            200,
+        ),
+    ),
+    ("user-detail", "partial_update"): (
+        4,
+        lambda ds: (
+            ds.client,
+            "patch",
+            reverse("user-detail", kwargs={"pk": ds.owner.id}),
+            {"age": 32},
+            200,
+        ),
+    ),
+    ("user-detail", "destroy"): (11, delete_own_account),
+    # Projets
+    ("project-list", "list"): (
+        4,
+        lambda ds: (ds.client, "get", reverse("project-list"), None, 200),
+    ),
+    ("project-list", "create"): (
+        13,
+        lambda ds: (
+            ds.client,
+            "post",
+            reverse("project-list"),
+            {"name": "Nouveau", "description": "Description", "type": "Android"},
+            201,
+        ),
+    ),
+    ("project-detail", "retrieve"): (
+        6,
+        lambda ds: (
+            ds.client,
+            "get",
+            reverse("project-detail", kwargs={"pk": ds.project.id}),
+            None,
+            200,
+        ),
+    ),
+    ("project-detail", "update"): (
+        5,
+        lambda ds: (
+            ds.client,
+            "put",
+            reverse("project-detail", kwargs={"pk": ds.project.id}),
+            {"name": "Renommé", "description": "Description", "type": "front-end"},
+            200,
+        ),
+    ),
+    ("project-detail", "partial_update"): (
+        5,
+        lambda ds: (
+            ds.client,
+            "patch",
+            reverse("project-detail", kwargs={"pk": ds.project.id}),
+            {"name": "Renommé"},
+            200,
+        ),
+    ),
+    ("project-detail", "destroy"): (
+        7,
+        lambda ds: (
+            ds.client,
+            "delete",
+            reverse("project-detail", kwargs={"pk": ds.new_project().id}),
+            None,
+            204,
+        ),
+    ),
+    ("project-add-contributor", "add_contributor"): (
+        10,
+        lambda ds: (
+            ds.client,
+            "post",
+            reverse("project-add-contributor", kwargs={"pk": ds.project.id}),
+            {"user_id": ds.new_user().id},
+            201,
+        ),
+    ),
+    ("project-board", "board"): (
+        3,
+        lambda ds: (
+            ds.client,
+            "get",
+            reverse("project-board", kwargs={"pk": ds.project.id}),
+            None,
+            200,
+        ),
+    ),
+    # Contributeurs
+    ("project-contributors-list", "list"): (
+        4,
+        lambda ds: (
+            ds.client,
+            "get",
+            reverse("project-contributors-list", kwargs=ds.project_kwargs()),
+            None,
+            200,
+        ),
+    ),
+    ("project-contributors-list", "create"): (
+        7,
+        lambda ds: (
+            ds.client,
+            "post",
+            reverse("project-contributors-list", kwargs=ds.project_kwargs()),
+            {"user_id": ds.new_user().id},
+            201,
+        ),
+    ),
+    ("project-contributors-detail", "retrieve"): (
+        3,
+        lambda ds: (
+            ds.client,
+            "get",
+            reverse(
+                "project-contributors-detail",
+                kwargs=ds.project_kwargs(pk=ds.project.contributors.first().id),
+            ),
+            None,
+            200,
+        ),
+    ),
+    ("project-contributors-detail", "update"): (6, update_new_contributor("put")),
+    ("project-contributors-detail", "partial_update"): (
+        6,
+        update_new_contributor("patch"),
+    ),
+    ("project-contributors-detail", "destroy"): (
+        4,
+        lambda ds: (
+            ds.client,
+            "delete",
+            reverse(
+                "project-contributors-detail",
+                kwargs=ds.project_kwargs(
+                    pk=Contributor.objects.create(
+                        user=ds.new_user(), project=ds.project
+                    ).id
+                ),
+            ),
+            None,
+            204,
+        ),
+    ),
+    # Issues
+    ("project-issues-list", "list"): (
+        4,
+        lambda ds: (
+            ds.client,
+            "get",
+            reverse("project-issues-list", kwargs=ds.project_kwargs()),
+            None,
+            200,
+        ),
+    ),
+    ("project-issues-list", "create"): (
+        10,
+        lambda ds: (
+            ds.client,
+            "post",
+            reverse("project-issues-list", kwargs=ds.project_kwargs()),
+            ds.issue_payload(),
+            201,
+        ),
+    ),
+    ("project-issues-detail", "retrieve"): (
+        5,
+        lambda ds: (
+            ds.client,
+            "get",
+            reverse("project-issues-detail", kwargs=ds.project_kwargs(pk=ds.issue.id)),
+            None,
+            200,
+        ),
+    ),
+    ("project-issues-detail", "update"): (
+        8,
+        lambda ds: (
+            ds.client,
+            "put",
+            reverse("project-issues-detail", kwargs=ds.project_kwargs(pk=ds.issue.id)),
+            ds.issue_payload(),
+            200,
+        ),
+    ),
+    ("project-issues-detail", "partial_update"): (
+        6,
+        lambda ds: (
+            ds.client,
+            "patch",
+            reverse("project-issues-detail", kwargs=ds.project_kwargs(pk=ds.issue.id)),
+            {"status": "Finished"},
+            200,
+        ),
+    ),
+    ("project-issues-detail", "destroy"): (
+        7,
+        lambda ds: (
+            ds.client,
+            "delete",
+            reverse(
+                "project-issues-detail", kwargs=ds.project_kwargs(pk=ds.new_issue().id)
+            ),
+            None,
+            204,
+        ),
+    ),
+    # Commentaires
+    ("issue-comments-list", "list"): (
+        4,
+        lambda ds: (
+            ds.client,
+            "get",
+            reverse("issue-comments-list", kwargs=ds.issue_kwargs()),
+            None,
+            200,
+        ),
+    ),
+    ("issue-comments-list", "create"): (
+        6,
+        lambda ds: (
+            ds.client,
+            "post",
+            reverse("issue-comments-list", kwargs=ds.issue_kwargs()),
+            {"description": "Nouveau commentaire"},
+            201,
+        ),
+    ),
+    ("issue-comments-detail", "retrieve"): (
+        3,
+        lambda ds: (
+            ds.client,
+            "get",
+            reverse("issue-comments-detail", kwargs=ds.issue_kwargs(pk=ds.comment.id)),
+            None,
+            200,
+        ),
+    ),
+    ("issue-comments-detail", "update"): (
+        6,
+        lambda ds: (
+            ds.client,
+            "put",
+            reverse("issue-comments-detail", kwargs=ds.issue_kwargs(pk=ds.comment.id)),
+            {"description": "Commentaire modifié"},
+            200,
+        ),
+    ),
+    ("issue-comments-detail", "partial_update"): (
+        8,
+        lambda ds: (
+            ds.client,
+            "patch",
+            reverse("issue-comments-detail", kwargs=ds.issue_kwargs(pk=ds.comment.id)),
+            {"description": "Commentaire modifié"},
+            200,
+        ),
+    ),
+    ("issue-comments-detail", "destroy"): (
+        6,
+        lambda ds: (
+            ds.client,
+            "delete",
+            reverse(
+                "issue-comments-detail", kwargs=ds.issue_kwargs(pk=ds.new_comment().id)
+            ),
+            None,
+            204,
+        ),
+    ),
+}
+
+
+def registered_actions():
+    """(nom de route, action) de toutes les routes d'API"""
+    actions = {
+        ("token_obtain_pair", "post"),
+        ("token_refresh", "post"),
+        ("metrics", "get"),
+        ("profiling", "get"),
+        ("profiling", "post"),
+        ("profiling", "delete"),
+        ("batch", "post"),
+    }
+    for api_router in (router, projects_router, issues_router):
+        for pattern in api_router.urls:
+            for action in (getattr(pattern.callback, "actions", None) or {}).values():
+                actions.add((pattern.name, action))
+    return actions
+
+
+def measure(ds, prepare):
+    """Nombre de requêtes SQL de l'appel préparé"""
+    client, method, url, data, expected_status = prepare(ds)
+    with CaptureQueriesContext(connection) as queries:
+        response = getattr(client, method)(url, data, format="json")
+    assert response.status_code == expected_status, response.content
+    return len(queries)
+
+
+def test_every_route_has_a_budget():
+    """Test qu'aucune route n'échappe à la table des budgets"""
+    assert registered_actions() == set(ENDPOINTS)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "endpoint", sorted(ENDPOINTS), ids=lambda endpoint: "-".join(endpoint)
+)
+def test_query_budget(authenticated_client, endpoint):
+    """Test du budget et de l'indépendance vis-à-vis du volume de données"""
+    budget, prepare = ENDPOINTS[endpoint]
+    ds = Dataset(authenticated_client)
+
+    small = measure(ds, prepare)
+    ds.grow(LARGE)
+    large = measure(ds, prepare)
+
+    assert small <= budget, f"{small} requêtes pour un budget de {budget}"
+    assert large == small, f"{small} requêtes, puis {large} avec plus de données"
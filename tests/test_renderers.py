@@ -0,0 +1,91 @@
+"""
+Tests pour le renderer et le parser JSON rapides
+"""
+
+import io
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from softdesk_support.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+SAMPLE = {
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "name": "Élément\u2028séparateur",
+    "created_time": "2025-01-01T10:00:00.123456Z",
+    "amount": Decimal("1.50"),
+    "tags": ["BUG", None, True, 3],
+    "nested": {1: {"username": "alice"}},
+}
+
+
+class TestFastJSONRenderer:
+    """Tests de compatibilité avec le JSONRenderer de DRF"""
+
+    @pytest.mark.skipif(orjson is None, reason="orjson non installé")
+    def test_same_output_as_drf(self):
+        """Test que la sortie est identique à celle de DRF"""
+        assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(SAMPLE)
+
+    @pytest.mark.skipif(orjson is None, reason="orjson non installé")
+    def test_native_datetime(self):
+        """Test que les datetimes UTC sont au format de DateTimeField"""
+        data = {"at": datetime(2025, 1, 1, 10, 0, 0, 123456, tzinfo=UTC)}
+        assert FastJSONRenderer().render(data) == (
+            b'{"at":"2025-01-01T10:00:00.123456Z"}'
+        )
+
+    def test_stdlib_backend(self, settings):
+        """Test que le backend stdlib est sélectionnable par les settings"""
+        settings.JSON_BACKEND = "stdlib"
+        assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(SAMPLE)
+
+    def test_indented_output_falls_back(self):
+        """Test que la sortie indentée garde le format de DRF"""
+        renderer = FastJSONRenderer()
+        media_type = "application/json; indent=4"
+        assert renderer.render(SAMPLE, media_type) == JSONRenderer().render(
+            SAMPLE, media_type
+        )
+
+
+class TestFastJSONParser:
+    """Tests pour le parser JSON"""
+
+    def test_parse(self):
+        """Test de lecture d'un corps JSON"""
+        stream = io.BytesIO('{"description": "été", "n": [1, 2]}'.encode())
+        assert FastJSONParser().parse(stream) == {"description": "été", "n": [1, 2]}
+
+    def test_invalid_json(self):
+        """Test qu'un JSON invalide lève une ParseError"""
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name": '))
+
+    def test_other_encoding(self):
+        """Test qu'un corps non UTF-8 est décodé par DRF"""
+        stream = io.BytesIO('{"name": "été"}'.encode("latin-1"))
+        data = FastJSONParser().parse(stream, parser_context={"encoding": "latin-1"})
+        assert data == {"name": "été"}
+
+    @pytest.mark.django_db
+    def test_api_round_trip(self, authenticated_client):
+        """Test de création d'un projet à travers le parser et le renderer"""
+        response = authenticated_client.post(
+            reverse("project-list"),
+            {
+                "name": "Projet ✓",
+                "description": "Description assez longue",
+                "type": "iOS",
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["name"] == "Projet ✓"
@@ -0,0 +1,132 @@
+"""
+Tests pour le routage des lectures vers les réplicas
+"""
+
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from issues.models import Contributor, Project
+from softdesk_support.routers import ReplicaRouter, replica_routing
+
+
+@pytest.fixture
+def replica(settings, tmp_path, transactional_db):
+    """Réplica SQLite fichier, synchronisé à la demande par sync_replicas"""
+    alias = "replica_test"
+    connections.settings[alias] = {
+        **connections["default"].settings_dict,
+        "NAME": str(tmp_path / "replica.sqlite3"),
+    }
+    # Connexion ouverte ici : la classe de test de pytest-django n'autorise
+    # que les alias connus à sa création
+    connections[alias].connect()
+    settings.REPLICA_DATABASES = [alias]
+    settings.REPLICA_STICKY_SECONDS = 60
+    cache.clear()
+    yield alias
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+    cache.clear()
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+    return client
+
+
+class TestReplicaRouting:
+    """Tests de bout en bout avec un réplica en retard sur la base principale"""
+
+    @pytest.fixture
+    def project(self, replica, create_user, create_project):
+        author = create_user(username="author")
+        member = create_user(username="member", email="member@example.com")
+        project = create_project(author=author, name="Nom initial")
+        Contributor.objects.create(project=project, user=member)
+        call_command("sync_replicas", stdout=StringIO())
+        # Modification que le réplica ne connaît pas encore
+        Project.objects.filter(pk=project.pk).update(name="Nom à jour")
+        return project
+
+    def get_name(self, user, project):
+        response = client_for(user).get(reverse("project-detail", args=[project.pk]))
+        assert response.status_code == 200
+        return response.data["name"]
+
+    def test_reads_go_to_replica(self, project):
+        assert self.get_name(project.author, project) == "Nom initial"
+
+    def test_writes_and_reads_after_write_use_primary(self, project):
+        response = client_for(project.author).patch(
+            reverse("project-detail", args=[project.pk]),
+            {"description": "Nouvelle description"},
+            format="json",
+        )
+        assert response.status_code == 200
+        assert response.data["name"] == "Nom à jour"
+        assert response.data["description"] == "Nouvelle description"
+
+    def test_sticky_primary_after_write(self, project):
+        member = project.contributors.exclude(user=project.author).get().user
+        client_for(project.author).patch(
+            reverse("project-detail", args=[project.pk]),
+            {"description": "Nouvelle description"},
+            format="json",
+        )
+        # L'auteur relit sa propre écriture ; les autres lisent le réplica
+        assert self.get_name(project.author, project) == "Nom à jour"
+        assert self.get_name(member, project) == "Nom initial"
+
+    def test_no_sticky_window(self, project, settings):
+        settings.REPLICA_STICKY_SECONDS = 0
+        client_for(project.author).patch(
+            reverse("project-detail", args=[project.pk]),
+            {"description": "Nouvelle description"},
+            format="json",
+        )
+        assert self.get_name(project.author, project) == "Nom initial"
+
+
+class TestReplicaRouter:
+    """Tests unitaires du routeur"""
+
+    def test_outside_requests_use_primary(self, settings):
+        settings.REPLICA_DATABASES = ["replica_1"]
+        assert ReplicaRouter().db_for_read(Project) is None
+
+    def test_safe_request_reads_replica_until_write(self, settings):
+        settings.REPLICA_DATABASES = ["replica_1"]
+        router = ReplicaRouter()
+        with replica_routing(primary=False) as state:
+            assert router.db_for_read(Project) == "replica_1"
+            assert router.db_for_write(Project) == "default"
+            assert router.db_for_read(Project) is None
+        assert state.wrote
+
+    def test_primary_request(self, settings):
+        settings.REPLICA_DATABASES = ["replica_1"]
+        with replica_routing(primary=True):
+            assert ReplicaRouter().db_for_read(Project) is None
+
+    def test_replicas_are_not_migrated(self, settings):
+        settings.REPLICA_DATABASES = ["replica_1"]
+        router = ReplicaRouter()
+        assert router.allow_migrate("replica_1", "issues") is False
+        assert router.allow_migrate("default", "issues") is None
+
+
+def test_sync_replicas_requires_replicas(settings):
+    settings.REPLICA_DATABASES = []
+    with pytest.raises(CommandError):
+        call_command("sync_replicas")
@@ -0,0 +1,97 @@
+"""
+Tests pour la commande de génération de données (manage.py seed)
+"""
+
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+
+from issues.models import Comment, Contributor, Issue, Project
+
+User = get_user_model()
+
+SIZES = {"users": 40, "projects": 10, "issues": 120, "comments": 400}
+
+
+def seed(**options):
+    call_command("seed", stdout=StringIO(), **{**SIZES, **options})
+
+
+def snapshot():
+    """Contenu généré, indépendant des horodatages"""
+    return (
+        list(Project.objects.order_by("id").values_list("author_id", "type")),
+        list(
+            Contributor.objects.order_by("project_id", "user_id").values_list(
+                "project_id", "user_id"
+            )
+        ),
+        list(
+            Issue.objects.order_by("id").values_list(
+                "project_id", "author_id", "assigned_to_id", "priority", "status"
+            )
+        ),
+        list(Comment.objects.order_by("id").values_list("id", "issue_id", "author_id")),
+    )
+
+
+@pytest.mark.django_db
+class TestSeedCommand:
+    """Tests pour la commande seed"""
+
+    def test_counts(self):
+        seed(batch_size=7)
+        assert User.objects.filter(username__startswith="seed_user_").count() == 40
+        assert Project.objects.count() == 10
+        assert Issue.objects.count() == 120
+        assert Comment.objects.count() == 400
+
+    def test_relations_are_consistent(self):
+        """Auteurs contributeurs, issues et commentaires écrits par des membres"""
+        seed()
+        members = set(Contributor.objects.values_list("project_id", "user_id"))
+        for project_id, author_id in Project.objects.values_list("id", "author_id"):
+            assert (project_id, author_id) in members
+        for project_id, author_id, assigned_to_id in Issue.objects.values_list(
+            "project_id", "author_id", "assigned_to_id"
+        ):
+            assert (project_id, author_id) in members
+            assert assigned_to_id is None or (project_id, assigned_to_id) in members
+        for project_id, author_id in Comment.objects.values_list(
+            "issue__project_id", "author_id"
+        ):
+            assert (project_id, author_id) in members
+
+    def test_deterministic(self):
+        seed(seed=7)
+        first = snapshot()
+        seed(seed=7, flush=True)
+        assert snapshot() == first
+        seed(seed=8, flush=True)
+        assert snapshot() != first
+
+    def test_heavy_tailed_project_sizes(self):
+        """Quelques projets concentrent la majorité des issues"""
+        seed(projects=50, issues=2000, comments=0)
+        sizes = sorted(
+            Project.objects.annotate(size=Count("issues")).values_list(
+                "size", flat=True
+            ),
+            reverse=True,
+        )
+        assert sum(sizes[:10]) > sum(sizes) / 2
+
+    def test_generated_users_can_log_in(self, api_client):
+        seed(users=1, projects=0, issues=0, comments=0)
+        user = User.objects.get(username__startswith="seed_user_")
+        response = api_client.post(
+            "/api/token/", {"username": user.username, "password": "SeedPass123!"}
+        )
+        assert response.status_code == 200
+
+    def test_rejects_orphan_rows(self):
+        with pytest.raises(CommandError):
+            seed(projects=0)
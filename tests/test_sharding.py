@@ -0,0 +1,293 @@
+"""
+Tests pour la répartition des projets sur plusieurs bases (shards)
+"""
+
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from issues.models import Comment, Contributor, Issue, Project, ProjectShard
+from softdesk_support.sharding import (
+    SHARD_ID_SPACE,
+    ShardRouter,
+    fan_out,
+    shard_context,
+    shard_for,
+)
+
+SHARDS = ["shard_test_1", "shard_test_2"]
+
+
+@pytest.fixture
+def shards(settings, transactional_db, file_database):
+    """Deux shards SQLite fichiers, préparés par init_shards"""
+    for alias in SHARDS:
+        file_database(alias)
+    settings.SHARD_DATABASES = SHARDS
+    call_command("init_shards", stdout=StringIO())
+    # Connexions refermées : chaque test les ouvre à la demande
+    for alias in SHARDS:
+        file_database(alias)
+    return SHARDS
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}"
+    )
+    return client
+
+
+def create_on(alias, author, name):
+    """Projet créé directement sur une base"""
+    with shard_context(alias):
+        return Project.objects.create(
+            author=author, name=name, description="Description", type="back-end"
+        )
+
+
+class TestShardedApi:
+    """Tests de bout en bout sur deux shards et la base historique"""
+
+    @pytest.fixture
+    def author(self, shards, create_user):
+        return create_user(username="author")
+
+    def test_users_are_mirrored(self, shards, create_user):
+        user = create_user(username="mirrored")
+        for alias in shards:
+            assert (
+                type(user).objects.using(alias).get(pk=user.pk).username == "mirrored"
+            )
+        user.delete()
+        for alias in shards:
+            assert not type(user).objects.using(alias).filter(pk=user.pk).exists()
+
+    def test_created_project_lives_on_a_shard(self, author):
+        client = client_for(author)
+        response = client.post(
+            reverse("project-list"),
+            {"name": "Réparti", "description": "Description", "type": "back-end"},
+            format="json",
+        )
+        assert response.status_code == 201
+        project_id = response.data["id"]
+        alias = shard_for(project_id)
+        assert alias in SHARDS
+        assert project_id // SHARD_ID_SPACE == SHARDS.index(alias) + 1
+        assert not Project.objects.using("default").filter(pk=project_id).exists()
+        assert Contributor.objects.using(alias).filter(project_id=project_id).exists()
+        assert response.data["contributors"][0]["username"] == "author"
+
+        # Routes imbriquées envoyées vers le shard du projet
+        issue = client.post(
+            reverse("project-issues-list", args=[project_id]),
+            {"name": "Bug", "description": "Description", "tag": "BUG"},
+            format="json",
+        )
+        assert issue.status_code == 201
+        comment = client.post(
+            reverse("issue-comments-list", args=[project_id, issue.data["id"]]),
+            {"description": "Commentaire"},
+            format="json",
+        )
+        assert comment.status_code == 201
+        assert Comment.objects.using(alias).filter(pk=comment.data["id"]).exists()
+        response = client.get(reverse("project-detail", args=[project_id]))
+        assert response.status_code == 200
+        assert response.data["issues_count"] == 1
+
+    def test_create_on_unopened_shards(self, author, file_database):
+        for alias in SHARDS:
+            file_database(alias)
+        response = client_for(author).post(
+            reverse("project-list"),
+            {"name": "Réparti", "description": "Description", "type": "back-end"},
+            format="json",
+        )
+        assert response.status_code == 201
+        assert shard_for(response.data["id"]) in SHARDS
+
+    def test_batch_routes_each_sub_request(self, author):
+        project = create_on(SHARDS[1], author, "Réparti")
+        response = client_for(author).post(
+            reverse("batch"),
+            [
+                {"method": "GET", "path": f"/api/projects/{project.pk}/"},
+                {
+                    "method": "POST",
+                    "path": "/api/projects/{{0.id}}/issues/",
+                    "body": {"name": "Bug", "description": "Description", "tag": "BUG"},
+                },
+            ],
+            format="json",
+        )
+        assert response.status_code == 200
+        assert [result["status"] for result in response.data] == [200, 201]
+        issue_id = response.data[1]["body"]["id"]
+        assert Issue.objects.using(SHARDS[1]).filter(pk=issue_id).exists()
+
+    def test_list_merges_all_databases(self, author):
+        created = [
+            create_on(alias, author, f"Projet {alias}")
+            for alias in ["default", *SHARDS] * 4
+        ]
+        ids = sorted(project.pk for project in created)
+        client = client_for(author)
+
+        response = client.get(reverse("project-list"))
+        assert response.status_code == 200
+        assert response.data["count"] == 12
+        assert [project["id"] for project in response.data["results"]] == ids[:10]
+        assert response.data["results"][0]["contributors_names"] == ["author"]
+
+        page = client.get(reverse("project-list"), {"page": 2})
+        assert [project["id"] for project in page.data["results"]] == ids[10:]
+
+    def test_other_users_see_nothing(self, author, create_user):
+        create_on(SHARDS[0], author, "Privé")
+        other = create_user(username="other", email="other@example.com")
+        response = client_for(other).get(reverse("project-list"))
+        assert response.data["count"] == 0
+
+
+class TestMoveProject:
+    """Tests du déplacement d'un projet entre shards"""
+
+    @pytest.fixture
+    def project(self, shards, create_user):
+        author = create_user(username="author")
+        member = create_user(username="member", email="member@example.com")
+        project = create_on(SHARDS[0], author, "À déplacer")
+        with shard_context(SHARDS[0]):
+            Contributor.objects.create(project=project, user=member)
+            issue = Issue.objects.create(
+                project=project,
+                author=author,
+                assigned_to=member,
+                name="Bug",
+                description="Description",
+                tag="BUG",
+            )
+            Comment.objects.create(issue=issue, author=member, description="Vu")
+        return project
+
+    def test_move_copies_rows_and_updates_map(self, project):
+        issue = Issue.objects.using(SHARDS[0]).get(project=project)
+        call_command("move_project", project.pk, SHARDS[1], stdout=StringIO())
+
+        assert shard_for(project.pk) == SHARDS[1]
+        assert ProjectShard.objects.get(project_id=project.pk).database == SHARDS[1]
+        assert not Project.objects.using(SHARDS[0]).filter(pk=project.pk).exists()
+        assert not Issue.objects.using(SHARDS[0]).exists()
+        moved = Issue.objects.using(SHARDS[1]).get(pk=issue.pk)
+        assert moved.created_time == issue.created_time
+        assert Comment.objects.using(SHARDS[1]).filter(issue=moved).count() == 1
+        assert Contributor.objects.using(SHARDS[1]).filter(project=project).count() == 2
+
+        response = client_for(project.author).get(
+            reverse("project-issues-list", args=[project.pk])
+        )
+        assert response.status_code == 200
+        assert response.data["count"] == 1
+
+    def test_move_from_unopened_connections(self, project, file_database):
+        """Comme `manage.py move_project` : aucune connexion ouverte au départ"""
+        for alias in SHARDS:
+            file_database(alias)
+        call_command("move_project", project.pk, SHARDS[1], stdout=StringIO())
+        assert shard_for(project.pk) == SHARDS[1]
+
+    def test_move_back_clears_map(self, project):
+        call_command("move_project", project.pk, SHARDS[1], stdout=StringIO())
+        call_command("move_project", project.pk, SHARDS[0], stdout=StringIO())
+        assert not ProjectShard.objects.exists()
+        assert shard_for(project.pk) == SHARDS[0]
+
+    def test_moved_ids_do_not_shift_sequences(self, project):
+        call_command("move_project", project.pk, SHARDS[1], stdout=StringIO())
+        new = create_on(SHARDS[1], project.author, "Nouveau")
+        assert new.pk // SHARD_ID_SPACE == 2
+        assert shard_for(new.pk) == SHARDS[1]
+
+    def test_moved_out_ids_are_not_reused(self, project):
+        issue = Issue.objects.using(SHARDS[0]).get(project=project)
+        call_command("move_project", project.pk, SHARDS[1], stdout=StringIO())
+        call_command("init_shards", stdout=StringIO())
+        new = create_on(SHARDS[0], project.author, "Nouveau")
+        assert new.pk > project.pk
+        with shard_context(SHARDS[0]):
+            new_issue = Issue.objects.create(
+                project=new,
+                author=project.author,
+                name="Bug",
+                description="Description",
+                tag="BUG",
+            )
+        assert new_issue.pk > issue.pk
+
+    def test_moved_in_ids_do_not_lower_sequences(self, project):
+        deleted = create_on(SHARDS[0], project.author, "Supprimé")
+        deleted_id = deleted.pk
+        deleted.delete()
+        call_command("move_project", project.pk, SHARDS[1], stdout=StringIO())
+        call_command("move_project", project.pk, SHARDS[0], stdout=StringIO())
+        new = create_on(SHARDS[0], project.author, "Nouveau")
+        assert new.pk > deleted_id
+
+    def test_unknown_target(self, project):
+        with pytest.raises(CommandError):
+            call_command("move_project", project.pk, "inconnue")
+
+
+class TestFanOut:
+    """Tests unitaires de la fusion des résultats"""
+
+    def test_without_shards_returns_queryset(self, settings):
+        settings.SHARD_DATABASES = []
+        queryset = Project.objects.all()
+        assert fan_out(queryset) is queryset
+
+    def test_merge_respects_descending_order(self, shards, create_user):
+        author = create_user(username="author")
+        created = [create_on(alias, author, alias) for alias in ["default", *SHARDS]]
+        merged = fan_out(Project.objects.order_by("-id").values_list("id", "name"))
+        assert merged.count() == 3
+        assert [row[0] for row in merged[:2]] == sorted(
+            (project.pk for project in created), reverse=True
+        )[:2]
+
+
+class TestShardRouter:
+    """Tests unitaires du routeur"""
+
+    def test_inactive_without_shards(self, settings):
+        settings.SHARD_DATABASES = []
+        with shard_context("shard_1"):
+            assert ShardRouter().db_for_read(Project) is None
+
+    def test_routes_project_models_to_current_shard(self, settings):
+        settings.SHARD_DATABASES = ["shard_1"]
+        router = ShardRouter()
+        with shard_context("shard_1"):
+            assert router.db_for_write(Comment) == "shard_1"
+            assert router.db_for_read(ProjectShard) == "default"
+            assert router.db_for_read(get_user_model()) is None
+
+    def test_map_is_only_migrated_on_default(self):
+        router = ShardRouter()
+        assert router.allow_migrate("shard_1", "issues", "projectshard") is False
+        assert router.allow_migrate("default", "issues", "projectshard") is True
+        assert router.allow_migrate("shard_1", "issues", "issue") is None
+
+
+def test_init_shards_requires_shards(settings):
+    settings.SHARD_DATABASES = []
+    with pytest.raises(CommandError):
+        call_command("init_shards")
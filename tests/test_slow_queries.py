@@ -0,0 +1,125 @@
+"""
+Tests pour le journal des requêtes SQL lentes et la commande slow_queries
+"""
+
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    """Journal actif, toutes les requêtes considérées comme lentes"""
+    settings.SLOW_QUERY_LOG_ENABLED = True
+    settings.SLOW_QUERY_THRESHOLD = 0
+    settings.SLOW_QUERY_LOG_PATH = tmp_path / "slow.jsonl"
+    return settings.SLOW_QUERY_LOG_PATH
+
+
+def read(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+    """Tests pour SlowQueryMiddleware"""
+
+    def test_disabled_by_default(self, settings, tmp_path, authenticated_client):
+        settings.SLOW_QUERY_LOG_PATH = tmp_path / "slow.jsonl"
+        authenticated_client.get(reverse("project-list"))
+        assert not settings.SLOW_QUERY_LOG_PATH.exists()
+
+    def test_records_view_call_site_and_plan(
+        self, slow_log, authenticated_client, create_project
+    ):
+        create_project(author=authenticated_client.user)
+        response = authenticated_client.get(reverse("project-list"))
+        assert response.status_code == 200
+
+        records = read(slow_log)
+        project_queries = [r for r in records if '"issues_project"' in r["sql"]]
+        assert project_queries
+        record = project_queries[0]
+        assert record["view"] == "ProjectViewSet"
+        assert record["action"] == "list"
+        assert record["method"] == "GET"
+        # Queryset évalué par DRF : attribué à la méthode exécutée pour le ViewSet
+        assert record["call_site"] == (
+            "ProjectViewSet.paginate_queryset (via GenericAPIView.paginate_queryset)"
+        )
+        assert record["plan"]
+        # Méthode du projet quand elle déclenche elle-même la requête
+        sites = [r["call_site"] for r in records]
+        assert any("(issues/serializers.py:" in site for site in sites)
+
+    def test_explain_is_not_counted(
+        self, slow_log, authenticated_client, django_assert_max_num_queries
+    ):
+        with django_assert_max_num_queries(3):
+            authenticated_client.get(reverse("project-list"))
+        assert read(slow_log)
+
+    def test_threshold(self, slow_log, settings, authenticated_client):
+        settings.SLOW_QUERY_THRESHOLD = 60_000
+        authenticated_client.get(reverse("project-list"))
+        assert not slow_log.exists()
+
+
+def write_log(path, *records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+
+def record(shape, duration, view="ProjectViewSet", action="list", site=None):
+    return {
+        "fingerprint": shape,
+        "duration_ms": duration,
+        "view": view,
+        "action": action,
+        "call_site": site,
+        "plan": [f"SCAN {shape}"],
+    }
+
+
+class TestSlowQueriesCommand:
+    """Tests pour manage.py slow_queries"""
+
+    def test_report_groups_by_fingerprint(self, tmp_path):
+        log = tmp_path / "slow.jsonl"
+        write_log(
+            log,
+            record("SELECT a", 150, site="IssueViewSet.get_queryset"),
+            record("SELECT b", 400),
+            record("SELECT a", 300, site="IssueViewSet.get_queryset"),
+            record("SELECT a", 120, action="retrieve"),
+        )
+        out = StringIO()
+        call_command("slow_queries", log=str(log), stdout=out)
+        report = out.getvalue()
+
+        assert "4 requêtes lentes, 2 formes distinctes" in report
+        # Tri par durée totale : "SELECT a" (570 ms) avant "SELECT b" (400 ms)
+        assert report.index("SELECT a") < report.index("SELECT b")
+        assert "#1  3 exécutions  total 570.0 ms  moyenne 190.0 ms  max 300.0 ms" in (
+            report
+        )
+        assert "action : ProjectViewSet.list (2)" in report
+        assert "depuis : IssueViewSet.get_queryset (2)" in report
+        assert "plan   : SCAN SELECT a" in report
+
+    def test_sort_and_top(self, tmp_path):
+        log = tmp_path / "slow.jsonl"
+        write_log(log, record("SELECT a", 150), record("SELECT a", 150))
+        with log.open("a") as handle:
+            handle.write("ligne tronquée\n")
+            handle.write(json.dumps(record("SELECT b", 400)) + "\n")
+        out = StringIO()
+        call_command("slow_queries", log=str(log), sort="max", top=1, stdout=out)
+        assert "SELECT b" in out.getvalue()
+        assert "SELECT a" not in out.getvalue()
+
+    def test_missing_log(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command("slow_queries", log=str(tmp_path / "absent.jsonl"))
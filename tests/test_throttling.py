@@ -0,0 +1,122 @@
+"""
+Tests pour le throttling partagé entre workers
+"""
+
+import threading
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from softdesk_support.throttling import SharedUserRateThrottle, SlidingWindowStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Store SQLite isolé"""
+    return SlidingWindowStore(tmp_path / "throttle.sqlite3")
+
+
+class TestSlidingWindowStore:
+    """Tests pour les compteurs à fenêtre glissante"""
+
+    def test_allows_until_limit(self, store):
+        """Test que le budget est consommé jusqu'à la limite"""
+        results = [store.hit("k", 3, 60, now=0).allowed for _ in range(4)]
+        assert results == [True, True, True, False]
+
+    def test_keys_are_independent(self, store):
+        """Test que chaque clé possède son propre budget"""
+        assert store.hit("a", 1, 60, now=0).allowed
+        assert store.hit("b", 1, 60, now=0).allowed
+        assert not store.hit("a", 1, 60, now=1).allowed
+
+    def test_previous_window_is_weighted(self, store):
+        """Test que la fenêtre précédente compte au prorata du temps restant"""
+        for _ in range(10):
+            store.hit("k", 10, 60, now=30)
+
+        # Début de la fenêtre suivante : les 10 requêtes comptent encore
+        state = store.hit("k", 10, 60, now=60)
+        assert not state.allowed
+        assert state.wait == pytest.approx(6)
+
+        # À mi-fenêtre, seulement la moitié de l'ancienne consommation
+        assert store.hit("k", 10, 60, now=90).allowed
+
+    def test_old_windows_are_forgotten(self, store):
+        """Test que le budget est rétabli après deux fenêtres"""
+        for _ in range(5):
+            store.hit("k", 5, 60, now=0)
+        assert store.hit("k", 5, 60, now=125).allowed
+
+    def test_cost_larger_than_limit_never_passes(self, store):
+        """Test qu'un coût supérieur à la limite est refusé sans délai"""
+        state = store.hit("k", 5, 60, cost=6, now=0)
+        assert not state.allowed
+        assert state.wait is None
+
+    def test_concurrent_hits_are_atomic(self, tmp_path):
+        """Test qu'aucune requête ne dépasse la limite sous concurrence"""
+        path = tmp_path / "throttle.sqlite3"
+        allowed = []
+
+        def worker():
+            # Un store par thread simule des workers distincts
+            worker_store = SlidingWindowStore(path)
+            for _ in range(20):
+                allowed.append(worker_store.hit("k", 50, 3600, now=0).allowed)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert allowed.count(True) == 50
+
+
+@pytest.mark.django_db
+class TestSharedThrottle:
+    """Tests d'intégration du throttle partagé avec l'API"""
+
+    def test_user_is_throttled(self, authenticated_client, monkeypatch):
+        """Test qu'un utilisateur reçoit 429 une fois la limite atteinte"""
+        monkeypatch.setattr(SharedUserRateThrottle, "rate", "2/hour", raising=False)
+        url = reverse("user-detail", kwargs={"pk": authenticated_client.user.id})
+
+        assert authenticated_client.get(url).status_code == status.HTTP_200_OK
+        assert authenticated_client.get(url).status_code == status.HTTP_200_OK
+
+        response = authenticated_client.get(url)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert "Retry-After" in response
+
+    def test_action_cost_is_charged(self, authenticated_client, monkeypatch):
+        """Test que le coût de l'action est débité et exposé dans les en-têtes"""
+        monkeypatch.setattr(SharedUserRateThrottle, "rate", "10/hour", raising=False)
+
+        detail = authenticated_client.get(
+            reverse("user-detail", kwargs={"pk": authenticated_client.user.id})
+        )
+        assert detail["X-RateLimit-Cost"] == "1"
+        assert detail["X-RateLimit-Remaining"] == "9"
+
+        listing = authenticated_client.get(reverse("user-list"))
+        assert listing["X-RateLimit-Cost"] == "2"
+        assert listing["X-RateLimit-Limit"] == "10"
+        assert listing["X-RateLimit-Remaining"] == "7"
+
+    def test_expensive_action_throttled_before_cheap_one(
+        self, authenticated_client, monkeypatch
+    ):
+        """Test qu'une action coûteuse est refusée alors qu'un détail passe"""
+        monkeypatch.setattr(SharedUserRateThrottle, "rate", "3/hour", raising=False)
+        authenticated_client.get(reverse("user-list"))
+
+        assert (
+            authenticated_client.get(reverse("user-list")).status_code
+            == status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        detail_url = reverse("user-detail", kwargs={"pk": authenticated_client.user.id})
+        assert authenticated_client.get(detail_url).status_code == status.HTTP_200_OK
@@ -0,0 +1,129 @@
+"""
+Tests pour les transactions d'écriture coordonnées (softdesk_support/writes.py)
+"""
+
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from django.db import OperationalError, connection, connections
+
+from softdesk_support import writes
+from softdesk_support.writes import atomic_write, backoff_delay, is_lock_error
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(writes.time, "sleep", delays.append)
+    return delays
+
+
+def flaky(failures, error="database is locked"):
+    """Fonction qui échoue `failures` fois avant de réussir"""
+    calls = []
+
+    def func():
+        calls.append(connection.in_atomic_block)
+        if len(calls) <= failures:
+            raise OperationalError(error)
+        return "ok"
+
+    return func, calls
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAtomicWrite:
+    """Tests pour atomic_write"""
+
+    def test_retries_lock_errors(self, settings, no_sleep):
+        settings.WRITE_RETRY_ATTEMPTS = 5
+        func, calls = flaky(2)
+        assert atomic_write(func)() == "ok"
+        # Trois tentatives, chacune dans sa propre transaction
+        assert calls == [True, True, True]
+        assert len(no_sleep) == 2
+        assert not connection.in_atomic_block
+
+    def test_gives_up_after_attempts(self, settings, no_sleep):
+        settings.WRITE_RETRY_ATTEMPTS = 3
+        func, calls = flaky(10)
+        with pytest.raises(OperationalError):
+            atomic_write(func)()
+        assert len(calls) == 3
+
+    def test_other_errors_are_not_retried(self, no_sleep):
+        func, calls = flaky(1, error="no such table: issues_project")
+        with pytest.raises(OperationalError):
+            atomic_write(func)()
+        assert len(calls) == 1
+
+    def test_nested_call_is_not_retried(self, no_sleep):
+        """Seule la transaction la plus externe peut être rejouée"""
+        func, calls = flaky(1)
+        outer = atomic_write(lambda: atomic_write(func)())
+        assert outer() == "ok"
+        assert len(calls) == 2
+
+    def test_begin_immediate_on_unopened_connection(self, file_database):
+        """Connexion pas encore ouverte, puis refermée : toujours IMMEDIATE"""
+        alias = file_database("writes")
+        locked = []
+
+        @atomic_write(using=alias)
+        def write():
+            # Le verrou d'écriture est déjà pris : un autre écrivain échoue
+            other = sqlite3.connect(connections[alias].settings_dict["NAME"], timeout=0)
+            try:
+                other.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as error:
+                locked.append(str(error))
+            finally:
+                other.close()
+
+        write()
+        connections[alias].close()
+        write()
+        assert locked == ["database is locked"] * 2
+
+
+def test_lock_errors():
+    assert is_lock_error(OperationalError("database is locked"))
+    assert is_lock_error(OperationalError("database table is locked: issues_issue"))
+    assert not is_lock_error(OperationalError("disk I/O error"))
+
+
+def test_backoff_is_jittered_and_capped():
+    delays = [backoff_delay(attempt, 0.05, cap=0.3) for attempt in range(20)]
+    assert all(0 <= delay <= 0.3 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_fifty_concurrent_writers_do_not_fail(processes):
+    """
+    50 rédacteurs simultanés sur une base fichier, dans un ou plusieurs
+    processus : aucune requête en échec
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.write_stress",
+            "--writers",
+            "50",
+            "--processes",
+            str(processes),
+        ],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        timeout=300,
+        check=False,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "0 échecs" in result.stdout
@@ -3,6 +3,9 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.contrib.auth import get_user_model
+from softdesk_support.compiled import CompiledListMixin, CompiledSerializer
+from softdesk_support.fieldsets import SparseFieldsetMixin
+from softdesk_support.throttling import RateLimitHeadersMixin
 from .permissions import IsOwnerOrReadOnly
 from .serializers import (
     UserSerializer,
@@ -13,7 +16,12 @@ from .serializers import (
 User = get_user_model()
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    SparseFieldsetMixin,
+    CompiledListMixin,
+    RateLimitHeadersMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet pour la gestion des utilisateurs
     - Création de compte (accessible à tous)
@@ -22,6 +30,10 @@ class UserViewSet(viewsets.ModelViewSet):
     """
 
     serializer_class = UserSerializer
+    # GREEN CODE: liste construite depuis values_list(), sans instances
+    compiled_list_serializer = CompiledSerializer(UserSummarySerializer)
+    # Coût de chaque action débité du budget de throttling
+    throttle_costs = {"list": 2, "create": 3}  # create : hachage du mot de passe
 
     def get_permissions(self):
         """